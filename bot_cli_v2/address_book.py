@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import secrets
+from bisect import bisect_right
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
 from exceptions import (
     ContactNotFoundError,
@@ -11,6 +13,8 @@ from exceptions import (
 )
 from utils import validate_name
 
+ChangeListener = Callable[[str, Optional[str], Optional[str]], None]
+
 
 def _now_iso() -> str:
     """Повертає поточний час в ISO форматі (UTC)."""
@@ -46,6 +50,14 @@ class AddressBook:
         self._data: Dict[str, Dict[str, Any]] = {}
         self.allow_duplicate_phones = allow_duplicate_phones
         self.last_modified: str | None = None
+        # Лічильник версій: зростає при кожній зміні. Разом з epoch (унікальним
+        # для екземпляра) дає сильний ETag, який не повторюється після рестарту.
+        self.version = 0
+        self.epoch = secrets.token_hex(4)
+        # Кеш відсортованих імен; скидається при кожній зміні
+        self._sorted_names: List[str] | None = None
+        # Підписники на зміни: callback(op, name, old_name)
+        self._listeners: List[ChangeListener] = []
         if data:
             # завантажити початковий словник даних, якщо він наданий
             self.load_from_dict(data)
@@ -78,8 +90,11 @@ class AddressBook:
                 "notes": notes,
             }
 
+        self._sorted_names = None
+        self.version += 1
         # Якщо є записи — ставимо last_modified, інакше None
         self.last_modified = last_modified or (_now_iso() if self._data else None)
+        self._notify("reset", None)
 
     def to_dict(self) -> Dict[str, Dict[str, Any]]:
         """Повертає копію внутрішніх даних для збереження."""
@@ -87,9 +102,29 @@ class AddressBook:
 
     # ---------- допоміжні функції ----------
 
-    def _touch(self) -> None:
-        """Оновлює last_modified після будь-яких змін."""
+    def add_listener(self, callback: ChangeListener) -> None:
+        """Підписує callback(op, name, old_name) на зміни книги.
+
+        op — "add", "change", "remove", "rename" або "reset" (повне
+        перезавантаження, name=None). Викликається синхронно після зміни,
+        коли `version` вже оновлено.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: ChangeListener) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, op: str, name: str | None, old_name: str | None = None) -> None:
+        for callback in list(self._listeners):
+            callback(op, name, old_name)
+
+    def _touch(self, op: str, name: str, old_name: str | None = None) -> None:
+        """Оновлює last_modified і версію книги та сповіщає підписників."""
         self.last_modified = _now_iso()
+        self._sorted_names = None
+        self.version += 1
+        self._notify(op, name, old_name)
 
     def _validate_name(self, name: str) -> str:
         """Валідація імені контакту."""
@@ -132,7 +167,7 @@ class AddressBook:
             "birthday": birthday,
             "notes": notes,
         }
-        self._touch()
+        self._touch("add", n)
 
     def change(
         self,
@@ -155,7 +190,7 @@ class AddressBook:
         if notes is not None:
             self._data[n]["notes"] = notes
         self._data[n]["updated_at"] = _now_iso()
-        self._touch()
+        self._touch("change", n)
 
     def remove(self, name: str) -> None:
         """Видаляє контакт."""
@@ -165,7 +200,7 @@ class AddressBook:
             raise ContactNotFoundError(n)
 
         del self._data[n]
-        self._touch()
+        self._touch("remove", n)
 
     def rename(self, old_name: str, new_name: str) -> None:
         """Перейменовує контакт без зміни телефону."""
@@ -182,7 +217,38 @@ class AddressBook:
         rec["name"] = new_n
         rec["updated_at"] = _now_iso()
         self._data[new_n] = rec
-        self._touch()
+        self._touch("rename", new_n, old_n)
+
+    # ---------- реплікація ----------
+
+    def put_record(self, rec: Dict[str, Any]) -> None:
+        """Вставляє або замінює запис як є, без перевірок унікальності.
+
+        Використовується для відтворення змін, уже перевірених іншим
+        процесом (журнал спільної директорії даних).
+        """
+        n = str(rec.get("name") or "").strip()
+        if not n:
+            return
+        op = "change" if n in self._data else "add"
+        now = _now_iso()
+        self._data[n] = {
+            "name": n,
+            "phone": str(rec.get("phone") or "").strip(),
+            "created_at": str(rec.get("created_at") or now),
+            "updated_at": str(rec.get("updated_at") or now),
+            "birthday": rec.get("birthday"),
+            "notes": rec.get("notes"),
+        }
+        self._touch(op, n)
+
+    def discard(self, name: str) -> bool:
+        """Видаляє запис, якщо він є (без винятку). Повертає, чи було видалення."""
+        if name not in self._data:
+            return False
+        del self._data[name]
+        self._touch("remove", name)
+        return True
 
     def get_record(self, name: str) -> Dict[str, Any]:
         """Повертає запис контакту (dict)."""
@@ -197,9 +263,62 @@ class AddressBook:
         """Повертає телефон контакту (сумісність зі старим API)."""
         return self.get_record(name)["phone"]
 
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def sorted_names(self) -> List[str]:
+        """Повертає відсортований список імен (кешується до наступної зміни).
+
+        Список спільний для всіх викликачів — не змінюйте його.
+        """
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self._data)
+        return self._sorted_names
+
     def all_records_sorted(self) -> List[Dict[str, Any]]:
         """Повертає всі записи контактів, відсортовані за ім'ям."""
-        return [dict(self._data[name]) for name in sorted(self._data)]
+        return [dict(self._data[name]) for name in self.sorted_names()]
+
+    def iter_sorted(
+        self, predicate: Callable[[Dict[str, Any]], bool] | None = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Лениво віддає копії записів у порядку імен, без копії всієї книги.
+
+        Ітерує знімок відсортованих імен: контакти, видалені під час обходу,
+        пропускаються, додані — не потрапляють у вибірку.
+        """
+        for name in self.sorted_names():
+            rec = self._data.get(name)
+            if rec is None:
+                continue
+            if predicate is None or predicate(rec):
+                yield dict(rec)
+
+    def page(
+        self,
+        after: str | None = None,
+        limit: int | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Повертає сторінку записів, відсортованих за ім'ям.
+
+        `after` — ім'я, після якого починається сторінка (не включно),
+        `limit` — максимальна кількість записів, `fields` — проєкція полів.
+        Копіюються лише записи сторінки, а не вся книга.
+        """
+        names = self.sorted_names()
+        start = bisect_right(names, after) if after is not None else 0
+        end = len(names) if limit is None else min(len(names), start + limit)
+
+        keys = list(fields) if fields is not None else None
+        out: List[Dict[str, Any]] = []
+        for name in names[start:end]:
+            rec = self._data[name]
+            if keys is None:
+                out.append(dict(rec))
+            else:
+                out.append({k: rec.get(k) for k in keys})
+        return out
 
     def search(self, query: str) -> List[Dict[str, Any]]:
         """Пошук за частковим збігом по імені або телефону."""
@@ -1,14 +1,48 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import csv
+import io
+import json
 import logging
 import os
+import threading
+import zlib
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from pathlib import Path
-from typing import Optional
+from time import perf_counter
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import Body, Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
+from changes import ChangeFeed
 from core import AppService
+from exceptions import PersistenceError
+from fuzzy_index import normalize_query
+from metrics import METRICS, MetricsMiddleware
+from phone_index import PHONE_SEARCH_MODES
+from response_cache import LRUCache
+from serialization import EncodedBook, Payload, dumps
+from settings import SETTINGS
+from utils import validate_name
 
 logger = logging.getLogger("assistant_bot")
 
@@ -20,26 +54,634 @@ class ContactIn(BaseModel):
     notes: Optional[str] = None
 
 
-app = FastAPI(title="AddressBook API")
+class ContactPatch(BaseModel):
+    name: str
+    phone: Optional[str] = None
+    birthday: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class FuzzyBatchIn(BaseModel):
+    queries: List[str]
+    limit: int = Field(10, ge=1, le=100)
+    score_cutoff: int = Field(60, ge=0, le=100)
+
+
+def _sync_shared_book() -> None:
+    """У багатопроцесному режимі дочитує журнал перед кожним запитом.
+
+    Якщо журнал не змінився, це лише читання його заголовка. Залежність
+    синхронна: FastAPI виконує її в threadpool, бо refresh() читає журнал з
+    диска і чекає на спільний flock журналу, який письменник (цього чи
+    іншого процесу) тримає ексклюзивно, поки дописує журнал з fsync або
+    згортає його у знімок.
+    """
+    service.refresh()
+
+
+# Тривалість фаз старту (секунди): завантаження книги при імпорті модуля
+# і прогрів індексів у lifespan; /ready відповідає 200 лише після прогріву
+STARTUP_PHASES: Dict[str, float] = {}
+_ready = threading.Event()
+
+
+def _warm_up() -> None:
+    """Будує індекси і готові тіла відповідей до перших запитів."""
+    STARTUP_PHASES.update(service.warm_up())
+    start = perf_counter()
+    _encoded().listing_payload(SETTINGS.api_gzip_level).gzip()
+    STARTUP_PHASES["encode_listing"] = perf_counter() - start
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    start = perf_counter()
+    _warm_up()
+    _ready.set()
+    logger.info(
+        "API ready in %.3fs: %s (%d contacts)",
+        perf_counter() - start,
+        ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in STARTUP_PHASES.items()),
+        service.count(),
+    )
+    try:
+        yield
+    finally:
+        _ready.clear()
+
+
+app = FastAPI(
+    title="AddressBook API",
+    dependencies=[Depends(_sync_shared_book)],
+    lifespan=lifespan,
+)
+# Великі відповіді стискаються на льоту; готові тіла з кешу несуть власний
+# gzip-варіант і Content-Encoding, тож middleware їх не перестискає
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=SETTINGS.api_gzip_min_size,
+    compresslevel=SETTINGS.api_gzip_level,
+)
+app.add_middleware(MetricsMiddleware)
 
 # Використовувати директорію даних з оточення, якщо вказана (допомагає тестам), інакше поруч з цим файлом
 BASE_DIR = Path(os.environ.get("AB_DATA_DIR", Path(__file__).parent))
-service = AppService(BASE_DIR, enable_backups=True, allow_duplicate_phones=False)
+# AB_SHARED_DATA=1 вмикає спільний режим для кількох воркерів (див. run_api.py)
+SHARED_DATA = os.environ.get("AB_SHARED_DATA") == "1"
+_load_start = perf_counter()
+service = AppService(
+    BASE_DIR,
+    enable_backups=True,
+    allow_duplicate_phones=False,
+    shared=SHARED_DATA,
+    group_commit_window=SETTINGS.group_commit_window_ms / 1000,
+)
+STARTUP_PHASES["load_book"] = perf_counter() - _load_start
+
+# Кеш відповідей для важких читань; ключ містить epoch і версію книги,
+# тож будь-яка зміна автоматично робить старі записи недосяжними.
+response_cache = LRUCache(
+    maxsize=SETTINGS.api_cache_max_entries, ttl=SETTINGS.api_cache_ttl_seconds
+)
+
+
+METRICS.register_callback(
+    "addressbook_contacts", lambda: service.count(), "Contacts in the book"
+)
+METRICS.register_callback(
+    "addressbook_version", lambda: service.book.version, "Book version counter"
+)
+METRICS.register_callback(
+    "addressbook_undo_depth", lambda: service.undo_depth(), "Undo stack depth"
+)
+for _stat in ("hits", "misses", "evictions", "expirations", "coalesced"):
+    METRICS.register_callback(
+        f"api_cache_{_stat}_total",
+        lambda _stat=_stat: response_cache.stats()[_stat],
+        f"Response cache {_stat}",
+        kind="counter",
+    )
+METRICS.register_callback(
+    "api_cache_entries", lambda: len(response_cache), "Response cache size"
+)
+METRICS.register_callback(
+    "api_startup_phase_seconds",
+    lambda: {(("phase", k),): v for k, v in STARTUP_PHASES.items()},
+    "Duration of API startup phases",
+)
+
+
+@app.get("/ready")
+def ready():
+    """Readiness-проба: 503, доки не завершено прогрів індексів."""
+    if not _ready.is_set():
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return {
+        "status": "ready",
+        "contacts": service.count(),
+        "phases": {k: round(v, 6) for k, v in STARTUP_PHASES.items()},
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+_encoded_book: EncodedBook | None = None
+_encoded_lock = threading.Lock()
+
+
+def _encoded() -> EncodedBook:
+    """Готові JSON-байти для поточної книги сервісу (створюються ліниво)."""
+    global _encoded_book
+    with _encoded_lock:
+        if _encoded_book is None or _encoded_book.book is not service.book:
+            if _encoded_book is not None:
+                _encoded_book.close()
+            _encoded_book = EncodedBook(service.book)
+        return _encoded_book
+
+
+def _json_bytes(
+    body: bytes | Payload, response: Response, request: Request | None = None
+) -> Response:
+    """Віддає вже закодований JSON як є, з заголовками з `response`.
+
+    Для Payload, більшого за поріг, клієнту з Accept-Encoding: gzip
+    віддається закешований стиснутий варіант.
+    """
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    if isinstance(body, Payload):
+        if (
+            len(body) >= SETTINGS.api_gzip_min_size
+            and request is not None
+            and "gzip" in request.headers.get("accept-encoding", "")
+        ):
+            # Vary для нестиснутих відповідей додає GZipMiddleware
+            headers["Content-Encoding"] = "gzip"
+            headers["Vary"] = "Accept-Encoding"
+            return Response(
+                content=body.gzip(), media_type="application/json", headers=headers
+            )
+        body = body.raw
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _cache_key(endpoint: str, *params: Any) -> tuple:
+    book = service.book
+    return (endpoint, *params, book.epoch, book.version)
+
+
+def _counted(results: List[Dict[str, Any]]) -> Tuple[int, Payload]:
+    """Значення для кешу: кількість результатів і готове JSON-тіло."""
+    return len(results), Payload(dumps(results), SETTINGS.api_gzip_level)
+
+
+def _validators(day: date | None = None) -> Dict[str, str]:
+    """ETag (epoch + версія книги) і Last-Modified для поточного стану книги.
+
+    ETag слабкий: той самий стан книги віддається і як identity-, і як
+    gzip-тіло, а це різні байти. Для відповідей, що залежать від дати,
+    `day` входить в ETag, а Last-Modified не раніший за початок цього дня.
+    """
+    book = service.book
+    tag = f"{book.epoch}-{book.version}"
+    if day is not None:
+        tag += f"-{day.isoformat()}"
+    headers = {"ETag": f'W/"{tag}"'}
+
+    stamps: List[datetime] = []
+    if book.last_modified:
+        try:
+            lm = datetime.fromisoformat(book.last_modified)
+        except ValueError:
+            lm = None
+        if lm is not None:
+            stamps.append(lm if lm.tzinfo else lm.replace(tzinfo=timezone.utc))
+    if day is not None:
+        stamps.append(datetime.combine(day, time.min).astimezone())
+    if stamps:
+        headers["Last-Modified"] = format_datetime(
+            max(stamps).astimezone(timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def _is_not_modified(request: Request, validators: Dict[str, str]) -> bool:
+    """Перевіряє If-None-Match / If-Modified-Since (RFC 9110, розд. 13)."""
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        # If-None-Match має пріоритет і використовує слабке порівняння
+        tags = {t.strip().removeprefix("W/") for t in inm.split(",")}
+        return "*" in tags or validators["ETag"].removeprefix("W/") in tags
+
+    ims = request.headers.get("if-modified-since")
+    last_modified = validators.get("Last-Modified")
+    if ims and last_modified:
+        try:
+            since = parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return parsedate_to_datetime(last_modified) <= since
+    return False
+
+
+def _conditional(
+    request: Request, response: Response, day: date | None = None
+) -> Optional[Response]:
+    """Повертає 304-відповідь, якщо клієнт має актуальну копію.
+
+    Інакше додає валідатори до `response` і повертає None. Викликається до
+    звернення до книги, тож 304 коштує лише порівняння рядків.
+    """
+    validators = _validators(day)
+    if _is_not_modified(request, validators):
+        return Response(status_code=304, headers=validators)
+    response.headers.update(validators)
+    return None
+
+
+CONTACT_FIELDS = ("name", "phone", "birthday", "notes", "created_at", "updated_at")
+
+
+def _encode_cursor(name: str) -> str:
+    """Непрозорий курсор сторінки — ім'я останнього запису в base64."""
+    return base64.urlsafe_b64encode(name.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def _parse_fields(fields: str | None) -> List[str] | None:
+    if fields is None:
+        return None
+    keys = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [k for k in keys if k not in CONTACT_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return keys or None
 
 
 @app.get("/contacts")
-def list_contacts():
-    logger.info("HTTP: list contacts")
-    return service.all()
+def list_contacts(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=SETTINGS.api_max_page_size),
+    cursor: Optional[str] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    if cursor is not None and after is not None:
+        raise HTTPException(status_code=400, detail="Use either cursor or after")
+    # помилки параметрів мають пріоритет над 304
+    start = _decode_cursor(cursor) if cursor is not None else after
+    keys = _parse_fields(fields)
+    not_modified = _conditional(request, response)
+    if not_modified is not None:
+        return not_modified
+    response.headers["X-Total-Count"] = str(service.count())
+
+    if start is None and limit is None and keys is None:
+        # Повний список — готові байти без валідації і серіалізації
+        logger.info("HTTP: list contacts (full listing)")
+        return _json_bytes(
+            _encoded().listing_payload(SETTINGS.api_gzip_level), response, request
+        )
+
+    # Ім'я потрібне для курсора, навіть якщо клієнт його не просив
+    drop_name = keys is not None and "name" not in keys
+    if drop_name:
+        keys = [*keys, "name"]
+
+    # Беремо на один запис більше, щоб дізнатися, чи є наступна сторінка
+    probe = limit + 1 if limit is not None else None
+    records = service.page(after=start, limit=probe, fields=keys)
+
+    if limit is not None and len(records) > limit:
+        records = records[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(records[-1]["name"])
+    if drop_name:
+        for rec in records:
+            del rec["name"]
+
+    logger.info("HTTP: list contacts -> %d records", len(records))
+    return records
+
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _export_filter(
+    q: str | None, has_birthday: bool | None, updated_since: str | None
+) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Будує предикат фільтрації для експорту (None — без фільтра)."""
+    q_low = q.strip().casefold() if q and q.strip() else None
+    if q_low is None and has_birthday is None and updated_since is None:
+        return None
+
+    def predicate(rec: Dict[str, Any]) -> bool:
+        if q_low is not None and not (
+            q_low in str(rec.get("name", "")).casefold()
+            or q_low in str(rec.get("phone", ""))
+        ):
+            return False
+        if has_birthday is not None and bool(rec.get("birthday")) != has_birthday:
+            return False
+        if updated_since is not None and str(rec.get("updated_at") or "") <= (
+            updated_since
+        ):
+            return False
+        return True
+
+    return predicate
+
+
+def _export_lines(records: Iterator[Dict[str, Any]], fmt: str) -> Iterator[str]:
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(CONTACT_FIELDS)
+        for rec in records:
+            writer.writerow(
+                ["" if rec.get(k) is None else rec[k] for k in CONTACT_FIELDS]
+            )
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        yield buf.getvalue()
+    else:
+        for rec in records:
+            yield json.dumps(rec, ensure_ascii=False) + "\n"
+
+
+def _export_chunks(lines: Iterator[str], compress: bool) -> Iterator[bytes]:
+    """Групує рядки в чанки ~64 КіБ і за потреби стискає їх потоково (gzip)."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    parts: List[str] = []
+    size = 0
+    for line in lines:
+        parts.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            data = "".join(parts).encode("utf-8")
+            parts, size = [], 0
+            if gz is not None:
+                data = gz.compress(data)
+            if data:
+                yield data
+    data = "".join(parts).encode("utf-8")
+    if gz is not None:
+        data = gz.compress(data) + gz.flush()
+    if data:
+        yield data
+
+
+@app.get("/contacts/export")
+def export_contacts(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    compress: bool = Query(False, alias="gzip"),
+    q: Optional[str] = None,
+    has_birthday: Optional[bool] = None,
+    updated_since: Optional[str] = None,
+):
+    """Потоковий експорт усієї книги у NDJSON або CSV у порядку імен.
+
+    Записи серіалізуються по одному під час відправки, тож пам'ять сервера
+    не залежить від розміру книги.
+    """
+    predicate = _export_filter(q, has_birthday, updated_since)
+    records = service.iter_sorted(predicate)
+    headers = {
+        "Content-Disposition": f'attachment; filename="contacts.{export_format}"'
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    logger.info("HTTP: export contacts as %s (gzip=%s)", export_format, compress)
+    return StreamingResponse(
+        _export_chunks(_export_lines(records, export_format), compress),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
+    )
+
+
+def _batch_response(applied: bool, results: List[Dict[str, Any]]):
+    body = {"applied": applied, "results": results}
+    if not applied:
+        return JSONResponse(status_code=400, content=body)
+    return body
+
+
+def _check_batch_size(size: int) -> None:
+    if size > SETTINGS.api_max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {SETTINGS.api_max_batch_size} items)",
+        )
+
+
+@app.post("/contacts/batch")
+def create_contacts_batch(payload: List[ContactIn]):
+    _check_batch_size(len(payload))
+    applied, results = service.add_many([p.model_dump() for p in payload])
+    logger.info("HTTP: batch create %d contacts -> applied=%s", len(payload), applied)
+    return _batch_response(applied, results)
+
+
+@app.patch("/contacts/batch")
+def update_contacts_batch(payload: List[ContactPatch]):
+    _check_batch_size(len(payload))
+    applied, results = service.change_many([p.model_dump() for p in payload])
+    logger.info("HTTP: batch update %d contacts -> applied=%s", len(payload), applied)
+    return _batch_response(applied, results)
+
+
+@app.delete("/contacts/batch")
+def delete_contacts_batch(names: Annotated[List[str], Body()]):
+    _check_batch_size(len(names))
+    applied, results = service.remove_many(names)
+    logger.info("HTTP: batch delete %d contacts -> applied=%s", len(names), applied)
+    return _batch_response(applied, results)
+
+
+# ---------- Потік змін (SSE) ----------
+
+# Пауза перед перепідключенням, яку радимо EventSource-клієнтам
+SSE_RETRY_MS = 3000
+# У спільному режимі чужі зміни видно лише після дочитування журналу
+SSE_SHARED_POLL_SECONDS = 1.0
+
+
+def _sse(event: str, data: Any, event_id: str | None = None) -> bytes:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + dumps(data).decode("utf-8"))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def _parse_event_id(value: str | None, epoch: str) -> int | None:
+    """Версія з Last-Event-ID виду `epoch-version` або None, якщо id чужий."""
+    if not value:
+        return None
+    ev_epoch, _, version = value.strip().rpartition("-")
+    if ev_epoch != epoch or not version.isdigit():
+        return None
+    return int(version)
+
+
+def _sse_backlog(feed: ChangeFeed, cursor: int) -> Tuple[int, List[bytes]]:
+    """Кадри SSE для подій після `cursor` і новий курсор.
+
+    Якщо частину подій уже витіснено з кільця — один кадр `reset` з
+    поточною версією замість них.
+    """
+    events, complete = feed.since(cursor)
+    if not complete:
+        cursor = feed.last_version
+        return cursor, [_sse("reset", {"version": cursor}, f"{feed.epoch}-{cursor}")]
+    frames = []
+    for event in events:
+        cursor = event["version"]
+        frames.append(_sse(event["op"], event, f"{feed.epoch}-{cursor}"))
+    return cursor, frames
+
+
+async def _sse_events(
+    request: Request,
+    feed: ChangeFeed,
+    last_event_id: str | None = None,
+    heartbeat: float = SETTINGS.sse_heartbeat_seconds,
+    refresh: Callable[[], Any] | None = None,
+) -> AsyncIterator[bytes]:
+    """Генератор SSE: спершу пропущені події з кільця, далі — нові.
+
+    Підписник чекає на asyncio.Event, який ChangeFeed встановлює при кожній
+    зміні, тож очікування не займає потік з threadpool. Якщо Last-Event-ID
+    з іншої епохи або події вже витіснено з кільця, надсилається `reset`:
+    клієнт має перечитати /contacts і продовжити з нового id.
+    """
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    feed.add_waiter(loop, wake)
+    poll = min(heartbeat, SSE_SHARED_POLL_SECONDS) if refresh else heartbeat
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n".encode("ascii")
+        cursor = _parse_event_id(last_event_id, feed.epoch)
+        if cursor is None:
+            cursor = feed.last_version
+            if last_event_id:
+                yield _sse("reset", {"version": cursor}, f"{feed.epoch}-{cursor}")
+        idle = 0.0
+        while True:
+            wake.clear()
+            cursor, frames = _sse_backlog(feed, cursor)
+            if frames:
+                for frame in frames:
+                    yield frame
+                idle = 0.0
+                continue
+            if await request.is_disconnected():
+                return
+            try:
+                await asyncio.wait_for(wake.wait(), poll)
+            except asyncio.TimeoutError:
+                if refresh is not None:
+                    # flock і читання журналу — поза циклом подій
+                    await run_in_threadpool(refresh)
+                idle += poll
+                if idle >= heartbeat:
+                    idle = 0.0
+                    yield b": keep-alive\n\n"
+    finally:
+        feed.remove_waiter(loop, wake)
+
+
+@app.get("/contacts/stream")
+async def stream_contacts(request: Request, last_event_id: str | None = None):
+    """Server-sent events: add/change/remove/rename/reset з версією книги.
+
+    Відновлення — заголовок Last-Event-ID (його шле EventSource) або
+    параметр `last_event_id`.
+    """
+    resume = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        _sse_events(
+            request,
+            service.feed,
+            resume,
+            refresh=service.refresh if SHARED_DATA else None,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/contacts/changes")
+def contact_changes(since: str | None = None, epoch: str | None = None):
+    """Дельта-синхронізація: записи, змінені після `since`, і tombstone-и.
+
+    `since` — версія книги з попередньої відповіді або ISO-мітка часу.
+    Версії дійсні лише в межах `epoch` (лічильник свій у кожного процесу),
+    тож версія без `epoch` або з чужою епохою, відсутній `since` чи надто
+    стара точка дають повну відповідь (`full: true`).
+    """
+    version: int | None = None
+    timestamp: str | None = None
+    if since and since.isdigit() and epoch == service.book.epoch:
+        version = int(since)
+    elif since and not since.isdigit():
+        try:
+            datetime.fromisoformat(since.replace("Z", "+00:00"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail="Invalid since") from e
+        timestamp = since
+    changes, full, current = service.changes_since(version=version, timestamp=timestamp)
+    logger.info("HTTP: changes since=%s -> %d (full=%s)", since, len(changes), full)
+    body = {
+        "epoch": service.book.epoch,
+        "version": current,
+        "full": full,
+        "changes": changes,
+    }
+    return Response(content=dumps(body), media_type="application/json")
 
 
 @app.get("/contacts/{name}")
-def get_contact(name: str):
+def get_contact(name: str, request: Request, response: Response):
+    try:
+        key = validate_name(name)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail="Contact not found") from e
+    not_modified = _conditional(request, response)
+    if not_modified is not None:
+        return not_modified
     try:
-        return service.get(name)
+        body = _encoded().record(key)
     except Exception as e:
         logger.exception("HTTP get_contact failed: %s", name)
         raise HTTPException(status_code=404, detail="Contact not found") from e
+    if body is None:
+        logger.info("HTTP get_contact: not found %s", name)
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return _json_bytes(body, response)
+
+
+def _write_error_status(e: Exception) -> int:
+    """400 для помилок запиту; 500, якщо зміну не вдалося записати на диск."""
+    return 500 if isinstance(e, PersistenceError) else 400
 
 
 @app.post("/contacts", status_code=201)
@@ -52,7 +694,7 @@ def create_contact(payload: ContactIn):
         return {"status": "ok"}
     except Exception as e:
         logger.exception("HTTP create_contact failed: %s", e)
-        raise HTTPException(status_code=400, detail=str(e)) from e
+        raise HTTPException(status_code=_write_error_status(e), detail=str(e)) from e
 
 
 @app.put("/contacts/{name}")
@@ -65,7 +707,7 @@ def update_contact(name: str, payload: ContactIn):
         return {"status": "ok"}
     except Exception as e:
         logger.exception("HTTP update_contact failed: %s", e)
-        raise HTTPException(status_code=400, detail=str(e)) from e
+        raise HTTPException(status_code=_write_error_status(e), detail=str(e)) from e
 
 
 @app.delete("/contacts/{name}")
@@ -76,32 +718,89 @@ def delete_contact(name: str):
         return {"status": "ok"}
     except Exception as e:
         logger.exception("HTTP delete_contact failed: %s", e)
-        raise HTTPException(status_code=400, detail=str(e)) from e
+        raise HTTPException(status_code=_write_error_status(e), detail=str(e)) from e
 
 
 @app.get("/fsearch")
-def http_fuzzy_search(query: str):
+def http_fuzzy_search(query: str, request: Request, response: Response):
     if not query:
         raise HTTPException(status_code=400, detail="Query is required")
+    not_modified = _conditional(request, response)
+    if not_modified is not None:
+        return not_modified
     try:
-        from utils import fuzzy_search
-
-        results = fuzzy_search(query, service.all())
-        logger.info("HTTP: fuzzy search '%s' -> %d results", query, len(results))
-        return results
+        count, body = response_cache.get_or_compute(
+            # той самий ключ для запитів, які індекс вважає однаковими
+            _cache_key("fsearch", normalize_query(query)),
+            lambda: _counted(service.fuzzy_search(query)),
+        )
+        logger.info("HTTP: fuzzy search '%s' -> %d results", query, count)
+        return _json_bytes(body, response, request)
     except Exception as e:
         logger.exception("HTTP fuzzy search failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@app.get("/phone-search")
+def http_phone_search(
+    query: str,
+    request: Request,
+    response: Response,
+    mode: str = "any",
+    limit: int = Query(50, ge=1, le=SETTINGS.api_max_page_size),
+):
+    """Пошук за початком/кінцем номера (mode: any, prefix, suffix)."""
+    if mode not in PHONE_SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown mode: {mode}")
+    if not any(ch.isdigit() for ch in query):
+        raise HTTPException(status_code=400, detail="Phone query must contain digits")
+    not_modified = _conditional(request, response)
+    if not_modified is not None:
+        return not_modified
+    try:
+        count, body = response_cache.get_or_compute(
+            _cache_key("phone-search", query.strip(), mode, limit),
+            lambda: _counted(service.search_phone(query, mode=mode, limit=limit)),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    logger.info("HTTP: phone search '%s' (%s) -> %d results", query, mode, count)
+    return _json_bytes(body, response, request)
+
+
+@app.post("/fsearch/batch")
+def http_fuzzy_search_batch(payload: FuzzyBatchIn):
+    """Нечіткий пошук для багатьох запитів: топ-`limit` для кожного, по порядку."""
+    _check_batch_size(len(payload.queries))
+    try:
+        results = service.fuzzy_search_many(
+            payload.queries, limit=payload.limit, score_cutoff=payload.score_cutoff
+        )
+    except Exception as e:
+        logger.exception("HTTP batch fuzzy search failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    logger.info("HTTP: batch fuzzy search %d queries", len(payload.queries))
+    body = [
+        {"query": q, "results": found}
+        for q, found in zip(payload.queries, results, strict=True)
+    ]
+    return Response(content=dumps(body), media_type="application/json")
+
+
 @app.get("/birthdays")
-def list_upcoming_birthdays(days: int = 7):
+def list_upcoming_birthdays(request: Request, response: Response, days: int = 7):
+    # Результат залежить ще й від сьогоднішньої дати
+    today = date.today()
+    not_modified = _conditional(request, response, day=today)
+    if not_modified is not None:
+        return not_modified
     try:
-        results = service.upcoming_birthdays(days=days)
-        logger.info(
-            "HTTP: upcoming birthdays next %d days -> %d results", days, len(results)
+        count, body = response_cache.get_or_compute(
+            _cache_key("birthdays", days, today.isoformat()),
+            lambda: _counted(service.upcoming_birthdays(days=days)),
         )
-        return results
+        logger.info("HTTP: upcoming birthdays next %d days -> %d results", days, count)
+        return _json_bytes(body, response, request)
     except Exception as e:
         logger.exception("HTTP birthdays failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""Навантажувальний бенчмарк HTTP API на синтетичній книзі.
+
+Використання:
+  bin/bench_api.py --contacts 100k --concurrency 32 --requests 5000
+  bin/bench_api.py --mode uvicorn --workers 2 --duration 30 --out bench.json
+  bin/bench_api.py --mix read=60,page=10,write=10,fuzzy=10,birthdays=10
+
+Книга генерується детерміновано з --seed у тимчасовій директорії (або в
+--data-dir). Режим inprocess ганяє `api_server.app` через ASGI-транспорт
+httpx без мережі; режим uvicorn запускає окремий процес сервера на
+localhost. Результат — JSON з пропускною здатністю і p50/p95/p99 латентності
+загалом і по кожному типу запитів, тож прогони легко порівнювати.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from storage import save_contacts_json  # noqa: E402
+
+DEFAULT_MIX = "read=50,page=10,write=10,fuzzy=15,birthdays=15"
+SYLLABLES = ["ан", "бо", "ва", "ге", "да", "ко", "ла", "мі", "на", "ос", "пе", "ро"]
+
+
+def parse_size(value: str) -> int:
+    """'1k' -> 1000, '100k' -> 100000, '1m' -> 1000000."""
+    value = value.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    if factor != 1:
+        value = value[:-1]
+    return int(float(value) * factor)
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix: Dict[str, int] = {}
+    for part in value.split(","):
+        op, _, weight = part.partition("=")
+        if op.strip() not in OPS:
+            raise argparse.ArgumentTypeError(f"Unknown operation: {op}")
+        mix[op.strip()] = int(weight)
+    return mix
+
+
+def contact_name(i: int) -> str:
+    return f"Bench {i:07d}"
+
+
+def synthetic_book(data_dir: Path, size: int, seed: int) -> None:
+    """Записує contacts.json з `size` контактами (≈30% з днем народження)."""
+    rnd = random.Random(seed)
+    today = date.today()
+    stamp = "2024-01-01T00:00:00+00:00"
+    contacts: Dict[str, Dict[str, Any]] = {}
+    for i in range(size):
+        name = contact_name(i)
+        birthday = None
+        if rnd.random() < 0.3:
+            day = today - timedelta(days=rnd.randrange(365 * 18, 365 * 70))
+            birthday = day.isoformat()
+        contacts[name] = {
+            "name": name,
+            "phone": f"+380{500000000 + i:09d}",
+            "created_at": stamp,
+            "updated_at": stamp,
+            "birthday": birthday,
+            "notes": rnd.choice(SYLLABLES) + rnd.choice(SYLLABLES),
+        }
+    save_contacts_json(
+        data_dir / "contacts.json", contacts, stamp, enable_backups=False
+    )
+
+
+# ---------- операції навантаження ----------
+
+
+class Workload:
+    def __init__(self, size: int, seed: int, worker: int) -> None:
+        self.size = size
+        self.rnd = random.Random(seed * 1000 + worker)
+        self.worker = worker
+        self.writes = 0
+
+    def pick(self) -> str:
+        return contact_name(self.rnd.randrange(self.size))
+
+    async def read(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"/contacts/{self.pick()}")
+
+    async def page(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(
+            "/contacts", params={"limit": 100, "after": self.pick()}
+        )
+
+    async def write(self, client: httpx.AsyncClient) -> httpx.Response:
+        self.writes += 1
+        # унікальні ім'я і телефон для кожного воркера
+        serial = self.worker * 1_000_000 + self.writes
+        return await client.post(
+            "/contacts",
+            json={"name": f"Write {serial:09d}", "phone": f"+381{serial:09d}"},
+        )
+
+    async def fuzzy(self, client: httpx.AsyncClient) -> httpx.Response:
+        # частина імені з перестановкою двох цифр — неточний запит
+        digits = list(f"{self.rnd.randrange(self.size):07d}")
+        k = self.rnd.randrange(len(digits) - 1)
+        digits[k], digits[k + 1] = digits[k + 1], digits[k]
+        return await client.get(
+            "/fsearch", params={"query": "Bench " + "".join(digits)}
+        )
+
+    async def birthdays(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get("/birthdays", params={"days": self.rnd.choice([7, 30])})
+
+
+OPS = ("read", "page", "write", "fuzzy", "birthdays")
+
+
+# ---------- клієнти ----------
+
+
+@asynccontextmanager
+async def inprocess_client(data_dir: Path) -> AsyncIterator[httpx.AsyncClient]:
+    os.environ["AB_DATA_DIR"] = str(data_dir)
+    from api_server import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(
+    data_dir: Path, workers: int, concurrency: int
+) -> AsyncIterator[httpx.AsyncClient]:
+    port = _free_port()
+    env = dict(os.environ, AB_DATA_DIR=str(data_dir))
+    if workers > 1:
+        env["AB_SHARED_DATA"] = "1"
+    cmd = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "api_server:app",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+    ]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60.0
+        ) as client:
+            deadline = time.monotonic() + 600
+            while True:
+                if proc.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                try:
+                    if (await client.get("/ready")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("API did not become ready")
+                await asyncio.sleep(0.2)
+            yield client
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+# ---------- прогін і звіт ----------
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Перцентиль методом найближчого рангу."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    values = sorted(samples)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    size: int,
+    mix: Dict[str, int],
+    concurrency: int,
+    requests: int | None,
+    duration: float | None,
+    seed: int,
+) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    ops = list(mix)
+    weights = [mix[op] for op in ops]
+    latencies: Dict[str, List[float]] = {op: [] for op in ops}
+    errors: Dict[str, int] = dict.fromkeys(ops, 0)
+    remaining = requests
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    async def worker(index: int) -> None:
+        nonlocal remaining
+        load = Workload(size, seed, index)
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+            op = load.rnd.choices(ops, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                response = await getattr(load, op)(client)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies[op].append(time.perf_counter() - t0)
+            if not ok:
+                errors[op] += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run(args: argparse.Namespace, data_dir: Path) -> Dict[str, Any]:
+    size = parse_size(args.contacts)
+    t0 = time.perf_counter()
+    synthetic_book(data_dir, size, args.seed)
+    generate_s = time.perf_counter() - t0
+
+    if args.mode == "inprocess":
+        client_cm = inprocess_client(data_dir)
+    else:
+        client_cm = uvicorn_client(data_dir, args.workers, args.concurrency)
+    t0 = time.perf_counter()
+    async with client_cm as client:
+        startup_s = time.perf_counter() - t0
+        latencies, errors, elapsed = await drive(
+            client,
+            size,
+            args.mix,
+            args.concurrency,
+            None if args.duration else args.requests,
+            args.duration,
+            args.seed,
+        )
+
+    everything = [x for values in latencies.values() for x in values]
+    return {
+        "config": {
+            "mode": args.mode,
+            "contacts": size,
+            "concurrency": args.concurrency,
+            "workers": args.workers if args.mode == "uvicorn" else 1,
+            "mix": args.mix,
+            "seed": args.seed,
+            "python": sys.version.split()[0],
+        },
+        "setup": {
+            "generate_s": round(generate_s, 3),
+            "startup_s": round(startup_s, 3),
+        },
+        "total": summarize(everything, sum(errors.values()), elapsed),
+        "ops": {
+            op: summarize(values, errors[op], elapsed)
+            for op, values in latencies.items()
+        },
+    }
+
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    p = argparse.ArgumentParser(prog="bench_api", description=__doc__.splitlines()[0])
+    p.add_argument("--contacts", default="1k", help="Book size: 1k, 100k, 1m, ...")
+    p.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    p.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument(
+        "--duration", type=float, default=None, help="Seconds; overrides --requests"
+    )
+    p.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--data-dir", default=None, help="Keep the generated book here")
+    p.add_argument("--out", default=None, help="Write the JSON report to a file")
+    args = p.parse_args(argv)
+
+    if args.data_dir:
+        data_dir = Path(args.data_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        report = asyncio.run(run(args, data_dir))
+    else:
+        with tempfile.TemporaryDirectory(prefix="bench_api_") as tmp:
+            report = asyncio.run(run(args, Path(tmp)))
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
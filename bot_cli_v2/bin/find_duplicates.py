@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Пошук майже однакових контактів у книзі і звіт з пропозиціями злиття.
+
+Використання:
+  bin/find_duplicates.py --data-dir PATH --out duplicates.csv
+  bin/find_duplicates.py --data-dir PATH --out duplicates.json --threshold 85
+
+Формат звіту визначається розширенням --out (або --format).
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import AppService
+from dedup import find_duplicates, write_suggestions
+
+
+def main():
+    p = argparse.ArgumentParser(prog="find_duplicates")
+    p.add_argument("--data-dir", required=True)
+    p.add_argument("--out", default="duplicates.csv")
+    p.add_argument("--format", choices=("csv", "json"), default=None)
+    p.add_argument(
+        "--threshold", type=float, default=None, help="Name similarity 0-100"
+    )
+    p.add_argument(
+        "--max-block", type=int, default=None, help="Skip blocking keys shared by more"
+    )
+    p.add_argument("--workers", type=int, default=-1, help="-1 = all cores")
+    args = p.parse_args()
+
+    out = Path(args.out)
+    fmt = args.format or ("json" if out.suffix.lower() == ".json" else "csv")
+
+    start = time.perf_counter()
+    service = AppService(Path(args.data_dir), enable_backups=False)
+    pairs = find_duplicates(
+        service.iter_sorted(),
+        threshold=args.threshold,
+        max_block=args.max_block,
+        workers=args.workers,
+    )
+    n = write_suggestions(pairs, out, fmt)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Found {n} duplicate pairs among {service.count()} contacts "
+        f"in {elapsed:.1f}s -> {out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
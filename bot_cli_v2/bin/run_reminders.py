@@ -3,15 +3,23 @@
 
 Використання:
   bin/run_reminders.py --data-dir PATH --out reminders.csv [--days N] [--send-email]
+                       [--per-recipient]
 
 Змінні оточення для SMTP (якщо --send-email):
   SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASS, SMTP_FROM, SMTP_TO
 """
 
 import argparse
+import sys
 from pathlib import Path
 
-from reminder import export_reminders, send_reminders_email
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reminder import (
+    export_reminders,
+    send_reminders_email,
+    send_reminders_per_recipient,
+)
 
 
 def main():
@@ -24,12 +32,25 @@ def main():
         action="store_true",
         help="Send reminders via SMTP (env vars required)",
     )
+    p.add_argument(
+        "--per-recipient",
+        action="store_true",
+        help="With --send-email: a separate message to each SMTP_TO address",
+    )
     args = p.parse_args()
 
     data_dir = Path(args.data_dir)
     out = Path(args.out)
 
-    if args.send_email:
+    if args.send_email and args.per_recipient:
+        # один лист кожному адресату, одним SMTP-з'єднанням
+        results = send_reminders_per_recipient(data_dir, None, days=args.days)
+        for r in results:
+            status = "sent" if r.ok else f"failed ({r.error})"
+            print(f"{r.recipient}: {status}, attempts={r.attempts}")
+        if not all(r.ok for r in results):
+            sys.exit(1)
+    elif args.send_email:
         # викличе виняток якщо змінні оточення SMTP не налаштовано
         result = send_reminders_email(data_dir, None, days=args.days)
         print(result)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import calendar
+import threading
+from datetime import date, timedelta
+from typing import Any, Dict, List, Set, Tuple
+
+from address_book import AddressBook
+from exceptions import ContactNotFoundError
+from utils import parse_iso_date
+
+MonthDay = Tuple[int, int]
+
+FEB_29: MonthDay = (2, 29)
+
+
+class BirthdayIndex:
+    """Індекс днів народження за (місяць, день).
+
+    Рядок `birthday` кожного запису розбирається один раз (utils.
+    parse_iso_date) при побудові або зміні запису; далі дати зберігаються
+    поруч як (рік, місяць, день), а імена розкладені по кошиках днів року.
+    Найближчі дні народження — це перегляд кошиків наступних `days` днів
+    календаря, без розбору рядків і без обходу всієї книги.
+
+    Народжені 29 лютого в невисокосні роки святкують 28 лютого.
+    Записи з невалідною датою індекс пропускає.
+    """
+
+    def __init__(self, book: AddressBook) -> None:
+        self.book = book
+        self._lock = threading.Lock()
+        self._built = False
+        self._dates: Dict[str, Tuple[int, int, int]] = {}
+        self._by_day: Dict[MonthDay, Set[str]] = {}
+        book.add_listener(self._on_change)
+
+    def build(self) -> None:
+        with self._lock:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._dates = {}
+        self._by_day = {}
+        for rec in self.book.iter_sorted(lambda r: bool(r.get("birthday"))):
+            self._store(rec["name"], rec.get("birthday"))
+        self._built = True
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def get(self, name: str) -> Tuple[int, int, int] | None:
+        """Розібрана дата народження контакту (рік, місяць, день) або None."""
+        with self._lock:
+            if not self._built:
+                self._rebuild()
+            return self._dates.get(name)
+
+    # ---------- оновлення ----------
+
+    def _on_change(self, op: str, name: str | None, old_name: str | None) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            if op == "reset" or name is None:
+                self._rebuild()
+                return
+            if old_name is not None:
+                self._release(old_name)
+            self._release(name)
+            if op != "remove":
+                self._store(name, self.book.get_record(name).get("birthday"))
+
+    def _store(self, name: str, birthday: str | None) -> None:
+        parsed = parse_iso_date(str(birthday).strip()) if birthday else None
+        if parsed is None:
+            return
+        self._dates[name] = parsed
+        self._by_day.setdefault(parsed[1:], set()).add(name)
+
+    def _release(self, name: str) -> None:
+        parsed = self._dates.pop(name, None)
+        if parsed is None:
+            return
+        names = self._by_day[parsed[1:]]
+        names.discard(name)
+        if not names:
+            del self._by_day[parsed[1:]]
+
+    # ---------- запити ----------
+
+    def upcoming(self, days: int, today: date | None = None) -> List[Tuple[str, int]]:
+        """(ім'я, днів до дня народження) на найближчі `days` днів включно.
+
+        Порядок — за кількістю днів, при рівних — за ім'ям. Кожен контакт
+        потрапляє один раз, з найближчою датою.
+        """
+        today = today or date.today()
+        out: List[Tuple[str, int]] = []
+        seen: Set[MonthDay] = set()
+        with self._lock:
+            if not self._built:
+                self._rebuild()
+            # за рік (366 днів) кожен кошик трапиться хоча б раз
+            for offset in range(min(days, 366) + 1):
+                day = today + timedelta(days=offset)
+                keys = [(day.month, day.day)]
+                if keys[0] == (2, 28) and not calendar.isleap(day.year):
+                    keys.append(FEB_29)
+                found: List[str] = []
+                for key in keys:
+                    names = self._by_day.get(key)
+                    if names and key not in seen:
+                        seen.add(key)
+                        found.extend(names)
+                out.extend((name, offset) for name in sorted(found))
+        return out
+
+    def records(self, days: int, today: date | None = None) -> List[Dict[str, Any]]:
+        """Записи з днем народження в найближчі `days` днів, з ключем `days_until`.
+
+        Порядок — як у `upcoming`.
+        """
+        out: List[Dict[str, Any]] = []
+        for name, days_until in self.upcoming(days, today=today):
+            try:
+                rec = self.book.get_record(name)
+            except ContactNotFoundError:
+                # запис видалено між запитом до індексу і читанням
+                continue
+            rec["days_until"] = days_until
+            out.append(rec)
+        return out
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Set, Tuple
+
+from address_book import AddressBook
+
+
+class ChangeFeed:
+    """Обмежене кільце подій змін книги для підписників (SSE).
+
+    Кожна подія має `version` — версію книги після зміни; версії йдуть
+    підряд, тож за `since()` легко зрозуміти, чи клієнт пропустив події,
+    які вже випали з кільця (тоді йому потрібне повне перечитування).
+    """
+
+    def __init__(self, book: AddressBook, maxlen: int = 1000) -> None:
+        self.book = book
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        # версія останньої події в кільці; оновлюється разом з кільцем, тож
+        # since() не бачить версії, подію якої ще не додано
+        self._last = book.version
+        book.add_listener(self._on_change)
+
+    @property
+    def epoch(self) -> str:
+        return self.book.epoch
+
+    @property
+    def last_version(self) -> int:
+        with self._lock:
+            return self._last
+
+    def _on_change(self, op: str, name: str | None, old_name: str | None) -> None:
+        record = None
+        if op in ("add", "change", "rename") and name is not None:
+            record = self.book.get_record(name)
+        event = {
+            "version": self.book.version,
+            "op": op,
+            "name": name,
+            "old_name": old_name,
+            "record": record,
+            "updated_at": self.book.last_modified,
+        }
+        with self._lock:
+            self._events.append(event)
+            self._last = event["version"]
+            waiters = list(self._waiters)
+        for loop, wake in waiters:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                # цикл подій уже закритий — підписник зник
+                self.remove_waiter(loop, wake)
+
+    def since(self, version: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """Події з версією > `version` і прапорець повноти.
+
+        False означає, що частина подій уже витіснена з кільця або версія
+        належить іншій історії — клієнту слід перечитати книгу повністю.
+        """
+        with self._lock:
+            events = list(self._events)
+            current = self._last
+        if version > current:
+            return [], False
+        if version == current:
+            return [], True
+        if not events or events[0]["version"] > version + 1:
+            return [], False
+        return [e for e in events if e["version"] > version], True
+
+    def add_waiter(self, loop: asyncio.AbstractEventLoop, wake: asyncio.Event) -> None:
+        """Реєструє asyncio.Event, який буде встановлено при кожній зміні."""
+        with self._lock:
+            self._waiters.add((loop, wake))
+
+    def remove_waiter(
+        self, loop: asyncio.AbstractEventLoop, wake: asyncio.Event
+    ) -> None:
+        with self._lock:
+            self._waiters.discard((loop, wake))
+
+
+# Мітка для `updated_at`, які не є ISO 8601 (старі або ручні дані)
+_OLDEST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _parse_ts(value: str) -> datetime:
+    """ISO-мітка часу як aware datetime; нерозбірна вважається найстарішою."""
+    try:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return _OLDEST
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+class ChangeIndex:
+    """Впорядкований за часом зміни індекс записів з tombstone-ами.
+
+    Для кожного імені зберігається остання версія книги і `updated_at`, а
+    видалені та перейменовані імена лишаються як tombstone. Записи тримаються
+    в порядку змін (OrderedDict + move_to_end), тож запит "що змінилося з X"
+    проходить лише хвіст індексу, а не всю книгу.
+
+    Видалення, що сталися до побудови індексу або до витіснення найстаріших
+    tombstone-ів, невідомі: для `since` раніше за цю межу відповідь
+    позначається як повна (`full`) — клієнту слід замінити свою копію.
+    """
+
+    def __init__(self, book: AddressBook, max_tombstones: int = 10000) -> None:
+        self.book = book
+        self.max_tombstones = max_tombstones
+        self._lock = threading.Lock()
+        # name -> (version, updated_at, deleted)
+        self._entries: "OrderedDict[str, Tuple[int, str, bool]]" = OrderedDict()
+        self._tombstones = 0
+        self._floor_version = 0
+        self._floor_time: datetime | None = None
+        self._rebuild()
+        book.add_listener(self._on_change)
+
+    def _rebuild(self) -> None:
+        records = sorted(
+            self.book.iter_sorted(), key=lambda r: _parse_ts(r["updated_at"])
+        )
+        version = self.book.version
+        self._entries = OrderedDict(
+            (r["name"], (version, r["updated_at"], False)) for r in records
+        )
+        self._tombstones = 0
+        # версії записів до цього моменту невідомі
+        self._floor_version = version
+        self._floor_time = datetime.now(timezone.utc)
+
+    def _on_change(self, op: str, name: str | None, old_name: str | None) -> None:
+        with self._lock:
+            if op == "reset" or name is None:
+                self._rebuild()
+                return
+            version = self.book.version
+            now = self.book.last_modified or datetime.now(timezone.utc).isoformat()
+            if old_name is not None:
+                self._put(old_name, (version, now, True))
+            if op == "remove":
+                self._put(name, (version, now, True))
+            else:
+                updated = self.book.get_record(name)["updated_at"]
+                self._put(name, (version, updated, False))
+            self._trim()
+
+    def _put(self, name: str, entry: Tuple[int, str, bool]) -> None:
+        previous = self._entries.pop(name, None)
+        if previous is not None and previous[2]:
+            self._tombstones -= 1
+        if entry[2]:
+            self._tombstones += 1
+        self._entries[name] = entry
+
+    def _trim(self) -> None:
+        if self._tombstones <= self.max_tombstones:
+            return
+        # витісняємо найстаріший tombstone і піднімаємо межу повноти
+        for name, (version, updated, deleted) in self._entries.items():
+            if deleted:
+                del self._entries[name]
+                self._tombstones -= 1
+                self._floor_version = version
+                self._floor_time = _parse_ts(updated)
+                return
+
+    def since(
+        self, version: int | None = None, timestamp: str | None = None
+    ) -> Tuple[List[Tuple[str, int, str, bool]], bool]:
+        """Зміни після версії `version` або моменту `timestamp` (ISO 8601).
+
+        Повертає ([(name, version, updated_at, deleted)...], full) у порядку
+        змін. При full=True список — усі живі записи без tombstone-ів.
+        """
+        with self._lock:
+            if timestamp is not None:
+                ts = _parse_ts(timestamp)
+                full = self._floor_time is not None and ts < self._floor_time
+            else:
+                full = (
+                    version is None
+                    or version < self._floor_version
+                    or version > self.book.version
+                )
+            if full:
+                return [
+                    (name, v, updated, False)
+                    for name, (v, updated, deleted) in self._entries.items()
+                    if not deleted
+                ], True
+            out: List[Tuple[str, int, str, bool]] = []
+            for name in reversed(self._entries):
+                v, updated, deleted = self._entries[name]
+                if timestamp is not None:
+                    if _parse_ts(updated) <= ts:
+                        break
+                elif v <= version:
+                    break
+                out.append((name, v, updated, deleted))
+        out.reverse()
+        return out, False
@@ -1,17 +1,105 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
 from address_book import AddressBook
+from birthday_index import BirthdayIndex
+from changes import ChangeFeed, ChangeIndex
+from exceptions import (
+    ContactNotFoundError,
+    DuplicateNameError,
+    DuplicatePhoneError,
+    PersistenceError,
+)
+from fuzzy_index import FuzzyIndex
+from group_commit import GroupCommitter
+from journal import SharedStore
+from phone_index import PhoneIndex
 from settings import SETTINGS
 from storage import load_contacts_json, save_contacts_json
-from utils import normalize_phone
+from utils import normalize_phones, validate_name
 
 logger = logging.getLogger("assistant_bot")
 
 
+class _BatchPlan:
+    """Очікуваний стан книги після вже перевірених елементів пакета.
+
+    Повторює перевірки AddressBook.add/change/remove, але результат кожного
+    кроку записує в накладку поверх книги (ім'я -> телефон), а саму книгу
+    не змінює. Так пакет перевіряється цілком до першої зміни.
+    """
+
+    def __init__(self, book: AddressBook) -> None:
+        self.book = book
+        # ім'я -> телефон після попередніх кроків (None — видалено)
+        self._phones: Dict[str, str | None] = {}
+        # лічильники телефонів книги (будуються при першій потребі) і
+        # зміни до них від кроків пакета
+        self._book_counts: Counter[str] | None = None
+        self._delta: Counter[str] = Counter()
+
+    def phone(self, name: str) -> str | None:
+        """Телефон контакту з урахуванням пакета; None — контакту немає."""
+        if name in self._phones:
+            return self._phones[name]
+        try:
+            return self.book.get(name)
+        except ContactNotFoundError:
+            return None
+
+    def add(self, name: str, phone: str) -> None:
+        n = validate_name(name)
+        if self.phone(n) is not None:
+            raise DuplicateNameError("Duplicate name")
+        self._ensure_unique_phone(phone)
+        self._set(n, phone)
+
+    def change(self, name: str, phone: str | None) -> None:
+        """Зміна телефону; phone=None лишає поточний."""
+        n = validate_name(name)
+        current = self.phone(n)
+        if current is None:
+            raise ContactNotFoundError(n)
+        phone = phone or current
+        self._ensure_unique_phone(phone, ignore_name=n)
+        self._set(n, phone)
+
+    def remove(self, name: str) -> None:
+        n = validate_name(name)
+        if self.phone(n) is None:
+            raise ContactNotFoundError(n)
+        self._set(n, None)
+
+    def _set(self, name: str, phone: str | None) -> None:
+        old = self.phone(name)
+        if old is not None:
+            self._delta[old] -= 1
+        if phone is not None:
+            self._delta[phone] += 1
+        self._phones[name] = phone
+
+    def _ensure_unique_phone(self, phone: str, ignore_name: str | None = None) -> None:
+        if self.book.allow_duplicate_phones:
+            return
+        if self._book_counts is None:
+            self._book_counts = Counter(
+                str(r.get("phone")) for r in self.book.iter_sorted()
+            )
+        count = self._book_counts[phone] + self._delta[phone]
+        if ignore_name is not None and self.phone(ignore_name) == phone:
+            count -= 1
+        if count > 0:
+            raise DuplicatePhoneError("Duplicate phone")
+
+
 class AppService:
     """Тонкий шар сервісу поверх AddressBook + збереження для повторного використання в CLI та HTTP API."""
 
@@ -20,21 +108,94 @@ class AppService:
         data_dir: Path,
         enable_backups: bool = True,
         allow_duplicate_phones: bool = False,
+        shared: bool = False,
+        group_commit_window: float | None = None,
     ) -> None:
         self.data_dir = Path(data_dir)
         self.json_path = self.data_dir / "contacts.json"
-        contacts, last_modified = load_contacts_json(self.json_path)
-        self.book = AddressBook(contacts, allow_duplicate_phones=allow_duplicate_phones)
-        if last_modified:
-            self.book.last_modified = last_modified
         self.enable_backups = enable_backups
+        # Лок сервісу серіалізує зміни книги між потоками (HTTP threadpool)
+        self._lock = threading.RLock()
+        # group_commit_window (секунди) вмикає груповий запис для конкурентних
+        # змін; None — кожна зміна зберігається синхронно, як у CLI
+        self._committer: GroupCommitter | None = None
+        if group_commit_window is not None and not shared:
+            self._committer = GroupCommitter(self._group_save, group_commit_window)
+        # Спільний режим (кілька процесів над однією директорією): книгу
+        # завантажує і підтримує актуальною журнал, а не contacts.json напряму
+        self._shared: SharedStore | None = None
+        if shared:
+            self.book = AddressBook(allow_duplicate_phones=allow_duplicate_phones)
+            self._shared = SharedStore(
+                self.json_path,
+                self.book,
+                enable_backups=enable_backups,
+                compact_every=SETTINGS.journal_compact_every,
+            )
+        else:
+            contacts, last_modified = load_contacts_json(self.json_path)
+            self.book = AddressBook(
+                contacts, allow_duplicate_phones=allow_duplicate_phones
+            )
+            if last_modified:
+                self.book.last_modified = last_modified
+        # Кільце останніх змін для підписників (SSE у HTTP API)
+        self.feed = ChangeFeed(self.book, maxlen=SETTINGS.change_feed_size)
+        # Індекс змін за updated_at для дельта-синхронізації
+        self.changes = ChangeIndex(
+            self.book, max_tombstones=SETTINGS.change_index_max_tombstones
+        )
+        # Індекс нечіткого пошуку (будується при першому пошуку або warm_up)
+        self.fuzzy = FuzzyIndex(self.book)
+        # Трії цифр телефонів для пошуку за початком/кінцем номера
+        self.phones = PhoneIndex(self.book)
+        # Розібрані дати народження, розкладені за днями року
+        self.birthdays = BirthdayIndex(self.book)
         # Стеки undo/redo зберігають зворотні операції для відновлення попереднього стану
         self._undo_stack: List[Dict[str, Any]] = []
         self._redo_stack: List[Dict[str, Any]] = []
+        # Стеки на момент останнього успішного group commit (для відкату)
+        self._saved_stacks: Tuple[List[Any], List[Any]] = ([], [])
+
+    def warm_up(self) -> Dict[str, float]:
+        """Заздалегідь будує ліниві індекси книги.
+
+        Повертає тривалість кожної фази в секундах.
+        """
+        phases: Dict[str, float] = {}
+        for phase, build in (
+            ("sorted_names", self.book.sorted_names),
+            ("fuzzy_index", self.fuzzy.build),
+            ("phone_index", self.phones.build),
+            ("birthday_index", self.birthdays.build),
+        ):
+            start = time.perf_counter()
+            build()
+            phases[phase] = time.perf_counter() - start
+        return phases
 
     def all(self) -> List[Dict[str, Any]]:
         return self.book.all_records_sorted()
 
+    def count(self) -> int:
+        return len(self.book)
+
+    def undo_depth(self) -> int:
+        return len(self._undo_stack)
+
+    def page(
+        self,
+        after: str | None = None,
+        limit: int | None = None,
+        fields: List[str] | None = None,
+    ) -> List[Dict[str, Any]]:
+        return self.book.page(after=after, limit=limit, fields=fields)
+
+    def iter_sorted(
+        self, predicate: Callable[[Dict[str, Any]], bool] | None = None
+    ) -> Iterator[Dict[str, Any]]:
+        return self.book.iter_sorted(predicate)
+
     def get(self, name: str) -> Dict[str, Any]:
         return self.book.get_record(name)
 
@@ -45,11 +206,10 @@ class AppService:
         birthday: str | None = None,
         notes: str | None = None,
     ) -> None:
-        self.book.add(name, phone, birthday=birthday, notes=notes)
-        # зворотна операція для undo — видалення
-        self._undo_stack.append({"op": "remove", "name": name})
-        self._redo_stack.clear()
-        self._save()
+        with self._write():
+            self.book.add(name, phone, birthday=birthday, notes=notes)
+            # зворотна операція для undo — видалення
+            self._push_undo({"op": "remove", "name": name})
 
     def change(
         self,
@@ -58,79 +218,131 @@ class AppService:
         birthday: str | None = None,
         notes: str | None = None,
     ) -> None:
-        # зберегти старий номер для undo
-        old = self.book.get(name)
-        # зберегти старі birthday/notes для redo
-        old_rec = self.book.get_record(name)
-        self.book.change(name, phone, birthday=birthday, notes=notes)
-        self._undo_stack.append(
-            {
-                "op": "change",
-                "name": name,
-                "phone": old,
-                "birthday": old_rec.get("birthday"),
-                "notes": old_rec.get("notes"),
-            }
-        )
-        self._redo_stack.clear()
-        self._save()
+        with self._write():
+            # зберегти старий номер для undo
+            old = self.book.get(name)
+            # зберегти старі birthday/notes для redo
+            old_rec = self.book.get_record(name)
+            self.book.change(name, phone, birthday=birthday, notes=notes)
+            self._push_undo(
+                {
+                    "op": "change",
+                    "name": name,
+                    "phone": old,
+                    "birthday": old_rec.get("birthday"),
+                    "notes": old_rec.get("notes"),
+                }
+            )
 
     def remove(self, name: str) -> None:
-        # зберегти запис для undo
-        rec = self.book.get_record(name)
-        self.book.remove(name)
-        self._undo_stack.append({"op": "add_record", "record": rec})
-        self._redo_stack.clear()
-        self._save()
+        with self._write():
+            # зберегти запис для undo
+            rec = self.book.get_record(name)
+            self.book.remove(name)
+            self._push_undo({"op": "add_record", "record": rec})
 
     def rename(self, old: str, new: str) -> None:
-        self.book.rename(old, new)
-        # зворотна операція — перейменувати назад
-        self._undo_stack.append({"op": "rename", "old": new, "new": old})
-        self._redo_stack.clear()
-        self._save()
+        with self._write():
+            self.book.rename(old, new)
+            # зворотна операція — перейменувати назад
+            self._push_undo({"op": "rename", "old": new, "new": old})
 
     def search(self, query: str) -> List[Dict[str, Any]]:
         return self.book.search(query)
 
+    def search_phone(
+        self, query: str, mode: str = "any", limit: int | None = None
+    ) -> List[Dict[str, Any]]:
+        return self.phones.search(query, mode=mode, limit=limit)
+
+    def fuzzy_search(
+        self, query: str, limit: int = 10, score_cutoff: int = 60
+    ) -> List[Dict[str, Any]]:
+        return self.fuzzy.search(query, limit=limit, score_cutoff=score_cutoff)
+
+    def fuzzy_search_many(
+        self, queries: List[str], limit: int = 10, score_cutoff: int = 60
+    ) -> List[List[Dict[str, Any]]]:
+        """Нечіткий пошук для багатьох запитів за один прохід по книзі."""
+        return self.fuzzy.search_many(queries, limit=limit, score_cutoff=score_cutoff)
+
+    def changes_since(
+        self, version: int | None = None, timestamp: str | None = None
+    ) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """Зміни після версії або моменту часу: (зміни, full, поточна версія).
+
+        Кожна зміна — {"name", "version", "updated_at", "deleted", "record"};
+        для видалених `record` дорівнює None. full=True означає, що це всі
+        живі записи і клієнт має замінити свою копію цілком.
+        """
+        with self._lock:
+            entries, full = self.changes.since(version=version, timestamp=timestamp)
+            out: List[Dict[str, Any]] = []
+            for name, ver, updated, deleted in entries:
+                out.append(
+                    {
+                        "name": name,
+                        "version": ver,
+                        "updated_at": updated,
+                        "deleted": deleted,
+                        "record": None if deleted else self.book.get_record(name),
+                    }
+                )
+            return out, full, self.book.version
+
     def stats(self) -> Dict[str, Any]:
         return self.book.stats()
 
-    def upcoming_birthdays(self, days: int = 7) -> List[Dict[str, Any]]:
+    def upcoming_birthdays(
+        self, days: int = 7, today: date | None = None
+    ) -> List[Dict[str, Any]]:
         """Повертає список контактів з днем народження у наступні `days` днів.
 
         Кожен повернений словник міститиме додатковий ключ `days_until`.
+        Дати беруться з індексу днів народження, без розбору рядків.
         """
-        from datetime import date, datetime
-
-        out: List[Dict[str, Any]] = []
-        today = date.today()
+        return self.birthdays.records(days, today=today)
 
-        for rec in self.book.all_records_sorted():
-            b = rec.get("birthday")
-            if not b:
-                continue
-            try:
-                # Очікуємо формат YYYY-MM-DD
-                dt = datetime.strptime(str(b), "%Y-%m-%d").date()
-            except Exception:
-                continue
+    def _push_undo(self, op: Dict[str, Any]) -> None:
+        self._undo_stack.append(op)
+        self._redo_stack.clear()
 
-            # наступне настання у цьому році
-            this_year = dt.replace(year=today.year)
-            if this_year < today:
-                next_occurrence = this_year.replace(year=today.year + 1)
-            else:
-                next_occurrence = this_year
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """Обгортка для змін книги з подальшим збереженням.
 
-            delta = (next_occurrence - today).days
-            if 0 <= delta <= days:
-                copy = dict(rec)
-                copy["days_until"] = delta
-                out.append(copy)
+        Зміна виконується під локом сервісу. У спільному режимі — ще й під
+        ексклюзивним локом журналу після підтягування чужих змін. Інакше,
+        якщо версія книги змінилася, книга зберігається: одразу або через
+        group commit, і тоді виклик повертається лише після того, як спільний
+        запис (разом зі змінами інших потоків) потрапив на диск; невдалий
+        запис піднімає PersistenceError.
+        """
+        if self._shared is not None:
+            with self._lock, self._shared.write_lock():
+                yield
+            return
+
+        ticket = None
+        with self._lock:
+            version = self.book.version
+            yield
+            if self.book.version != version:
+                if self._committer is None:
+                    self._save()
+                else:
+                    ticket = self._committer.request()
+        if ticket is not None:
+            try:
+                self._committer.wait(ticket)
+            except Exception as e:
+                raise PersistenceError(f"Failed to save contacts: {e}") from e
 
-        out.sort(key=lambda r: r.get("days_until", 0))
-        return out
+    def refresh(self) -> int:
+        """Підтягує зміни інших процесів (лише у спільному режимі)."""
+        if self._shared is None:
+            return 0
+        return self._shared.refresh()
 
     def _save(self) -> None:
         try:
@@ -143,6 +355,44 @@ class AppService:
         except Exception:
             logger.exception("Failed to save contacts to %s", self.json_path)
 
+    def _group_save(self) -> None:
+        """Збереження для group commit: знімок під локом, запис — поза ним."""
+        with self._lock:
+            contacts = self.book.to_dict()
+            last_modified = self.book.last_modified
+            stacks = (list(self._undo_stack), list(self._redo_stack))
+        try:
+            save_contacts_json(
+                self.json_path,
+                contacts,
+                last_modified,
+                enable_backups=self.enable_backups,
+                fsync=True,
+            )
+        except Exception:
+            # помилку отримають усі запити групи (GroupCommitter.wait)
+            logger.exception("Failed to save contacts to %s", self.json_path)
+            self._discard_unsaved()
+            raise
+        self._saved_stacks = stacks
+
+    def _discard_unsaved(self) -> None:
+        """Повертає книгу і стеки undo/redo до стану останнього запису на диск.
+
+        Після невдалого group commit зміни в пам'яті відкидаються разом з
+        новішими, що прийшли під час запису: клієнти отримують помилку, тож
+        ні читачі, ні наступний запис не повинні побачити ці зміни.
+        """
+        with self._lock:
+            try:
+                contacts, last_modified = load_contacts_json(self.json_path)
+                self.book.load_from_dict(contacts, last_modified)
+                undo, redo = self._saved_stacks
+                self._undo_stack, self._redo_stack = list(undo), list(redo)
+            finally:
+                # лок сервісу утримано, тож нових змін без номера немає
+                self._committer.abort_pending()
+
     def import_csv(self, csv_path: Path) -> Dict[str, int]:
         """Імпортує контакти з CSV як одну транзакційну операцію.
 
@@ -152,127 +402,259 @@ class AppService:
         """
         added_names: List[str] = []
         skipped = 0
-        try:
+        with self._write():
             with csv_path.open("r", encoding="utf-8", newline="") as fh:
                 import csv as _csv
 
-                reader = _csv.DictReader(fh)
-                for row in reader:
+                rows = []
+                for row in _csv.DictReader(fh):
                     name = str(row.get("name", "")).strip()
                     phone = str(row.get("phone", "")).strip()
-                    birthday = str(row.get("birthday", "")).strip() or None
-                    notes = str(row.get("notes", "")).strip() or None
                     if not name or not phone:
                         skipped += 1
                         continue
-                    try:
-                        # нормалізувати телефон перед додаванням
-                        normalized = normalize_phone(
-                            phone, default_country_code=SETTINGS.default_country_code
-                        )
-                        self.book.add(name, normalized, birthday=birthday, notes=notes)
-                        added_names.append(name)
-                    except Exception:
-                        skipped += 1
-        except FileNotFoundError:
-            raise
+                    rows.append((name, phone, row))
+            # нормалізувати всі телефони одним пакетом перед додаванням
+            phones, errors = normalize_phones(
+                [phone for _, phone, _ in rows],
+                default_country_code=SETTINGS.default_country_code,
+            )
+            for (name, _, row), normalized, error in zip(
+                rows, phones, errors, strict=True
+            ):
+                if error is not None:
+                    skipped += 1
+                    continue
+                birthday = str(row.get("birthday", "")).strip() or None
+                notes = str(row.get("notes", "")).strip() or None
+                try:
+                    self.book.add(name, normalized, birthday=birthday, notes=notes)
+                    added_names.append(name)
+                except Exception:
+                    skipped += 1
 
-        # Записати одну масову undo-операцію для всіх доданих імен
-        if added_names:
-            self._undo_stack.append({"op": "bulk_add", "names": added_names})
-            self._redo_stack.clear()
-            self._save()
+            # Записати одну масову undo-операцію для всіх доданих імен
+            if added_names:
+                self._push_undo({"op": "bulk_add", "names": added_names})
 
         return {"added": len(added_names), "skipped": skipped}
 
+    # ---------- пакетні операції ----------
+
+    def add_many(
+        self, items: List[Dict[str, Any]]
+    ) -> Tuple[bool, List[Dict[str, Any]]]:
+        """Додає кілька контактів однією транзакцією (див. `_run_batch`)."""
+
+        def check(item: Dict[str, Any], plan: _BatchPlan) -> None:
+            plan.add(item.get("name", ""), item.get("phone", ""))
+
+        def step(item: Dict[str, Any]) -> Dict[str, Any]:
+            self.book.add(
+                item.get("name", ""),
+                item.get("phone", ""),
+                birthday=item.get("birthday"),
+                notes=item.get("notes"),
+            )
+            return {"op": "remove", "name": item.get("name", "")}
+
+        return self._run_batch(items, check, step)
+
+    def change_many(
+        self, items: List[Dict[str, Any]]
+    ) -> Tuple[bool, List[Dict[str, Any]]]:
+        """Частково оновлює кілька контактів: відсутній phone лишається старим."""
+
+        def check(item: Dict[str, Any], plan: _BatchPlan) -> None:
+            plan.change(item.get("name", ""), item.get("phone"))
+
+        def step(item: Dict[str, Any]) -> Dict[str, Any]:
+            name = item.get("name", "")
+            old_rec = self.book.get_record(name)
+            self.book.change(
+                name,
+                item.get("phone") or old_rec["phone"],
+                birthday=item.get("birthday"),
+                notes=item.get("notes"),
+            )
+            return {
+                "op": "change",
+                "name": name,
+                "phone": old_rec["phone"],
+                "birthday": old_rec.get("birthday"),
+                "notes": old_rec.get("notes"),
+            }
+
+        return self._run_batch(items, check, step)
+
+    def remove_many(self, names: List[str]) -> Tuple[bool, List[Dict[str, Any]]]:
+        """Видаляє кілька контактів однією транзакцією."""
+
+        def check(item: Dict[str, Any], plan: _BatchPlan) -> None:
+            plan.remove(item["name"])
+
+        def step(item: Dict[str, Any]) -> Dict[str, Any]:
+            rec = self.book.get_record(item["name"])
+            self.book.remove(item["name"])
+            return {"op": "add_record", "record": rec}
+
+        return self._run_batch([{"name": n} for n in names], check, step)
+
+    def _run_batch(
+        self,
+        items: List[Dict[str, Any]],
+        check: Callable[[Dict[str, Any], _BatchPlan], None],
+        step: Callable[[Dict[str, Any]], Dict[str, Any]],
+    ) -> Tuple[bool, List[Dict[str, Any]]]:
+        """Застосовує `step` до кожного елемента як одну транзакцію.
+
+        Спершу `check` перевіряє всі елементи (кожен — з урахуванням
+        попередніх, через _BatchPlan), тож клієнт бачить усі помилки одразу.
+        Якщо хоч один елемент невдалий, книга не змінюється: ні версії, ні
+        подій для підписників, ні збереження. Інакше — кроки застосовуються,
+        один запис undo і одне збереження на весь пакет.
+
+        Повертає (applied, results), де results — статус кожного елемента.
+        """
+        results: List[Dict[str, Any]] = []
+        failed = False
+        with self._write():
+            plan = _BatchPlan(self.book)
+            for idx, item in enumerate(items):
+                try:
+                    check(item, plan)
+                    results.append({"index": idx, "name": item.get("name"), "ok": True})
+                except Exception as e:
+                    failed = True
+                    results.append(
+                        {
+                            "index": idx,
+                            "name": item.get("name"),
+                            "ok": False,
+                            "error": str(e),
+                        }
+                    )
+            if failed:
+                return False, results
+
+            inverses: List[Dict[str, Any]] = []
+            try:
+                for item in items:
+                    inverses.append(step(item))
+            except Exception:
+                # перевірка мала це відсіяти; відкотити застосоване і не зберігати
+                for op in reversed(inverses):
+                    self._revert(op)
+                raise
+            if inverses:
+                self._push_undo({"op": "batch", "ops": inverses})
+
+        return True, results
+
+    # ---------- undo / redo ----------
+
     def undo(self) -> None:
         """Відмінити останню операцію."""
-        if not self._undo_stack:
-            raise RuntimeError("Nothing to undo")
+        with self._write():
+            if not self._undo_stack:
+                raise RuntimeError("Nothing to undo")
+
+            op = self._undo_stack.pop()
+            # Виконати зворотну операцію і додати протилежну до стека redo
+            self._redo_stack.append(self._revert(op))
+
+    def redo(self) -> None:
+        """Повторити останню відправлену назад операцію (redo)."""
+        with self._write():
+            if not self._redo_stack:
+                raise RuntimeError("Nothing to redo")
 
-        op = self._undo_stack.pop()
-        # Виконати зворотну операцію і додати протилежну до стека redo
+            op = self._redo_stack.pop()
+            # Повторно застосувати операцію, додавши зворотну в стек undo
+            self._undo_stack.append(self._reapply(op))
+
+    def _revert(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        """Виконує зворотну операцію з undo-стека і повертає операцію для redo."""
         if op["op"] == "remove":
             name = op["name"]
-            # виконати видалення
+            # зберегти запис, щоб redo відновив його повністю
+            rec = self.book.get_record(name)
             self.book.remove(name)
-            self._redo_stack.append({"op": "add", "name": name, "phone": None})
+            return {"op": "add_record", "record": rec}
         elif op["op"] == "add_record":
             rec = op["record"]
-            self.book.add(rec.get("name"), rec.get("phone"))
-            self._redo_stack.append({"op": "remove", "name": rec.get("name")})
+            self.book.add(
+                rec.get("name"),
+                rec.get("phone"),
+                birthday=rec.get("birthday"),
+                notes=rec.get("notes"),
+            )
+            return {"op": "remove", "name": rec.get("name")}
         elif op["op"] == "change":
             name = op["name"]
-            phone = op["phone"]
             # отримати поточний для redo
-            current = self.book.get(name)
-            self.book.change(name, phone)
-            self._redo_stack.append({"op": "change", "name": name, "phone": current})
+            current = self.book.get_record(name)
+            self.book.change(
+                name, op["phone"], birthday=op.get("birthday"), notes=op.get("notes")
+            )
+            return {
+                "op": "change",
+                "name": name,
+                "phone": current["phone"],
+                "birthday": current.get("birthday"),
+                "notes": current.get("notes"),
+            }
         elif op["op"] == "rename":
             old = op["old"]
             new = op["new"]
             self.book.rename(old, new)
-            self._redo_stack.append({"op": "rename", "old": new, "new": old})
+            return {"op": "rename", "old": new, "new": old}
         elif op["op"] == "bulk_add":
             # Відміна bulk_add: видалити всі імена, що були додані
             names = op.get("names", []) or []
             # зберегти видалені записи в redo як add_record записи
             removed_records = []
             for name in names:
-                rec = self.book.get_record(name)
-                if rec:
-                    removed_records.append(rec)
-                    try:
-                        self.book.remove(name)
-                    except Exception:
-                        # якщо не вдається видалити — пропустити
-                        pass
-            self._redo_stack.append({"op": "bulk_remove", "records": removed_records})
-        else:
-            raise RuntimeError("Unknown undo operation")
-
-        self._save()
-
-    def redo(self) -> None:
-        """Повторити останню відправлену назад операцію (redo)."""
-        if not self._redo_stack:
-            raise RuntimeError("Nothing to redo")
+                try:
+                    removed_records.append(self.book.get_record(name))
+                    self.book.remove(name)
+                except Exception:
+                    # якщо не вдається видалити — пропустити
+                    pass
+            return {"op": "bulk_remove", "records": removed_records}
+        elif op["op"] == "batch":
+            # кроки пакета відкочуються у зворотному порядку
+            return {
+                "op": "batch",
+                "ops": [self._revert(sub) for sub in reversed(op["ops"])],
+            }
+        raise RuntimeError("Unknown undo operation")
 
-        op = self._redo_stack.pop()
-        # Повторно застосувати операцію, додавши зворотну в стек undo
+    def _reapply(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        """Повторно застосовує операцію з redo-стека і повертає операцію для undo."""
         if op["op"] == "add":
             name = op["name"]
             phone = op.get("phone") or ""
             self.book.add(name, phone)
-            self._undo_stack.append({"op": "remove", "name": name})
-        elif op["op"] == "remove":
-            name = op["name"]
-            rec = self.book.get_record(name)
-            self.book.remove(name)
-            self._undo_stack.append({"op": "add_record", "record": rec})
-        elif op["op"] == "change":
-            name = op["name"]
-            phone = op["phone"]
-            old = self.book.get(name)
-            self.book.change(name, phone)
-            self._undo_stack.append({"op": "change", "name": name, "phone": old})
-        elif op["op"] == "rename":
-            old = op["old"]
-            new = op["new"]
-            self.book.rename(old, new)
-            self._undo_stack.append({"op": "rename", "old": new, "new": old})
+            return {"op": "remove", "name": name}
+        elif op["op"] in ("remove", "add_record", "change", "rename", "batch"):
+            # ці операції симетричні: повтор — це та сама зворотна дія
+            return self._revert(op)
         elif op["op"] == "bulk_remove":
             # Redoing a bulk remove: re-add preserved records
             records = op.get("records", []) or []
+            names = []
             for rec in records:
                 try:
-                    self.book.add(rec.get("name"), rec.get("phone"))
-                    # inverse for undo is remove of that name
-                    self._undo_stack.append({"op": "remove", "name": rec.get("name")})
+                    self.book.add(
+                        rec.get("name"),
+                        rec.get("phone"),
+                        birthday=rec.get("birthday"),
+                        notes=rec.get("notes"),
+                    )
+                    names.append(rec.get("name"))
                 except Exception:
                     # ignore individual failures
                     pass
-        else:
-            raise RuntimeError("Unknown redo operation")
-
-        self._save()
+            return {"op": "bulk_add", "names": names}
+        raise RuntimeError("Unknown redo operation")
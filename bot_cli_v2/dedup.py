@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from difflib import SequenceMatcher
+from itertools import combinations
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+
+from settings import SETTINGS
+from utils import gc_paused, normalize_phones, process_pool
+
+try:
+    from rapidfuzz import fuzz as _rf_fuzz
+    from rapidfuzz import process as _rf_process
+
+    _RF_AVAILABLE = True
+except Exception:
+    _RF_AVAILABLE = False
+
+# cpdist повертає numpy-масив; без numpy пари оцінюються порціями в пулі
+try:
+    import numpy  # noqa: F401
+
+    _NP_AVAILABLE = True
+except Exception:
+    _NP_AVAILABLE = False
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Пари, що оцінюються одним завданням пулу процесів (запасний режим)
+POOL_CHUNK_PAIRS = 50_000
+
+
+@dataclass
+class DuplicatePair:
+    """Пропозиція злиття: `keep` лишається, `drop` вливається в нього."""
+
+    keep: str
+    drop: str
+    score: float
+    same_phone: bool
+    reasons: str
+    keep_phone: str
+    drop_phone: str
+
+
+def name_key(name: str) -> str:
+    """Ім'я як відсортовані токени в нижньому регістрі ("petrenko ivan")."""
+    return " ".join(sorted(_TOKEN_RE.findall(name.lower())))
+
+
+def phone_keys(phones: Iterable[str], digits: int | None = None) -> List[str | None]:
+    """Останні `digits` цифр нормалізованих номерів (None — замало цифр).
+
+    Суфікс прибирає розбіжності у форматі та коді країни
+    ("050 123 45 67" і "+380501234567" дають однаковий ключ). Номери
+    нормалізуються одним пакетом; невалідні дають просто свої цифри.
+    """
+    digits = digits or SETTINGS.dedup_phone_suffix_digits
+    raw = list(phones)
+    normalized, _ = normalize_phones(
+        raw, default_country_code=SETTINGS.default_country_code
+    )
+    keys: List[str | None] = []
+    for phone, value in zip(raw, normalized, strict=True):
+        if value is None:
+            value = "".join(ch for ch in phone if ch.isdigit())
+        tail = value.lstrip("+")[-digits:]
+        keys.append(tail if len(tail) >= min(digits, 7) else None)
+    return keys
+
+
+def phone_key(phone: str, digits: int | None = None) -> str | None:
+    """Ключ блоку для одного номера (див. phone_keys)."""
+    return phone_keys([phone], digits)[0]
+
+
+def candidate_pairs(
+    names: Sequence[str], phones: Sequence[str | None], max_block: int
+) -> Tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]:
+    """Пари-кандидати (i < j) з блоків за ключами, без повного n².
+
+    Повертає (пари за іменем, пари з однаковим суфіксом телефону). Блоки
+    імен — однаковий набір токенів і кожен окремий токен. Блоки, більші за
+    `max_block` (поширені імена чи прізвища, номер-заглушка), пропускаються —
+    вони нічого не кажуть про дублікати і дали б квадратичну кількість пар.
+    """
+    name_blocks: Dict[str, List[int]] = {}
+    phone_blocks: Dict[str, List[int]] = {}
+    for i, (name, phone) in enumerate(zip(names, phones, strict=True)):
+        for key in {"\0" + name, *name.split()}:
+            name_blocks.setdefault(key, []).append(i)
+        if phone:
+            phone_blocks.setdefault(phone, []).append(i)
+
+    def pairs_of(blocks: Dict[str, List[int]]) -> Set[Tuple[int, int]]:
+        pairs: Set[Tuple[int, int]] = set()
+        for members in blocks.values():
+            # індекси в блоці зростають, тож пари вже впорядковані (i < j)
+            if 2 <= len(members) <= max_block:
+                pairs.update(combinations(members, 2))
+        return pairs
+
+    return pairs_of(name_blocks), pairs_of(phone_blocks)
+
+
+def _score_chunk(left: List[str], right: List[str]) -> List[float]:
+    if _RF_AVAILABLE:
+        return [_rf_fuzz.ratio(a, b) for a, b in zip(left, right, strict=True)]
+    return [
+        SequenceMatcher(None, a, b).ratio() * 100
+        for a, b in zip(left, right, strict=True)
+    ]
+
+
+def score_pairs(left: List[str], right: List[str], workers: int = -1) -> List[float]:
+    """Схожість рядків попарно (0-100), паралельно.
+
+    З rapidfuzz і numpy — `process.cpdist` на всіх ядрах; інакше порції пар
+    розподіляються між процесами спільного пулу (utils.process_pool).
+    """
+    if not left:
+        return []
+    if _RF_AVAILABLE and _NP_AVAILABLE and hasattr(_rf_process, "cpdist"):
+        scores = _rf_process.cpdist(left, right, scorer=_rf_fuzz.ratio, workers=workers)
+        return scores.tolist()
+    processes = (os.cpu_count() or 1) if workers < 1 else workers
+    if processes == 1 or len(left) <= POOL_CHUNK_PAIRS:
+        return _score_chunk(left, right)
+    pool = process_pool("dedup", processes)
+    futures = [
+        pool.submit(
+            _score_chunk,
+            left[i : i + POOL_CHUNK_PAIRS],
+            right[i : i + POOL_CHUNK_PAIRS],
+        )
+        for i in range(0, len(left), POOL_CHUNK_PAIRS)
+    ]
+    return [score for future in futures for score in future.result()]
+
+
+def _completeness(rec: Dict[str, Any]) -> Tuple[int, str]:
+    filled = sum(1 for k in ("phone", "birthday", "notes") if rec.get(k))
+    return filled, str(rec.get("updated_at") or "")
+
+
+def find_duplicates(
+    records: Iterable[Dict[str, Any]],
+    threshold: float | None = None,
+    max_block: int | None = None,
+    workers: int = -1,
+) -> List[DuplicatePair]:
+    """Пропозиції злиття майже однакових контактів, найсильніші першими.
+
+    Пара потрапляє у звіт, якщо збігається суфікс телефону або схожість
+    імен (з відсортованими токенами, тож "Ivan Petrenko" = "Petrenko Ivan")
+    не нижча за `threshold`. Лишається повніший запис (більше заповнених
+    полів, потім свіжіший).
+    """
+    threshold = SETTINGS.dedup_name_threshold if threshold is None else threshold
+    max_block = max_block or SETTINGS.dedup_max_block_size
+    with gc_paused():
+        return _find_duplicates(list(records), threshold, max_block, workers)
+
+
+def _find_duplicates(
+    rows: List[Dict[str, Any]], threshold: float, max_block: int, workers: int
+) -> List[DuplicatePair]:
+    names = [name_key(str(r.get("name") or "")) for r in rows]
+    phones = phone_keys(str(r.get("phone") or "") for r in rows)
+
+    name_pairs, phone_pairs = candidate_pairs(names, phones, max_block)
+
+    # схожість рахується пакетом; у Python-цикл потрапляють лише влучання
+    pair_list = list(name_pairs)
+    left = list(map(itemgetter(0), pair_list))
+    right = list(map(itemgetter(1), pair_list))
+    scores = score_pairs(
+        list(map(names.__getitem__, left)),
+        list(map(names.__getitem__, right)),
+        workers,
+    )
+    matched: Dict[Tuple[int, int], float] = {
+        (left[k], right[k]): score
+        for k, score in enumerate(scores)
+        if score >= threshold
+    }
+    # пари лише за телефоном теж отримують оцінку імен для звіту
+    extra = [pair for pair in phone_pairs if pair not in matched]
+    extra_scores = score_pairs(
+        [names[i] for i, _ in extra], [names[j] for _, j in extra], workers
+    )
+    matched.update(zip(extra, extra_scores, strict=True))
+
+    out: List[DuplicatePair] = []
+    for (i, j), score in matched.items():
+        same_phone = (i, j) in phone_pairs
+        similar = score >= threshold
+        a, b = rows[i], rows[j]
+        keep, drop = (a, b) if _completeness(a) >= _completeness(b) else (b, a)
+        reasons = [r for r, hit in (("phone", same_phone), ("name", similar)) if hit]
+        out.append(
+            DuplicatePair(
+                keep=keep["name"],
+                drop=drop["name"],
+                score=round(float(score), 1),
+                same_phone=same_phone,
+                reasons="+".join(reasons),
+                keep_phone=keep.get("phone") or "",
+                drop_phone=drop.get("phone") or "",
+            )
+        )
+    # спершу пари з обома сигналами, далі за оцінкою, далі за іменами
+    out.sort(key=lambda p: (p.keep, p.drop))
+    out.sort(
+        key=lambda p: (p.same_phone + (p.score >= threshold), p.score), reverse=True
+    )
+    return out
+
+
+def write_suggestions(pairs: List[DuplicatePair], path: Path, fmt: str = "csv") -> int:
+    """Записує пропозиції у CSV або JSON. Повертає кількість пар."""
+    rows = [asdict(p) for p in pairs]
+    path = Path(path)
+    if fmt == "json":
+        path.write_text(
+            json.dumps(rows, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+    else:
+        with path.open("w", encoding="utf-8", newline="") as fh:
+            fields = list(DuplicatePair.__dataclass_fields__)
+            writer = csv.DictWriter(fh, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+    return len(rows)
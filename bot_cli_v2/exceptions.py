@@ -19,3 +19,7 @@ class DuplicatePhoneError(AddressBookError):
 
 class ValidationError(ValueError, AddressBookError):
     """Помилка валідації даних."""
+
+
+class PersistenceError(AddressBookError):
+    """Зміну застосовано в пам'яті, але не вдалося записати на диск."""
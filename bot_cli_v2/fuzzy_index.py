@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+
+from address_book import AddressBook
+from utils import difflib_top_k, fuzzy_choice, process_pool
+
+try:
+    from rapidfuzz import fuzz as _rf_fuzz
+    from rapidfuzz import process as _rf_process
+
+    _RF_AVAILABLE = True
+except Exception:
+    _RF_AVAILABLE = False
+
+# numpy потрібен лише для пакетного cdist; без нього — extract на кожен запит
+try:
+    import numpy as np
+
+    _NP_AVAILABLE = True
+except Exception:
+    _NP_AVAILABLE = False
+
+
+# Скільки клітинок матриці оцінок (запити × записи) рахує один виклик cdist
+CDIST_CHUNK_CELLS = 1 << 23
+# Запасний режим: менші пакети запитів не варті запуску пулу процесів
+POOL_MIN_QUERIES = 32
+# Скільки змінених слотів надсилати з кожною задачею пулу, перш ніж
+# передати воркерам новий повний знімок
+POOL_MAX_DELTA = 4096
+
+# Номери знімків для пулу запасного режиму (унікальні в межах процесу)
+_POOL_GENERATIONS = itertools.count(1)
+
+Hits = List[Tuple[int, float]]
+
+
+def normalize_query(query: str | None) -> str:
+    """Запит у тому вигляді, в якому його порівнює індекс (без регістру)."""
+    return (query or "").strip().lower()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Множина 3-грам рядка (з пробілами по краях, щоб враховувати межі)."""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _build_postings(choices: Sequence[str | None]) -> Dict[str, Set[int]]:
+    postings: Dict[str, Set[int]] = {}
+    for slot, choice in enumerate(choices):
+        if choice is not None:
+            for gram in trigrams(choice):
+                postings.setdefault(gram, set()).add(slot)
+    return postings
+
+
+def _gram_top_k(
+    q: str,
+    choices: Sequence[str | None],
+    postings: Dict[str, Set[int]],
+    limit: int,
+    score_cutoff: int,
+    extra: Dict[str, Set[int]] | None = None,
+) -> Hits:
+    """Топ-k через difflib лише серед записів зі спільними 3-грамами.
+
+    `extra` — додаткові 3-грами (наприклад, змінених після знімка слотів).
+    """
+    if len(q) < 3:
+        # надто короткий запит для 3-грам — лише межі quick_ratio
+        return difflib_top_k(q, choices, limit, score_cutoff)
+    shared: Counter[int] = Counter()
+    for gram in trigrams(q):
+        shared.update(postings.get(gram, ()))
+        if extra:
+            shared.update(extra.get(gram, ()))
+    # найперспективніші першими: поріг купи росте швидше
+    candidates = [slot for slot, _ in shared.most_common()]
+    return difflib_top_k(q, choices, limit, score_cutoff, candidates)
+
+
+def _cdist_top_k(
+    queries: List[str],
+    choices: List[str],
+    limit: int,
+    score_cutoff: int,
+    workers: int,
+) -> List[Hits]:
+    """Топ-k для кожного запиту з матриці rapidfuzz cdist, порціями запитів.
+
+    Порядок — як у process.extract: за спаданням оцінки, при рівних — за
+    індексом запису.
+    """
+    out: List[Hits] = []
+    if not choices:
+        return [[] for _ in queries]
+    step = max(1, CDIST_CHUNK_CELLS // len(choices))
+    for start in range(0, len(queries), step):
+        chunk = queries[start : start + step]
+        scores = _rf_process.cdist(
+            chunk,
+            choices,
+            scorer=_rf_fuzz.WRatio,
+            score_cutoff=score_cutoff,
+            dtype=np.float32,
+            workers=workers,
+        )
+        for q, row in zip(chunk, scores, strict=True):
+            if not q:
+                out.append([])
+                continue
+            idx = np.flatnonzero(row >= score_cutoff)
+            if len(idx) > limit:
+                # k-та найбільша оцінка; усі рівні їй лишаються кандидатами
+                kth = np.partition(row[idx], len(idx) - limit)[len(idx) - limit]
+                idx = idx[row[idx] >= kth]
+            order = np.lexsort((idx, -row[idx]))[:limit]
+            out.append([(int(idx[i]), float(row[idx[i]])) for i in order])
+    return out
+
+
+# Стан воркера пулу запасного режиму: рядки і 3-грами будуються один раз
+_WORKER_STATE: Tuple[List[str | None], Dict[str, Set[int]]] | None = None
+
+
+def _init_worker(choices: List[str | None]) -> None:
+    global _WORKER_STATE
+    _WORKER_STATE = (choices, _build_postings(choices))
+
+
+def _worker_top_k(
+    queries: List[str],
+    delta: Dict[int, str | None],
+    limit: int,
+    score_cutoff: int,
+) -> List[Hits]:
+    assert _WORKER_STATE is not None
+    choices, postings = _WORKER_STATE
+    extra: Dict[str, Set[int]] = {}
+    if delta:
+        # слоти, змінені після знімка: поточні рядки поверх знімка; старі
+        # 3-грами лише додають кандидатів, які переоцінюються за новим рядком
+        choices = list(choices)
+        choices.extend([None] * (max(delta) + 1 - len(choices)))
+        for slot, choice in delta.items():
+            choices[slot] = choice
+            if choice is not None:
+                for gram in trigrams(choice):
+                    extra.setdefault(gram, set()).add(slot)
+    return [
+        _gram_top_k(q, choices, postings, limit, score_cutoff, extra) if q else []
+        for q in queries
+    ]
+
+
+class FuzzyIndex:
+    """Постійний індекс нечіткого пошуку по книзі.
+
+    Тримає рядки для порівняння (поля `key_fields` через " | ", у нижньому
+    регістрі) у стабільному масиві слотів: зміна запису переписує лише його
+    слот, видалення звільняє слот (None, rapidfuzz такі пропускає), а
+    додавання займає вільний. Запит іде напряму в `process.extract`, і
+    результат повертається за номером слота, а не за текстом рядка.
+
+    Без rapidfuzz індекс додатково веде інвертований список 3-грам: запит
+    перевіряє повним SequenceMatcher.ratio() лише записи зі спільними
+    3-грамами, у порядку кількості збігів, з відсіюванням за
+    real_quick_ratio()/quick_ratio() і купою топ-k (utils.difflib_top_k).
+
+    Індекс будується ліниво — при першому пошуку або в `build()`.
+    """
+
+    def __init__(
+        self, book: AddressBook, key_fields: Sequence[str] = ("name", "phone")
+    ) -> None:
+        self.book = book
+        self.key_fields = tuple(key_fields)
+        self._lock = threading.Lock()
+        self._built = False
+        self._choices: List[str | None] = []
+        self._names: List[str | None] = []
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        # 3-грама -> слоти; лише для запасного режиму без rapidfuzz
+        self._use_grams = not _RF_AVAILABLE
+        self._postings: Dict[str, Set[int]] = {}
+        # знімок у пулі запасного режиму: номер, рядки і змінені після нього слоти
+        self._pool_key: int | None = None
+        self._pool_base: List[str | None] = []
+        self._pool_delta: Dict[int, str | None] = {}
+        book.add_listener(self._on_change)
+
+    def build(self) -> None:
+        with self._lock:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        records = list(self.book.iter_sorted())
+        self._names = [r["name"] for r in records]
+        self._choices = [fuzzy_choice(r, self.key_fields).lower() for r in records]
+        self._slots = {name: i for i, name in enumerate(self._names)}
+        self._free = []
+        self._postings = _build_postings(self._choices) if self._use_grams else {}
+        # слоти перенумеровано — знімок у пулі більше не відповідає індексу
+        self._pool_key = None
+        self._pool_delta = {}
+        self._built = True
+
+    def _index_grams(self, slot: int, choice: str) -> None:
+        for gram in trigrams(choice):
+            self._postings.setdefault(gram, set()).add(slot)
+
+    def _unindex_grams(self, slot: int, choice: str) -> None:
+        for gram in trigrams(choice):
+            slots = self._postings.get(gram)
+            if slots is not None:
+                slots.discard(slot)
+                if not slots:
+                    del self._postings[gram]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # ---------- оновлення ----------
+
+    def _on_change(self, op: str, name: str | None, old_name: str | None) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            if op == "reset" or name is None:
+                self._rebuild()
+                return
+            if old_name is not None:
+                self._release(old_name)
+            if op == "remove":
+                self._release(name)
+            else:
+                self._store(name, self.book.get_record(name))
+            # багато дірок після масових видалень — ущільнюємо
+            if len(self._free) > 1024 and len(self._free) > len(self._slots):
+                self._rebuild()
+
+    def _store(self, name: str, record: Dict[str, Any]) -> None:
+        choice = fuzzy_choice(record, self.key_fields).lower()
+        slot = self._slots.get(name)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._choices)
+                self._choices.append(None)
+                self._names.append(None)
+            self._slots[name] = slot
+            self._names[slot] = name
+        previous = self._choices[slot]
+        if self._use_grams and previous != choice:
+            if previous is not None:
+                self._unindex_grams(slot, previous)
+            self._index_grams(slot, choice)
+        self._choices[slot] = choice
+        if self._pool_key is not None:
+            self._pool_delta[slot] = choice
+
+    def _release(self, name: str) -> None:
+        slot = self._slots.pop(name, None)
+        if slot is None:
+            return
+        if self._use_grams and self._choices[slot] is not None:
+            self._unindex_grams(slot, self._choices[slot])
+        self._choices[slot] = None
+        self._names[slot] = None
+        self._free.append(slot)
+        if self._pool_key is not None:
+            self._pool_delta[slot] = None
+
+    # ---------- пошук ----------
+
+    def search(
+        self, query: str, limit: int = 10, score_cutoff: int = 60
+    ) -> List[Dict[str, Any]]:
+        """Найкращі збіги за спаданням оцінки (як utils.fuzzy_search)."""
+        q = normalize_query(query)
+        if not q:
+            return []
+        with self._lock:
+            if not self._built:
+                self._rebuild()
+            hits = self._match(q, limit, score_cutoff)
+            names = [self._names[slot] for slot, _ in hits]
+        return self._records(names)
+
+    def _match(self, q: str, limit: int, score_cutoff: int) -> Hits:
+        if not self._use_grams:
+            extracted = _rf_process.extract(
+                q,
+                self._choices,
+                scorer=_rf_fuzz.WRatio,
+                limit=limit,
+                score_cutoff=score_cutoff,
+            )
+            return [(slot, score) for _, score, slot in extracted]
+        return _gram_top_k(q, self._choices, self._postings, limit, score_cutoff)
+
+    def search_many(
+        self,
+        queries: Iterable[str],
+        limit: int = 10,
+        score_cutoff: int = 60,
+        workers: int = -1,
+    ) -> List[List[Dict[str, Any]]]:
+        """Пакетний пошук: топ-`limit` записів для кожного запиту, по порядку.
+
+        З rapidfuzz і numpy усі запити оцінюються одним `process.cdist`
+        (порціями, `workers` потоків, -1 — усі ядра); без numpy — по одному
+        `process.extract`. Без rapidfuzz великі пакети розподіляються між
+        процесами пулу (`workers`, -1 — за кількістю ядер). Пул живе між
+        викликами: знімок рядків передається воркерам один раз (кожен будує
+        з нього власний 3-грамний індекс), а зміни після нього надсилаються з
+        кожною задачею, доки їх не більше `POOL_MAX_DELTA`.
+        """
+        qs = [normalize_query(q) for q in queries]
+        with self._lock:
+            if not self._built:
+                self._rebuild()
+            if self._use_grams:
+                serial = workers == 1 or len(qs) < POOL_MIN_QUERIES
+            else:
+                serial = not _NP_AVAILABLE
+            if serial:
+                matched = [
+                    (
+                        [
+                            self._names[slot]
+                            for slot, _ in self._match(q, limit, score_cutoff)
+                        ]
+                        if q
+                        else []
+                    )
+                    for q in qs
+                ]
+                return [self._records(row) for row in matched]
+            if self._use_grams:
+                if self._pool_key is None or len(self._pool_delta) > POOL_MAX_DELTA:
+                    self._pool_key = next(_POOL_GENERATIONS)
+                    self._pool_base = list(self._choices)
+                    self._pool_delta = {}
+                key, base = self._pool_key, self._pool_base
+                delta = dict(self._pool_delta)
+                names = list(self._names)
+            else:
+                # знімок живих слотів; обчислення — поза локом
+                live = [slot for slot, c in enumerate(self._choices) if c is not None]
+                choices = [self._choices[slot] for slot in live]
+                names = [self._names[slot] for slot in live]
+        if self._use_grams:
+            hits = _pool_top_k(qs, key, base, delta, limit, score_cutoff, workers)
+        else:
+            hits = _cdist_top_k(qs, choices, limit, score_cutoff, workers)
+        return [self._records([names[i] for i, _ in row]) for row in hits]
+
+    def _records(self, names: Iterable[str | None]) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        for name in names:
+            try:
+                out.append(self.book.get_record(name))
+            except Exception:
+                # запис видалено між пошуком і читанням
+                continue
+        return out
+
+
+def _pool_top_k(
+    queries: List[str],
+    key: int,
+    choices: List[str | None],
+    delta: Dict[int, str | None],
+    limit: int,
+    score_cutoff: int,
+    workers: int,
+) -> List[Hits]:
+    """Запасний режим: запити рівними частинами в пулі процесів (spawn).
+
+    Пул спільний між викликами; рядки знімка з номером `key` потрапляють у
+    воркери через initializer, лише коли номер змінився, а `delta` (слот ->
+    поточний рядок або None) — з кожною задачею.
+    """
+    processes = (os.cpu_count() or 1) if workers < 1 else workers
+    processes = max(1, processes)
+    pool = process_pool(
+        "fuzzy_index",
+        processes,
+        key=key,
+        initializer=_init_worker,
+        initargs=(choices,),
+    )
+    step = -(-len(queries) // processes)
+    parts = [queries[i : i + step] for i in range(0, len(queries), step)]
+    futures = [
+        pool.submit(_worker_top_k, part, delta, limit, score_cutoff) for part in parts
+    ]
+    return [hits for future in futures for hits in future.result()]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict
+
+from metrics import METRICS
+
+
+class GroupCommitter:
+    """Груповий запис (group commit) для конкурентних змін.
+
+    Кожна зміна після застосування в пам'яті отримує номер (`request`) і
+    чекає (`wait`), доки запис з цим номером не стане довговічним. Перший
+    потік, що прийшов чекати, стає лідером: почекавши `window` секунд, щоб
+    зібрати сусідні зміни, він один раз викликає `persist` (повний знімок
+    книги з fsync) і будить усіх, чиї зміни потрапили в цей знімок.
+
+    Якщо `persist` впав, виняток отримує кожен, чия зміна була в цій групі,
+    а не лише лідер: ніхто не почує, що зміна на диску, коли це не так.
+    Якщо `persist` при цьому відкинув з пам'яті й новіші зміни, він
+    викликає `abort_pending`, і помилку отримують також їхні запити.
+    """
+
+    def __init__(self, persist: Callable[[], None], window: float = 0.002) -> None:
+        self._persist = persist
+        self.window = window
+        self._cond = threading.Condition()
+        self._requested = 0
+        self._committed = 0
+        self._leader_active = False
+        self.commits = 0
+        # номер зміни -> виняток невдалого запису її групи (для очікувачів)
+        self._errors: Dict[int, Exception] = {}
+        # найбільший номер зміни, яку persist відкинув після невдалого запису
+        self._aborted = 0
+
+    def request(self) -> int:
+        """Реєструє вже застосовану в пам'яті зміну. Повертає її номер."""
+        with self._cond:
+            self._requested += 1
+            return self._requested
+
+    def abort_pending(self) -> None:
+        """Позначає всі зареєстровані зміни як невдалі разом з поточною групою.
+
+        Викликається з `persist`, коли після невдалого запису він повертає
+        книгу до стану на диску: зміни, що надійшли під час запису, теж
+        втрачено, тож їхні запити не повинні чекати наступної групи.
+        """
+        with self._cond:
+            self._aborted = self._requested
+
+    def wait(self, ticket: int) -> None:
+        """Блокує, доки зміна `ticket` не буде записана на диск."""
+        with self._cond:
+            while self._committed < ticket:
+                if not self._leader_active:
+                    self._leader_active = True
+                    break
+                self._cond.wait()
+            else:
+                error = self._errors.pop(ticket, None)
+                if error is not None:
+                    raise error
+                return
+
+        # Цей потік — лідер групи
+        target = ticket
+        error: Exception | None = None
+        try:
+            if self.window > 0:
+                time.sleep(self.window)
+            with self._cond:
+                # усі зміни з номером <= target вже в пам'яті, тож знімок,
+                # зроблений після цього моменту, їх містить
+                target = self._requested
+                size = target - self._committed
+            self._persist()
+            METRICS.observe(
+                "storage_group_commit_size",
+                size,
+                help_text="Writes persisted per group commit",
+                buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+            )
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._cond:
+                if error is not None:
+                    target = max(target, self._aborted)
+                    for other in range(self._committed + 1, target + 1):
+                        if other != ticket:
+                            self._errors[other] = error
+                self._committed = max(self._committed, target)
+                self.commits += 1
+                self._leader_active = False
+                self._cond.notify_all()
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from address_book import AddressBook
+from storage import fsync_dir, load_snapshot, save_contacts_json
+
+try:
+    import fcntl
+
+    _FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    _FCNTL_AVAILABLE = False
+
+logger = logging.getLogger("assistant_bot")
+
+# Перший рядок журналу — заголовок з унікальним поколінням; довший рядок
+# заголовком не вважається
+_HEADER_MAX = 256
+
+
+class SharedStore:
+    """Спільна директорія даних для кількох процесів API.
+
+    Зміни пишуться в журнал `contacts.journal`: по одному JSON-рядку на
+    запис з наскрізним номером `seq` ("put" — повний запис, "delete" — ім'я).
+    Кожен процес тримає свою копію книги і дочитує журнал перед читанням,
+    а пише лише під ексклюзивним `flock` на `contacts.lock`, попередньо
+    наздогнавши чужі зміни. Раз на `compact_every` записів журнал згортається
+    у `contacts.json` (meta.journal_seq) і замінюється новим журналом з
+    іншим поколінням у заголовку; читачі помічають заміну за поколінням
+    (inode після заміни може бути перевикористано) і перечитують знімок.
+    """
+
+    def __init__(
+        self,
+        json_path: Path,
+        book: AddressBook,
+        enable_backups: bool = True,
+        compact_every: int = 1000,
+    ) -> None:
+        if not _FCNTL_AVAILABLE:
+            raise RuntimeError("Shared data directory requires fcntl (POSIX)")
+        self.json_path = Path(json_path)
+        self.journal_path = self.json_path.with_suffix(".journal")
+        self.lock_path = self.json_path.with_suffix(".lock")
+        self.book = book
+        self.enable_backups = enable_backups
+        self.compact_every = compact_every
+
+        self.seq = 0
+        self._snapshot_seq = 0
+        self._journal_id: Optional[str] = None
+        self._offset = 0
+        self._pending: List[Tuple[str, str]] = []
+        self._replaying = False
+        self._needs_snapshot = False
+        # flock діє на рівні відкритого файлу, тож потоки одного процесу
+        # додатково серіалізуються звичайним локом
+        self._thread_lock = threading.RLock()
+        self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        book.add_listener(self._on_change)
+        with self._flock(fcntl.LOCK_SH):
+            self._reload()
+
+    def close(self) -> None:
+        self.book.remove_listener(self._on_change)
+        os.close(self._lock_fd)
+
+    # ---------- локи ----------
+
+    @contextmanager
+    def _flock(self, mode: int) -> Iterator[None]:
+        with self._thread_lock:
+            fcntl.flock(self._lock_fd, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def write_lock(self) -> Iterator[None]:
+        """Ексклюзивний доступ на запис: наздогнати журнал, змінити, зафіксувати.
+
+        Зміни книги всередині блоку потрапляють у журнал при виході; при
+        винятку вже застосовані зміни теж фіксуються, щоб копії процесів
+        не розійшлися.
+        """
+        with self._flock(fcntl.LOCK_EX):
+            self._catch_up()
+            try:
+                yield
+            finally:
+                self._commit()
+
+    # ---------- читання ----------
+
+    def refresh(self) -> int:
+        """Дочитує нові записи журналу інших процесів. Повертає кількість."""
+        if not self._journal_changed():
+            return 0
+        with self._flock(fcntl.LOCK_SH):
+            return self._catch_up()
+
+    def _stat(self) -> Tuple[Optional[str], int, int]:
+        """(покоління, розмір, довжина заголовка) журналу; None — журналу немає.
+
+        Журнал старого формату без заголовка має покоління "".
+        """
+        try:
+            with open(self.journal_path, "rb") as fh:
+                size = os.fstat(fh.fileno()).st_size
+                first = fh.readline(_HEADER_MAX)
+        except FileNotFoundError:
+            return None, 0, 0
+        if first.endswith(b"\n"):
+            try:
+                header = json.loads(first)
+            except ValueError:
+                header = None
+            if isinstance(header, dict) and "journal" in header:
+                return str(header["journal"]), size, len(first)
+        return "", size, 0
+
+    def _journal_changed(self) -> bool:
+        journal_id, size, _ = self._stat()
+        return journal_id != self._journal_id or size != self._offset
+
+    def _reload(self) -> None:
+        """Повне перечитування: знімок + весь поточний журнал."""
+        contacts, meta = load_snapshot(self.json_path)
+        self._replaying = True
+        try:
+            self.book.load_from_dict(contacts, meta.get("last_modified"))
+        finally:
+            self._replaying = False
+        self.seq = self._snapshot_seq = int(meta.get("journal_seq") or 0)
+        self._journal_id, self._offset = None, 0
+        self._catch_up()
+
+    def _catch_up(self) -> int:
+        journal_id, size, header_len = self._stat()
+        if journal_id is None:
+            self._journal_id, self._offset = None, 0
+            return 0
+        if journal_id != self._journal_id or size < self._offset:
+            if self._journal_id is not None:
+                # журнал згорнуто іншим процесом — актуальний знімок новіший
+                self._reload()
+                return 0
+            self._journal_id, self._offset = journal_id, header_len
+        if size == self._offset:
+            return 0
+
+        with open(self.journal_path, "rb") as fh:
+            fh.seek(self._offset)
+            chunk = fh.read(size - self._offset)
+        # обробляємо лише завершені рядки
+        end = chunk.rfind(b"\n") + 1
+        applied = 0
+        self._replaying = True
+        try:
+            for line in chunk[:end].splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["seq"] <= self.seq:
+                    continue
+                if entry["seq"] != self.seq + 1:
+                    # пропуск у послідовності: журнал уже згорнуто після
+                    # знімка, який ми читали, — перечитуємо все
+                    self._replaying = False
+                    self._reload()
+                    return applied
+                self._apply(entry)
+                self.seq = entry["seq"]
+                applied += 1
+        finally:
+            self._replaying = False
+        self._offset += end
+        return applied
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        if entry["op"] == "put":
+            self.book.put_record(entry["record"])
+        elif entry["op"] == "delete":
+            self.book.discard(entry["name"])
+        if entry.get("last_modified"):
+            self.book.last_modified = entry["last_modified"]
+
+    # ---------- запис ----------
+
+    def _on_change(self, op: str, name: str | None, old_name: str | None) -> None:
+        if self._replaying:
+            return
+        if op == "reset" or name is None:
+            # книгу замінено цілком — простіше записати новий знімок
+            self._needs_snapshot = True
+            return
+        if old_name is not None:
+            self._pending.append(("delete", old_name))
+        self._pending.append(("delete" if op == "remove" else "put", name))
+
+    def _commit(self) -> None:
+        if self._needs_snapshot:
+            self._needs_snapshot = False
+            self._pending = []
+            self.seq += 1
+            self._compact()
+            return
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if self._journal_id is None:
+            self._start_journal()
+        lines: List[bytes] = []
+        for op, name in pending:
+            self.seq += 1
+            entry: Dict[str, Any] = {
+                "seq": self.seq,
+                "op": op,
+                "name": name,
+                "last_modified": self.book.last_modified,
+            }
+            if op == "put":
+                try:
+                    entry["record"] = self.book.get_record(name)
+                except Exception:
+                    # запис уже видалено пізнішою зміною в цьому ж блоці
+                    entry["op"] = "delete"
+            lines.append(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+
+        with open(self.journal_path, "ab") as fh:
+            fh.write(b"".join(lines))
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._journal_id, self._offset, _ = self._stat()
+
+        if self.seq - self._snapshot_seq >= self.compact_every:
+            self._compact()
+
+    def compact(self) -> None:
+        """Згортає журнал у знімок і починає новий журнал."""
+        with self._flock(fcntl.LOCK_EX):
+            self._catch_up()
+            self._compact()
+
+    def _compact(self) -> None:
+        # викликається лише під EX-локом
+        save_contacts_json(
+            self.json_path,
+            self.book.to_dict(),
+            self.book.last_modified,
+            enable_backups=self.enable_backups,
+            extra_meta={"journal_seq": self.seq},
+            fsync=True,
+        )
+        # знімок уже на диску — лише тепер можна відкинути записи журналу
+        self._start_journal()
+        self._snapshot_seq = self.seq
+        logger.info("Journal compacted at seq %d", self.seq)
+
+    def _start_journal(self) -> None:
+        """Атомарно замінює журнал новим: лише заголовок з новим поколінням."""
+        header = {"journal": uuid.uuid4().hex, "base_seq": self.seq}
+        data = json.dumps(header).encode("utf-8") + b"\n"
+        tmp = self.journal_path.with_suffix(".journal.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        tmp.replace(self.journal_path)
+        fsync_dir(self.journal_path.parent)
+        self._journal_id, self._offset = header["journal"], len(data)
@@ -3,11 +3,15 @@ from __future__ import annotations
 import csv
 import random
 import shlex
+import shutil
+import sys
 from functools import wraps
+from itertools import islice
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Sequence, Tuple
 
 from address_book import AddressBook
+from birthday_index import BirthdayIndex
 from core import AppService
 from exceptions import (
     ContactNotFoundError,
@@ -16,6 +20,7 @@ from exceptions import (
     ValidationError,
 )
 from logger_setup import setup_logger
+from phone_index import PHONE_SEARCH_MODES, PhoneIndex
 from settings import SETTINGS
 from storage import (
     migrate_txt_to_json_if_needed,
@@ -23,9 +28,12 @@ from storage import (
 )
 from telemetry import record_command
 from utils import (
+    contacts_table_widths,
     format_contacts_table,
     format_stats_box,
+    iter_contacts_table,
     normalize_phone,
+    normalize_phones,
     validate_birthday,
 )
 from ux_messages import (
@@ -105,23 +113,6 @@ def require_record(book: AddressBook, name: str) -> dict:
     return record
 
 
-def extract_records_from_book(book: AddressBook) -> List[dict]:
-    """Повертає список записів для виводу (табличкою)."""
-    data = book.to_dict()
-    if not isinstance(data, dict):
-        return []
-
-    records: List[dict] = []
-    for name in sorted(data):
-        rec = data.get(name)
-        if isinstance(rec, dict):
-            copy_rec = dict(rec)
-            copy_rec.setdefault("name", name)
-            records.append(copy_rec)
-
-    return records
-
-
 # =========================
 # ДЕКОРАТОР ОБРОБКИ ПОМИЛОК ВВЕДЕННЯ
 # =========================
@@ -216,13 +207,81 @@ def show_phone(args: List[str], book: AddressBook) -> str:
     return format_contacts_table([record])
 
 
-@input_error()
-def show_all(_args: List[str], book: AddressBook) -> str:
-    """all"""
-    records = extract_records_from_book(book)
-    if not records:
+def cli_page_size() -> int:
+    """Рядків таблиці на сторінку: з налаштувань або за висотою терміналу."""
+    if SETTINGS.cli_page_size > 0:
+        return SETTINGS.cli_page_size
+    # рамки й заголовок таблиці та підказка пейджера займають 6 рядків
+    return max(5, shutil.get_terminal_size().lines - 6)
+
+
+def page_records(book: AddressBook, start: int, size: int) -> List[dict]:
+    """Записи однієї сторінки в порядку імен (без копії всієї книги)."""
+    names = book.sorted_names()[start : start + size]
+    return [book.get_record(name) for name in names]
+
+
+def page_contacts(book: AddressBook, page_size: int) -> int:
+    """Інтерактивний пейджер: форматує лише сторінку, що на екрані.
+
+    Enter — наступна сторінка, q — вихід. Повертає кількість показаних записів.
+    """
+    total = len(book)
+    widths = contacts_table_widths(
+        islice(book.iter_sorted(), SETTINGS.cli_table_width_sample)
+    )
+    shown = 0
+    while shown < total:
+        records = page_records(book, shown, page_size)
+        print("\n".join(iter_contacts_table(records, widths)))
+        shown += len(records)
+        if shown >= total:
+            break
+        try:
+            answer = input(f"-- {shown}/{total} -- Enter: next page, q: quit ")
+        except (KeyboardInterrupt, EOFError):
+            print()
+            break
+        if answer.strip().lower() in ("q", "quit"):
+            break
+    return shown
+
+
+@input_error(value_error_messages=("Please provide a valid page number.",))
+def show_all(args: List[str], book: AddressBook) -> str:
+    """all [page] - show contacts; large books are shown page by page"""
+    total = len(book)
+    if not total:
         return pick_message(NO_CONTACTS_MESSAGES)
-    return format_contacts_table(records)
+    page_size = cli_page_size()
+    pages = -(-total // page_size)
+
+    if args:
+        # одна сторінка: форматуються лише її рядки
+        page = int(args[0])
+        if not 1 <= page <= pages:
+            raise ValueError("Page out of range")
+        records = page_records(book, (page - 1) * page_size, page_size)
+        table = "\n".join(iter_contacts_table(records))
+        return f"{table}\nPage {page} of {pages} ({total} contacts)."
+
+    if total <= page_size:
+        return format_contacts_table(book.iter_sorted())
+
+    if sys.stdin.isatty() and sys.stdout.isatty():
+        shown = page_contacts(book, page_size)
+        return f"Shown {shown} of {total} contacts."
+
+    # не термінал (перенаправлення у файл/конвеєр): потоком, сторінка за сторінкою
+    lines = iter_contacts_table(
+        book.iter_sorted(), sample_size=SETTINGS.cli_table_width_sample
+    )
+    while True:
+        chunk = list(islice(lines, page_size))
+        if not chunk:
+            break
+        sys.stdout.write("\n".join(chunk) + "\n")
+    return f"Shown {total} contacts."
 
 
 @input_error(value_error_messages=("Please provide a search query.",))
@@ -247,16 +306,36 @@ def search_contact(args: List[str], book: AddressBook) -> str:
     return format_contacts_table(records)
 
 
-@input_error(value_error_messages=("Please provide days as integer (optional).",))
-def list_birthdays_cli(args: List[str], book: AddressBook) -> str:
-    """birthdays [days] - list upcoming birthdays (default 7 days)"""
+@input_error(
+    value_error_messages=("Please provide phone digits, e.g. psearch 050 123",)
+)
+def search_phone_cli(args: List[str], book: AddressBook) -> str:
+    """psearch [prefix|suffix] <digits> - search by start/end of phone number"""
+    mode = "any"
+    if args and args[0] in PHONE_SEARCH_MODES:
+        mode, args = args[0], args[1:]
+    query = " ".join(args).strip()
+
+    svc = getattr(book, "_service", None)
+    # індекс живе в сервісі; без сервісу будуємо тимчасовий над книгою
+    index = svc.phones if svc is not None else PhoneIndex(book)
+    results = index.search(query, mode=mode)
+    if not results:
+        return "No matches found."
+    return format_contacts_table(results)
+
+
+def upcoming_birthdays(book: AddressBook, days: int) -> List[Dict[str, Any]]:
+    """Найближчі дні народження саме цієї книги (з `days_until`)."""
     svc = getattr(book, "_service", None)
-    if svc is None:
-        from core import AppService
+    # індекс живе в сервісі; без сервісу будуємо тимчасовий над книгою
+    index = svc.birthdays if svc is not None else BirthdayIndex(book)
+    return index.records(days)
 
-        svc = AppService(Path(__file__).parent)
-        svc.book = book
 
+@input_error(value_error_messages=("Please provide days as integer (optional).",))
+def list_birthdays_cli(args: List[str], book: AddressBook) -> str:
+    """birthdays [days] - list upcoming birthdays (default 7 days)"""
     days = 7
     if args:
         try:
@@ -264,7 +343,7 @@ def list_birthdays_cli(args: List[str], book: AddressBook) -> str:
         except Exception:
             raise ValueError("Invalid days")
 
-    results = svc.upcoming_birthdays(days=days)
+    results = upcoming_birthdays(book, days)
     if not results:
         return "No upcoming birthdays."
     return format_contacts_table(results)
@@ -281,14 +360,7 @@ def export_birthdays_cli(args: List[str], book: AddressBook) -> str:
         except Exception:
             raise ValueError("Invalid days")
 
-    svc = getattr(book, "_service", None)
-    if svc is None:
-        from core import AppService
-
-        svc = AppService(Path(__file__).parent)
-        svc.book = book
-
-    results = svc.upcoming_birthdays(days=days)
+    results = upcoming_birthdays(book, days)
     path = Path(fname)
     import csv
 
@@ -362,8 +434,7 @@ def import_contacts(args: List[str], book: AddressBook) -> str:
     if svc is not None and hasattr(svc, "import_csv"):
         # svc.import_csv очікує Path і зафіксує одну операцію undo для всього імпорту
         try:
-            # Нормалізація телефонів всередині сервісного імпорту не застосовується —
-            # переконайтесь, що CSV містить нормалізовані номери або покладіться на перевірки AddressBook
+            # Сервісний імпорт нормалізує всі телефони одним пакетом (normalize_phones)
             res = svc.import_csv(path)
         except FileNotFoundError:
             return "File not found."
@@ -374,23 +445,23 @@ def import_contacts(args: List[str], book: AddressBook) -> str:
     added = 0
     skipped = 0
     with path.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.DictReader(fh)
-        for row in reader:
-            name = str(row.get("name", "")).strip()
-            phone = str(row.get("phone", "")).strip()
-            birthday = str(row.get("birthday", "")).strip() or None
-            notes = str(row.get("notes", "")).strip() or None
-            if not name or not phone:
-                skipped += 1
-                continue
-            try:
-                normalized = normalize_phone(
-                    phone, default_country_code=SETTINGS.default_country_code
-                )
-                book.add(name, normalized, birthday=birthday, notes=notes)
-                added += 1
-            except Exception:
-                skipped += 1
+        rows = list(csv.DictReader(fh))
+    phones, errors = normalize_phones(
+        [str(row.get("phone", "")).strip() for row in rows],
+        default_country_code=SETTINGS.default_country_code,
+    )
+    for row, normalized, error in zip(rows, phones, errors, strict=True):
+        name = str(row.get("name", "")).strip()
+        birthday = str(row.get("birthday", "")).strip() or None
+        notes = str(row.get("notes", "")).strip() or None
+        if not name or error is not None:
+            skipped += 1
+            continue
+        try:
+            book.add(name, normalized, birthday=birthday, notes=notes)
+            added += 1
+        except Exception:
+            skipped += 1
 
     return f"Imported: {added} added, {skipped} skipped."
 
@@ -549,6 +620,7 @@ def main() -> None:
         "remove": remove_contact,
         "delete": remove_contact,
         "search": search_contact,
+        "psearch": search_phone_cli,
         "rename": rename_contact,
         "stats": show_stats,
         "export": export_contacts,
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Межі кошиків гістограм латентності, секунди
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Labels, extra: Tuple[str, str] | None = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _render_callback(
+    name: str, fn: Callable[[], float | Dict[Labels, float]]
+) -> List[str]:
+    try:
+        value = fn()
+    except Exception:
+        # метрика без значень, але з HELP/TYPE — рендер не падає
+        return []
+    series = value if isinstance(value, dict) else {(): value}
+    return [
+        f"{name}{_fmt_labels(key)} {_fmt_value(float(v))}"
+        for key, v in sorted(series.items())
+    ]
+
+
+def _render_counter(name: str, series: Dict[Labels, float]) -> List[str]:
+    return [
+        f"{name}{_fmt_labels(key)} {_fmt_value(v)}" for key, v in sorted(series.items())
+    ]
+
+
+def _render_histogram(name: str, series: Dict[Labels, Any]) -> List[str]:
+    """Кумулятивні `_bucket` (з +Inf), `_sum` і `_count` для кожної серії."""
+    lines: List[str] = []
+    for key, (counts, total, count, buckets) in sorted(series.items()):
+        cumulative = 0
+        for bound, c in zip(buckets, counts, strict=False):
+            cumulative += c
+            le = _fmt_labels(key, ("le", _fmt_value(bound)))
+            lines.append(f"{name}_bucket{le} {cumulative}")
+        le = _fmt_labels(key, ("le", "+Inf"))
+        lines.append(f"{name}_bucket{le} {count}")
+        lines.append(f"{name}_sum{_fmt_labels(key)} {_fmt_value(total)}")
+        lines.append(f"{name}_count{_fmt_labels(key)} {count}")
+    return lines
+
+
+class Histogram:
+    """Гістограма з фіксованими кошиками (не кумулятивними всередині)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Мінімальний реєстр метрик у процесі з експортом у формат Prometheus.
+
+    Лічильники і гістограми оновлюються під одним легким локом; значення,
+    які дешевше прочитати в момент запиту (розмір книги, глибина undo),
+    реєструються як колбеки і обчислюються лише при рендері.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._callbacks: Dict[str, Callable[[], float | Dict[Labels, float]]] = {}
+
+    def _declare(self, name: str, kind: str, help_text: str) -> None:
+        if name not in self._meta:
+            self._meta[name] = (kind, help_text)
+
+    def inc(
+        self, name: str, value: float = 1.0, help_text: str = "", **labels: Any
+    ) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._declare(name, "counter", help_text)
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        help_text: str = "",
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        **labels: Any,
+    ) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._declare(name, "histogram", help_text)
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram(buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, help_text: str = "", **labels: Any) -> Iterator[None]:
+        """Вимірює тривалість блоку і записує її в гістограму `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, help_text, **labels)
+
+    def register_callback(
+        self,
+        name: str,
+        fn: Callable[[], float | Dict[Labels, float]],
+        help_text: str = "",
+        kind: str = "gauge",
+    ) -> None:
+        """Значення, що обчислюється під час рендеру (gauge або counter)."""
+        with self._lock:
+            self._meta[name] = (kind, help_text)
+            self._callbacks[name] = fn
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0.0)
+
+    def histogram(self, name: str, **labels: Any) -> Histogram | None:
+        with self._lock:
+            return self._histograms.get(name, {}).get(_labels(labels))
+
+    def render(self) -> str:
+        """Текстовий формат експозиції Prometheus 0.0.4."""
+        with self._lock:
+            meta = dict(self._meta)
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            histograms = {
+                n: {
+                    k: (list(h.counts), h.sum, h.count, h.buckets) for k, h in s.items()
+                }
+                for n, s in self._histograms.items()
+            }
+            callbacks = dict(self._callbacks)
+
+        lines: List[str] = []
+        for name in sorted(meta):
+            kind, help_text = meta[name]
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if name in callbacks:
+                lines.extend(_render_callback(name, callbacks[name]))
+            elif kind == "counter":
+                lines.extend(_render_counter(name, counters.get(name, {})))
+            elif kind == "histogram":
+                lines.extend(_render_histogram(name, histograms.get(name, {})))
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: кількість запитів і латентність за шаблоном маршруту.
+
+    Мітка `route` — шаблон шляху (наприклад `/contacts/{name}`), а не
+    фактичний URL, щоб кількість серій не залежала від даних.
+    """
+
+    def __init__(self, app: Any, registry: MetricsRegistry = METRICS) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            self.registry.inc(
+                "http_requests_total",
+                help_text="HTTP requests by route, method and status",
+                route=path,
+                method=method,
+                status=status,
+            )
+            self.registry.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - start,
+                help_text="HTTP request latency by route",
+                route=path,
+                method=method,
+            )
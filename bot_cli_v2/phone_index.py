@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from address_book import AddressBook
+from settings import SETTINGS
+from utils import gc_paused, normalize_phones
+
+# Режими пошуку: початок номера, кінець номера або будь-що з двох
+PHONE_SEARCH_MODES = ("any", "prefix", "suffix")
+
+# Ключ термінальної позначки у вузлі трії (цифри — "0".."9")
+_END = "$"
+
+
+def phone_digits(phones: Iterable[str]) -> List[str]:
+    """Цифри нормалізованих номерів без '+' ("+38 050 123" -> "38050123").
+
+    Номери нормалізуються одним пакетом; для тих, що не проходять
+    нормалізацію (старі дані), — просто всі цифри рядка.
+    """
+    raw = list(phones)
+    normalized, _ = normalize_phones(
+        raw, default_country_code=SETTINGS.default_country_code
+    )
+    return [
+        value[1:] if value is not None else "".join(filter(str.isdigit, phone))
+        for phone, value in zip(raw, normalized, strict=True)
+    ]
+
+
+def query_prefixes(query: str) -> List[str]:
+    """Варіанти цифр запиту для пошуку за початком номера.
+
+    '+' і '00' означають міжнародний формат. Локальний '0...' отримує код
+    країни у двох варіантах: як у normalize_phone (без нуля) і з нулем —
+    для коду "+38" нуль є частиною номера ("050..." -> "38050...").
+    """
+    q = query.strip()
+    digits = "".join(ch for ch in q if ch.isdigit())
+    if q.startswith("+"):
+        return [digits]
+    if digits.startswith("00"):
+        return [digits[2:]]
+    cc = (SETTINGS.default_country_code or "").lstrip("+")
+    if cc and digits.startswith("0"):
+        return [cc + digits.lstrip("0"), cc + digits]
+    return [digits]
+
+
+class _DigitTrie:
+    """Стиснена трія (radix) цифрових рядків.
+
+    Вузол — dict: перша цифра ребра -> (мітка ребра, дочірній вузол), а під
+    ключем `_END` — множина імен, чий рядок закінчується в цьому вузлі.
+    Ланцюжки вузлів з одним нащадком злиті в одне ребро, тож вузлів не
+    більше ніж удвічі більше за ключі, а не по одному на кожну цифру.
+    """
+
+    def __init__(self) -> None:
+        self.root: Dict[str, Any] = {}
+
+    def insert(self, key: str, name: str) -> None:
+        node = self.root
+        while key:
+            entry = node.get(key[0])
+            if entry is None:
+                node[key[0]] = (key, {_END: {name}})
+                return
+            label, child = entry
+            if key.startswith(label):
+                node, key = child, key[len(label) :]
+                continue
+            common = 1
+            while common < len(key) and label[common] == key[common]:
+                common += 1
+            # ключ розходиться з міткою посередині — ділимо ребро
+            child = {label[common]: (label[common:], child)}
+            node[key[0]] = (label[:common], child)
+            node, key = child, key[common:]
+        node.setdefault(_END, set()).add(name)
+
+    def discard(self, key: str, name: str) -> None:
+        node = self.root
+        path: List[Tuple[Dict[str, Any], str]] = []
+        while key:
+            entry = node.get(key[0])
+            if entry is None or not key.startswith(entry[0]):
+                return
+            path.append((node, key[0]))
+            node, key = entry[1], key[len(entry[0]) :]
+        names = node.get(_END)
+        if not names or name not in names:
+            return
+        names.discard(name)
+        if not names:
+            del node[_END]
+        if not path:
+            return
+        parent, digit = path[-1]
+        if not node:
+            del parent[digit]
+            # батько міг лишитися з одним нащадком — зливаємо його ребра
+            if len(path) > 1:
+                self._merge(*path[-2])
+        else:
+            self._merge(parent, digit)
+
+    @staticmethod
+    def _merge(parent: Dict[str, Any], digit: str) -> None:
+        label, node = parent[digit]
+        if _END not in node and len(node) == 1:
+            child_label, child = next(iter(node.values()))
+            parent[digit] = (label + child_label, child)
+
+    def _find(self, prefix: str) -> Dict[str, Any] | None:
+        """Вузол, під яким лежать усі рядки з префіксом `prefix` (або None).
+
+        Спуск — O(len(prefix)); префікс може закінчуватися посеред ребра.
+        """
+        node = self.root
+        while prefix:
+            entry = node.get(prefix[0])
+            if entry is None:
+                return None
+            label, child = entry
+            if prefix.startswith(label):
+                prefix = prefix[len(label) :]
+            elif not label.startswith(prefix):
+                return None
+            else:
+                prefix = ""
+            node = child
+        return node
+
+    def walk(self, prefix: str) -> Iterator[str]:
+        """Імена всіх рядків з префіксом `prefix`, у порядку цифр."""
+        node = self._find(prefix)
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            yield from sorted(node.get(_END, ()))
+            stack.extend(node[ch][1] for ch in sorted(node, reverse=True) if ch != _END)
+
+    def names(self, prefix: str) -> Set[str]:
+        """Ті самі імена, що й walk, але без упорядкування (швидше)."""
+        node = self._find(prefix)
+        out: Set[str] = set()
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            for key, value in node.items():
+                if key == _END:
+                    out.update(value)
+                else:
+                    stack.append(value[1])
+        return out
+
+
+class PhoneIndex:
+    """Індекс номерів телефонів для пошуку за початком і кінцем номера.
+
+    Дві трії над цифрами нормалізованих номерів: пряма (пошук за початком,
+    "050 123" знаходить "+38050123...") і обернена (за останніми цифрами).
+    Запит коштує O(довжини запиту) плюс обхід знайденого піддерева — без
+    перебору всієї книги.
+
+    Оновлюється через підписку на зміни книги; будується ліниво — при
+    першому пошуку або в `build()`.
+    """
+
+    def __init__(self, book: AddressBook) -> None:
+        self.book = book
+        self._lock = threading.Lock()
+        self._built = False
+        self._forward = _DigitTrie()
+        self._reverse = _DigitTrie()
+        self._digits: Dict[str, str] = {}
+        book.add_listener(self._on_change)
+
+    def build(self) -> None:
+        with self._lock:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._forward = _DigitTrie()
+        self._reverse = _DigitTrie()
+        self._digits = {}
+        records = list(self.book.iter_sorted())
+        digits = phone_digits(str(r.get("phone") or "") for r in records)
+        with gc_paused():
+            for rec, key in zip(records, digits, strict=True):
+                self._store(rec["name"], key)
+        self._built = True
+
+    def __len__(self) -> int:
+        return len(self._digits)
+
+    # ---------- оновлення ----------
+
+    def _on_change(self, op: str, name: str | None, old_name: str | None) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            if op == "reset" or name is None:
+                self._rebuild()
+                return
+            if old_name is not None:
+                self._release(old_name)
+            self._release(name)
+            if op != "remove":
+                phone = str(self.book.get_record(name).get("phone") or "")
+                self._store(name, phone_digits([phone])[0])
+
+    def _store(self, name: str, digits: str) -> None:
+        if not digits:
+            return
+        self._digits[name] = digits
+        self._forward.insert(digits, name)
+        self._reverse.insert(digits[::-1], name)
+
+    def _release(self, name: str) -> None:
+        digits = self._digits.pop(name, None)
+        if digits is not None:
+            self._forward.discard(digits, name)
+            self._reverse.discard(digits[::-1], name)
+
+    # ---------- пошук ----------
+
+    def search(
+        self, query: str, mode: str = "any", limit: int | None = None
+    ) -> List[Dict[str, Any]]:
+        """Контакти, чий номер починається або закінчується цифрами запиту.
+
+        mode: "prefix" — за початком (локальний формат "050..." розуміється
+        як "+38050..."), "suffix" — за останніми цифрами, "any" — обидва.
+        Результат відсортовано за ім'ям, як у AddressBook.search; `limit`
+        бере перші за ім'ям, а не перші знайдені в трії. Трії віддають лише
+        імена, тож записи читаються тільки для тих, що потрапили в ліміт.
+        """
+        if mode not in PHONE_SEARCH_MODES:
+            raise ValueError(f"Unknown phone search mode: {mode}")
+        tail = "".join(ch for ch in query if ch.isdigit())
+        if not tail:
+            raise ValueError("Phone query must contain digits")
+        with self._lock:
+            if not self._built:
+                self._rebuild()
+            found: Set[str] = set()
+            if mode in ("any", "prefix"):
+                for head in query_prefixes(query):
+                    found |= self._forward.names(head)
+            if mode in ("any", "suffix"):
+                found |= self._reverse.names(tail[::-1])
+        if limit is None:
+            names = sorted(found, key=str.casefold)
+        else:
+            names = heapq.nsmallest(limit, found, key=str.casefold)
+        out: List[Dict[str, Any]] = []
+        for name in names:
+            try:
+                out.append(self.book.get_record(name))
+            except Exception:
+                # запис видалено між пошуком і читанням
+                continue
+        return out
@@ -1,94 +1,22 @@
+import copy
 import csv
+import html
+import io
 import os
 import smtplib
-import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date
 from email.message import EmailMessage
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 from core import AppService
+from settings import SETTINGS
 
+REMINDER_FIELDS = ("name", "phone", "birthday", "days_until", "notes")
 
-def export_reminders(data_dir: Path | str, out_path: Path | str, days: int = 7) -> int:
-    """Експортує майбутні дні народження у CSV файл. Повертає кількість експортованих рядків."""
-    data_dir = Path(data_dir)
-    out_path = Path(out_path)
-    svc = AppService(data_dir)
-    rows = svc.upcoming_birthdays(days=days)
-
-    with out_path.open("w", encoding="utf-8", newline="") as fh:
-        writer = csv.DictWriter(
-            fh, fieldnames=["name", "phone", "birthday", "days_until", "notes"]
-        )  # type: ignore[arg-type]
-        writer.writeheader()
-        for r in rows:
-            writer.writerow(
-                {
-                    "name": r.get("name", ""),
-                    "phone": r.get("phone", ""),
-                    "birthday": r.get("birthday", ""),
-                    "days_until": r.get("days_until", ""),
-                    "notes": r.get("notes", ""),
-                }
-            )
-
-    return len(rows)
-
-
-def send_reminders_email(
-    data_dir: Path | str, smtp_settings: Optional[Dict[str, str]] = None, days: int = 7
-) -> str:
-    """Генерує CSV з майбутніми днями народження і надсилає його як вкладення електронною поштою.
-
-    Ключі smtp_settings: server, port, username, password, from_addr, to_addrs (через кому).
-    Якщо smtp_settings == None, читає налаштування з змінних оточення:
-      SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASS, SMTP_FROM, SMTP_TO
-
-    Повертає message-id або піднімає виняток при помилці.
-    """
-    data_dir = Path(data_dir)
-    smtp = smtp_settings or {}
-    if not smtp:
-        smtp = {
-            "server": os.environ.get("SMTP_SERVER"),
-            "port": os.environ.get("SMTP_PORT"),
-            "username": os.environ.get("SMTP_USER"),
-            "password": os.environ.get("SMTP_PASS"),
-            "from_addr": os.environ.get("SMTP_FROM"),
-            "to_addrs": os.environ.get("SMTP_TO"),
-        }
-
-    required = ["server", "port", "from_addr", "to_addrs"]
-    missing = [k for k in required if not smtp.get(k)]
-    if missing:
-        raise ValueError(f"Missing SMTP settings: {', '.join(missing)}")
-
-    # створити тимчасовий CSV файл
-    with tempfile.NamedTemporaryFile(
-        prefix="birthdays_", suffix=".csv", delete=False
-    ) as tf:
-        out_path = Path(tf.name)
-    try:
-        # підготувати сервіс та експортувати CSV
-        svc = AppService(data_dir)
-        count = export_reminders(data_dir, out_path, days=days)
-
-        # отримати рядки від сервісу
-        rows = svc.upcoming_birthdays(days=days)
-
-        msg = EmailMessage()
-        msg["Subject"] = f"Upcoming birthdays: {count} in next {days} days"
-        msg["From"] = smtp["from_addr"]
-        msg["To"] = smtp["to_addrs"]
-
-        # Текстова (plain) підсумкова частина листа
-        plain = f"{count} upcoming birthdays in the next {days} days. See attached CSV or HTML table.\n"
-
-        # Побудувати HTML за допомогою Jinja2 якщо доступно для кращого шаблону
-        try:
-            from jinja2 import Template
-
-            tpl = Template("""
+_HTML_TEMPLATE = """
 <html><body>
 <p>{{ count }} upcoming birthdays in the next {{ days }} days.</p>
 <table border=1 cellpadding=4 cellspacing=0>
@@ -106,66 +34,394 @@ def send_reminders_email(
   </tbody>
 </table>
 </body></html>
-""")
-
-            # перетворити рядки на об'єкти для зручності у шаблоні
-            class _R:
-                def __init__(self, d):
-                    self.name = d.get("name", "")
-                    self.phone = d.get("phone", "")
-                    self.birthday = d.get("birthday", "")
-                    self.days_until = d.get("days_until", "")
-                    self.notes = d.get("notes", "")
-
-            html_table = tpl.render(count=count, days=days, rows=[_R(r) for r in rows])
-        except Exception:
-            html_rows = []
-            for r in rows:
-                name = r.get("name", "")
-                phone = r.get("phone", "")
-                bday = r.get("birthday", "")
-                days_until = r.get("days_until", "")
-                notes = r.get("notes", "")
-                html_rows.append(
-                    f"<tr><td>{name}</td><td>{phone}</td><td>{bday}</td><td>{days_until}</td><td>{notes}</td></tr>"
-                )
+"""
 
-            html_table = (
-                "<html><body>"
-                f"<p>{count} upcoming birthdays in the next {days} days.</p>"
-                "<table border=1 cellpadding=4 cellspacing=0>"
-                "<thead><tr><th>Name</th><th>Phone</th><th>Birthday</th><th>Days Until</th><th>Notes</th></tr></thead>"
-                "<tbody>" + "\n".join(html_rows) + "</tbody></table></body></html>"
-            )
-
-        msg.set_content(plain)
-        msg.add_alternative(html_table, subtype="html")
-
-        # Додати CSV як вкладення
-        with out_path.open("rb") as fh:
-            data = fh.read()
-        msg.add_attachment(data, maintype="text", subtype="csv", filename=out_path.name)
-
-        server = smtp["server"]
-        port = int(smtp["port"])
-        username = smtp.get("username")
-        password = smtp.get("password")
-        if username and password:
-            s = smtplib.SMTP(server, port, timeout=30)
-            s.starttls()
-            s.login(username, password)
-        else:
-            s = smtplib.SMTP(server, port, timeout=30)
+# Шаблон компілюється один раз; без Jinja2 HTML збирається вручну
+try:
+    from jinja2 import Template as _JinjaTemplate
+
+    _TEMPLATE = _JinjaTemplate(_HTML_TEMPLATE, autoescape=True)
+except Exception:
+    _TEMPLATE = None
+
+
+def reminder_rows(
+    data_dir: Path | str, days: int = 7, service: AppService | None = None
+) -> List[Dict[str, Any]]:
+    """Майбутні дні народження як рядки звіту (поля REMINDER_FIELDS).
+
+    Книга завантажується один раз (або береться готовий `service`); відсутні
+    значення стають порожніми рядками, тож CSV і HTML показують однакове.
+    """
+    svc = service or AppService(Path(data_dir))
+    return [
+        {field: "" if r.get(field) is None else r[field] for field in REMINDER_FIELDS}
+        for r in svc.upcoming_birthdays(days=days)
+    ]
+
+
+def reminders_csv(rows: List[Dict[str, Any]]) -> str:
+    """CSV-текст звіту, зібраний у пам'яті."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=REMINDER_FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def reminders_html(rows: List[Dict[str, Any]], days: int) -> str:
+    """HTML-таблиця звіту: через Jinja2, якщо він встановлений, інакше вручну."""
+    count = len(rows)
+    if _TEMPLATE is not None:
+        return _TEMPLATE.render(count=count, days=days, rows=rows)
+    html_rows = [
+        "<tr>"
+        + "".join(f"<td>{html.escape(str(r[f]))}</td>" for f in REMINDER_FIELDS)
+        + "</tr>"
+        for r in rows
+    ]
+    return (
+        "<html><body>"
+        f"<p>{count} upcoming birthdays in the next {days} days.</p>"
+        "<table border=1 cellpadding=4 cellspacing=0>"
+        "<thead><tr><th>Name</th><th>Phone</th><th>Birthday</th>"
+        "<th>Days Until</th><th>Notes</th></tr></thead>"
+        "<tbody>" + "\n".join(html_rows) + "</tbody></table></body></html>"
+    )
+
+
+def build_reminder_message(
+    rows: List[Dict[str, Any]],
+    days: int,
+    from_addr: str,
+    to_addrs: str,
+    filename: str,
+) -> EmailMessage:
+    """Лист з підсумком, HTML-таблицею і CSV-вкладенням з тих самих рядків."""
+    count = len(rows)
+    msg = EmailMessage()
+    msg["Subject"] = f"Upcoming birthdays: {count} in next {days} days"
+    msg["From"] = from_addr
+    msg["To"] = to_addrs
+
+    # Текстова (plain) підсумкова частина листа
+    msg.set_content(
+        f"{count} upcoming birthdays in the next {days} days. "
+        "See attached CSV or HTML table.\n"
+    )
+    msg.add_alternative(reminders_html(rows, days), subtype="html")
+    msg.add_attachment(
+        reminders_csv(rows).encode("utf-8"),
+        maintype="text",
+        subtype="csv",
+        filename=filename,
+    )
+    return msg
+
+
+def export_reminders(data_dir: Path | str, out_path: Path | str, days: int = 7) -> int:
+    """Експортує майбутні дні народження у CSV файл. Повертає кількість експортованих рядків."""
+    rows = reminder_rows(data_dir, days=days)
+    with Path(out_path).open("w", encoding="utf-8", newline="") as fh:
+        fh.write(reminders_csv(rows))
+    return len(rows)
+
+
+def smtp_settings_from_env() -> Dict[str, Optional[str]]:
+    """SMTP-налаштування зі змінних оточення (SMTP_SERVER, SMTP_PORT, ...)."""
+    return {
+        "server": os.environ.get("SMTP_SERVER"),
+        "port": os.environ.get("SMTP_PORT"),
+        "username": os.environ.get("SMTP_USER"),
+        "password": os.environ.get("SMTP_PASS"),
+        "from_addr": os.environ.get("SMTP_FROM"),
+        "to_addrs": os.environ.get("SMTP_TO"),
+    }
+
+
+@dataclass
+class SendResult:
+    """Підсумок надсилання одного листа."""
+
+    recipient: str
+    ok: bool
+    attempts: int
+    error: str = ""
 
-        try:
-            s.send_message(msg)
-            s.quit()
-        finally:
-            pass
 
-        return f"sent:{out_path.name}"
-    finally:
+def is_transient_smtp_error(exc: BaseException) -> bool:
+    """Чи є сенс повторити надсилання після цієї помилки.
+
+    Тимчасові: обрив з'єднання, мережеві помилки та відповіді сервера 4xx
+    ("спробуйте пізніше"). Відповіді 5xx, помилка входу тощо — остаточні.
+    """
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in exc.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    # SMTPException теж OSError, тож сюди доходять лише мережеві помилки
+    return isinstance(exc, OSError)
+
+
+def _close_quietly(conn: smtplib.SMTP) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class ReminderMailer:
+    """Надсилання листів через одне SMTP-з'єднання, пакетами і з повторами.
+
+    З'єднання (з STARTTLS і входом, якщо задано логін і пароль) відкривається
+    при першому листі й використовується для наступних. Після `batch_size`
+    листів воно закривається і відкривається заново — сервери обмежують
+    кількість листів за сесію. Тимчасові помилки (is_transient_smtp_error)
+    повторюються до `max_retries` разів з експоненційною затримкою
+    (`backoff`, 2·`backoff`, ... не більше `backoff_max`); обірване
+    з'єднання перед повтором відкривається знову.
+
+    Використовується як контекстний менеджер: на виході — QUIT.
+    """
+
+    def __init__(
+        self,
+        server: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        timeout: float | None = None,
+        batch_size: int | None = None,
+        max_retries: int | None = None,
+        backoff: float | None = None,
+        backoff_max: float | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.server = server
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.timeout = SETTINGS.smtp_timeout_seconds if timeout is None else timeout
+        self.batch_size = max(1, batch_size or SETTINGS.smtp_batch_size)
+        self.max_retries = (
+            SETTINGS.smtp_max_retries if max_retries is None else max_retries
+        )
+        self.backoff = (
+            SETTINGS.smtp_retry_backoff_seconds if backoff is None else backoff
+        )
+        self.backoff_max = (
+            SETTINGS.smtp_retry_backoff_max_seconds
+            if backoff_max is None
+            else backoff_max
+        )
+        self.sleep = sleep
+        self._conn: smtplib.SMTP | None = None
+        self._sent_on_conn = 0
+        # скільки спроб зайняв останній send (і вдалий, і ні)
+        self.last_attempts = 0
+
+    @classmethod
+    def from_settings(
+        cls, smtp: Dict[str, Optional[str]], **kwargs: Any
+    ) -> "ReminderMailer":
+        """Мейлер зі словника налаштувань (як у smtp_settings_from_env)."""
+        return cls(
+            smtp["server"],
+            int(smtp["port"]),
+            smtp.get("username"),
+            smtp.get("password"),
+            **kwargs,
+        )
+
+    def __enter__(self) -> "ReminderMailer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ---------- з'єднання ----------
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._conn is not None and self._sent_on_conn >= self.batch_size:
+            # пакет надіслано — наступний іде новою сесією
+            self.close()
+        if self._conn is None:
+            # smtplib.SMTP шукається під час виклику, щоб його можна було підмінити
+            conn = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+            try:
+                if self.username and self.password:
+                    conn.starttls()
+                    conn.login(self.username, self.password)
+            except BaseException:
+                _close_quietly(conn)
+                raise
+            self._conn = conn
+            self._sent_on_conn = 0
+        return self._conn
+
+    def _drop(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            _close_quietly(conn)
+
+    def close(self) -> None:
+        """Завершує сесію (QUIT); обірване з'єднання просто закривається."""
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
         try:
-            out_path.unlink()
+            conn.quit()
         except Exception:
-            pass
+            _close_quietly(conn)
+
+    # ---------- надсилання ----------
+
+    def _delay(self, attempt: int) -> float:
+        return min(self.backoff * 2 ** (attempt - 1), self.backoff_max)
+
+    def send(self, msg: EmailMessage) -> int:
+        """Надсилає лист з повторами. Повертає кількість спроб.
+
+        Остаточна помилка (або тимчасова після всіх повторів) піднімається.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            self.last_attempts = attempt
+            try:
+                self._connect().send_message(msg)
+            except Exception as exc:
+                # після відмови сервера (крім 421) сесія жива — smtplib уже
+                # зробив RSET; обірване з'єднання відкривається заново
+                if (
+                    not isinstance(exc, smtplib.SMTPException)
+                    or isinstance(exc, smtplib.SMTPServerDisconnected)
+                    or getattr(exc, "smtp_code", None) == 421
+                ):
+                    self._drop()
+                if attempt > self.max_retries or not is_transient_smtp_error(exc):
+                    raise
+                self.sleep(self._delay(attempt))
+                continue
+            self._sent_on_conn += 1
+            return attempt
+
+    def send_all(self, messages: Iterable[EmailMessage]) -> List[SendResult]:
+        """Надсилає листи по черзі; невдача одного не зупиняє решту.
+
+        Лише помилка входу (SMTPAuthenticationError) перериває розсилку —
+        з тими самими обліковими даними не пройде жоден лист.
+        """
+        results: List[SendResult] = []
+        for msg in messages:
+            recipient = str(msg["To"] or "")
+            try:
+                attempts = self.send(msg)
+            except smtplib.SMTPAuthenticationError:
+                raise
+            except Exception as exc:
+                results.append(
+                    SendResult(recipient, False, self.last_attempts, repr(exc))
+                )
+                continue
+            results.append(SendResult(recipient, True, attempts))
+        return results
+
+
+def reminder_messages(
+    rows: List[Dict[str, Any]],
+    days: int,
+    from_addr: str,
+    recipients: Iterable[str],
+    filename: str,
+) -> List[EmailMessage]:
+    """Окремий лист кожному адресату (у To лише його адреса).
+
+    HTML і CSV рендеряться один раз; кожен лист — копія готового листа з
+    власним To. Порожні адреси й повтори пропускаються.
+    """
+    base = build_reminder_message(rows, days, from_addr, "", filename)
+    seen = set()
+    out: List[EmailMessage] = []
+    for addr in recipients:
+        addr = addr.strip()
+        if addr and addr.lower() not in seen:
+            seen.add(addr.lower())
+            # закодовані частини — рядки, тож копіюється лише структура листа
+            msg = copy.deepcopy(base)
+            msg.replace_header("To", addr)
+            out.append(msg)
+    return out
+
+
+def _checked_smtp_settings(
+    smtp_settings: Optional[Dict[str, str]],
+) -> Dict[str, Optional[str]]:
+    smtp = smtp_settings or smtp_settings_from_env()
+    required = ["server", "port", "from_addr", "to_addrs"]
+    missing = [k for k in required if not smtp.get(k)]
+    if missing:
+        raise ValueError(f"Missing SMTP settings: {', '.join(missing)}")
+    return smtp
+
+
+def send_reminders_email(
+    data_dir: Path | str,
+    smtp_settings: Optional[Dict[str, str]] = None,
+    days: int = 7,
+    mailer: ReminderMailer | None = None,
+) -> str:
+    """Надсилає майбутні дні народження листом з HTML-таблицею і CSV-вкладенням.
+
+    Ключі smtp_settings: server, port, username, password, from_addr, to_addrs (через кому).
+    Якщо smtp_settings == None, читає налаштування з змінних оточення:
+      SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASS, SMTP_FROM, SMTP_TO
+
+    Книга завантажується і рядки рахуються один раз; CSV і HTML будуються
+    з них у пам'яті, без тимчасових файлів. Надсилає ReminderMailer (з
+    повторами при тимчасових помилках); готовий `mailer` лишається відкритим.
+
+    Повертає "sent:<ім'я вкладення>" або піднімає виняток при помилці.
+    """
+    smtp = _checked_smtp_settings(smtp_settings)
+    rows = reminder_rows(data_dir, days=days)
+    filename = f"birthdays_{date.today().isoformat()}.csv"
+    msg = build_reminder_message(
+        rows, days, smtp["from_addr"], smtp["to_addrs"], filename
+    )
+
+    if mailer is not None:
+        mailer.send(msg)
+    else:
+        with ReminderMailer.from_settings(smtp) as own:
+            own.send(msg)
+    return f"sent:{filename}"
+
+
+def send_reminders_per_recipient(
+    data_dir: Path | str,
+    smtp_settings: Optional[Dict[str, str]] = None,
+    days: int = 7,
+    mailer: ReminderMailer | None = None,
+) -> List[SendResult]:
+    """Як send_reminders_email, але окремий лист кожному адресату з to_addrs.
+
+    Усі листи йдуть одним з'єднанням (пакетами по SETTINGS.smtp_batch_size);
+    невдача одного адресата не зупиняє решту. Повертає SendResult на кожен лист.
+    """
+    smtp = _checked_smtp_settings(smtp_settings)
+    rows = reminder_rows(data_dir, days=days)
+    filename = f"birthdays_{date.today().isoformat()}.csv"
+    messages = reminder_messages(
+        rows, days, smtp["from_addr"], smtp["to_addrs"].split(","), filename
+    )
+
+    if mailer is not None:
+        return mailer.send_all(messages)
+    with ReminderMailer.from_settings(smtp) as own:
+        return own.send_all(messages)
@@ -1,7 +1,32 @@
 from __future__ import annotations
 
+import argparse
+import os
+
 import uvicorn
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="run_api", description="AddressBook HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes (>1 enables the shared journal mode)",
+    )
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Воркери ділять одну директорію даних: запис через журнал під
+        # файловим локом, читачі дочитують журнал перед кожним запитом
+        os.environ["AB_SHARED_DATA"] = "1"
+
     # Запустити з хостом/портом за замовчуванням
-    uvicorn.run("api_server:app", host="127.0.0.1", port=8000, reload=False)
+    uvicorn.run(
+        "api_server:app",
+        host=args.host,
+        port=args.port,
+        reload=False,
+        workers=args.workers,
+    )
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from typing import Any, Dict
+
+from address_book import AddressBook
+
+try:
+    import orjson as _orjson
+
+    _ORJSON_AVAILABLE = True
+except Exception:
+    _ORJSON_AVAILABLE = False
+
+
+def dumps(obj: Any) -> bytes:
+    """Серіалізує об'єкт у компактний JSON (UTF-8).
+
+    Використовує orjson, якщо він встановлений, інакше стандартний json.
+    """
+    if _ORJSON_AVAILABLE:
+        return _orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class Payload:
+    """Готове тіло JSON-відповіді з ліниво стиснутим gzip-варіантом.
+
+    Стиснення виконується один раз при першому запиті з Accept-Encoding:
+    gzip і далі віддається з пам'яті разом із сирими байтами.
+    """
+
+    __slots__ = ("_gzip", "level", "raw")
+
+    def __init__(self, raw: bytes, level: int = 6) -> None:
+        self.raw = raw
+        self.level = level
+        self._gzip: bytes | None = None
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def gzip(self) -> bytes:
+        if self._gzip is None:
+            # mtime=0 — однакові байти для однакового тіла
+            self._gzip = gzip.compress(self.raw, compresslevel=self.level, mtime=0)
+        return self._gzip
+
+
+class EncodedBook:
+    """Готові JSON-байти кожного запису і повного списку контактів.
+
+    Підписується на зміни AddressBook і перекодовує лише змінені записи.
+    Повний список збирається з готових байтів записів (без повторної
+    серіалізації) і кешується до наступної зміни книги.
+    """
+
+    def __init__(self, book: AddressBook) -> None:
+        self.book = book
+        self._records: Dict[str, bytes] = {}
+        self._listing: bytes | None = None
+        self._listing_version = -1
+        self._payload: Payload | None = None
+        self._lock = threading.Lock()
+        self._rebuild()
+        book.add_listener(self._on_change)
+
+    def close(self) -> None:
+        self.book.remove_listener(self._on_change)
+
+    def _rebuild(self) -> None:
+        with self._lock:
+            self._records = {rec["name"]: dumps(rec) for rec in self.book.iter_sorted()}
+            self._listing = None
+
+    def _on_change(self, op: str, name: str | None, old_name: str | None) -> None:
+        if op == "reset" or name is None:
+            self._rebuild()
+            return
+        with self._lock:
+            if old_name is not None:
+                self._records.pop(old_name, None)
+            if op == "remove":
+                self._records.pop(name, None)
+            else:
+                self._records[name] = dumps(self.book.get_record(name))
+            self._listing = None
+
+    def record(self, name: str) -> bytes | None:
+        """JSON-байти запису або None, якщо контакту немає."""
+        return self._records.get(name)
+
+    def listing(self) -> bytes:
+        """JSON-масив усіх записів у порядку імен."""
+        with self._lock:
+            version = self.book.version
+            if self._listing is None or self._listing_version != version:
+                # запис може бути ще не закодований, якщо зміна саме
+                # відбувається; тоді listener скине цей кеш одразу після
+                parts = map(self._records.get, self.book.sorted_names())
+                self._listing = b"[" + b",".join(filter(None, parts)) + b"]"
+                self._listing_version = version
+            return self._listing
+
+    def listing_payload(self, level: int = 6) -> Payload:
+        """Повний список як Payload: gzip-варіант кешується до наступної зміни."""
+        body = self.listing()
+        with self._lock:
+            if self._payload is None or self._payload.raw is not body:
+                self._payload = Payload(body, level)
+            return self._payload
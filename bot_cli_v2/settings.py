@@ -13,6 +13,12 @@ class Settings:
     # Автодопомога після N порожніх Enter
     auto_help_every_empty_inputs: int = 6
 
+    # Вивід `all` у CLI: книги, більші за сторінку, виводяться посторінково
+    # (0 — розмір сторінки за висотою терміналу); ширини колонок беруться
+    # з вибірки перших записів
+    cli_page_size: int = 0
+    cli_table_width_sample: int = 1000
+
     # Підтвердження небезпечних дій (remove/delete)
     require_remove_confirmation: bool = True
     remove_confirm_word: str = "YES"
@@ -20,6 +26,9 @@ class Settings:
     # Нормалізація телефонів
     # Якщо номер починається з 0 (локальний формат) — підставляємо код країни
     default_country_code: str = "+38"  # можеш змінити на "+353" для Ірландії
+    # Скільки різних вхідних рядків пам'ятає кеш нормалізації (імпорти,
+    # пошук дублікатів і індекси часто бачать ті самі номери)
+    phone_normalize_cache_size: int = 65536
 
     # Файли даних
     contacts_json_name: str = "contacts.json"
@@ -28,5 +37,44 @@ class Settings:
     # Експорт/імпорт
     export_default_name: str = "contacts_export.csv"
 
+    # Пошук дублікатів (dedup.py): поріг схожості імен 0-100, скільки
+    # останніх цифр телефону порівнювати і максимальний розмір блоку
+    dedup_name_threshold: float = 90.0
+    dedup_phone_suffix_digits: int = 9
+    dedup_max_block_size: int = 100
+
+    # Розсилка нагадувань (reminder.ReminderMailer): тайм-аут SMTP, скільки
+    # листів надсилати одним з'єднанням, повтори з експоненційною затримкою
+    smtp_timeout_seconds: float = 30.0
+    smtp_batch_size: int = 100
+    smtp_max_retries: int = 3
+    smtp_retry_backoff_seconds: float = 1.0
+    smtp_retry_backoff_max_seconds: float = 30.0
+
+    # HTTP API
+    api_max_page_size: int = 1000
+    api_max_batch_size: int = 10000
+    # LRU-кеш відповідей /fsearch і /birthdays
+    api_cache_max_entries: int = 1024
+    api_cache_ttl_seconds: float = 30.0
+    # gzip-стиснення відповідей, більших за поріг (байти); рівень 1-9
+    api_gzip_min_size: int = 1024
+    api_gzip_level: int = 6
+    # Потік змін /contacts/stream (SSE): розмір кільця подій для
+    # відновлення за Last-Event-ID та інтервал heartbeat-коментарів
+    change_feed_size: int = 1000
+    sse_heartbeat_seconds: float = 15.0
+    # Дельта-синхронізація /contacts/changes: скільки tombstone-ів видалених
+    # і перейменованих записів пам'ятати
+    change_index_max_tombstones: int = 10000
+
+    # Group commit для конкурентних запитів на запис у HTTP API:
+    # зміни, що прийшли протягом вікна, зберігаються одним записом
+    group_commit_window_ms: float = 2.0
+
+    # Спільна директорія даних для кількох воркерів API:
+    # журнал згортається у contacts.json кожні N записів
+    journal_compact_every: int = 1000
+
 
 SETTINGS = Settings()
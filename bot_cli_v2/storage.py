@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import glob
 import json
+import os
 import shutil
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
+from metrics import METRICS
+
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -18,12 +22,19 @@ def load_contacts_json(path: Path) -> Tuple[Dict[str, Any], str | None]:
     Підтримуються застарілі формати, де значення — рядок з телефоном,
     і новий формат, де значення — повний словник запису. Повертає (contacts, last_modified).
     """
+    contacts, meta = load_snapshot(path)
+    lm = meta.get("last_modified")
+    return contacts, lm if isinstance(lm, str) else None
+
+
+def load_snapshot(path: Path) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Як `load_contacts_json`, але повертає весь блок meta (наприклад, journal_seq)."""
     if not path.exists():
-        return {}, None
+        return {}, {}
 
     data = json.loads(path.read_text(encoding="utf-8"))
 
-    last_modified = None
+    meta: Dict[str, Any] = {}
     # Якщо payload обгорнуто у структуру з полем contacts і meta
     if (
         isinstance(data, dict)
@@ -31,15 +42,12 @@ def load_contacts_json(path: Path) -> Tuple[Dict[str, Any], str | None]:
         and isinstance(data["contacts"], dict)
     ):
         raw_contacts = data["contacts"]
-        meta = data.get("meta")
-        if isinstance(meta, dict):
-            lm = meta.get("last_modified")
-            if isinstance(lm, str):
-                last_modified = lm
+        if isinstance(data.get("meta"), dict):
+            meta = data["meta"]
     elif isinstance(data, dict):
         raw_contacts = data
     else:
-        return {}, None
+        return {}, {}
 
     contacts: Dict[str, Any] = {}
     for k, v in raw_contacts.items():
@@ -59,7 +67,7 @@ def load_contacts_json(path: Path) -> Tuple[Dict[str, Any], str | None]:
             "updated_at": created,
         }
 
-    return contacts, last_modified
+    return contacts, meta
 
 
 def save_contacts_json(
@@ -67,11 +75,16 @@ def save_contacts_json(
     contacts: Dict[str, Any],
     last_modified: str | None,
     enable_backups: bool = True,
-) -> None:
+    extra_meta: Dict[str, Any] | None = None,
+    fsync: bool = False,
+) -> int:
     """Зберегти контакти. Підтримує mapping name->record-dict або name->phone-string (застарілий).
 
     Нормалізує просту застарілу структуру до формату record перед збереженням.
+    `extra_meta` додається до блоку meta. `fsync=True` гарантує, що дані та
+    перейменування дійшли до диска до повернення. Повертає кількість записаних байтів.
     """
+    start = time.perf_counter()
     normalized: Dict[str, Any] = {}
     for name, rec in contacts.items():
         if isinstance(rec, dict):
@@ -84,18 +97,51 @@ def save_contacts_json(
                 "updated_at": None,
             }
 
-    payload = {"contacts": normalized, "meta": {"last_modified": last_modified}}
+    meta: Dict[str, Any] = {"last_modified": last_modified, **(extra_meta or {})}
+    payload = {"contacts": normalized, "meta": meta}
 
+    data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
     tmp_path = path.with_suffix(path.suffix + ".tmp")
-    tmp_path.write_text(
-        json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+        if fsync:
+            fh.flush()
+            os.fsync(fh.fileno())
 
     # Якщо цільовий файл існує — створити timestamped backup перед заміною та очистити старі бекапи
     if path.exists() and enable_backups:
-        _create_backup(path)
+        with METRICS.timer(
+            "storage_backup_duration_seconds", help_text="Backup creation time"
+        ):
+            _create_backup(path)
 
     tmp_path.replace(path)
+    if fsync:
+        fsync_dir(path.parent)
+
+    METRICS.observe(
+        "storage_save_duration_seconds",
+        time.perf_counter() - start,
+        help_text="Full contacts.json rewrite time, including backup",
+    )
+    METRICS.inc(
+        "storage_save_bytes_total", len(data), help_text="Bytes written by saves"
+    )
+    return len(data)
+
+
+def fsync_dir(directory: Path) -> None:
+    """fsync каталогу, щоб перейменування файлу теж стало довговічним (POSIX)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 def _create_backup(path: Path, max_backups: int = 5) -> None:
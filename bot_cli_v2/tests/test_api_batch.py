@@ -0,0 +1,86 @@
+from fastapi.testclient import TestClient
+
+
+def test_batch_create_patch_delete(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+
+    items = [
+        {"name": "BatchA", "phone": "+380501230400"},
+        {"name": "BatchB", "phone": "+380501230401", "notes": "b"},
+    ]
+    r = client.post("/contacts/batch", json=items)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["applied"] is True
+    assert [x["ok"] for x in body["results"]] == [True, True]
+
+    # часткове оновлення: телефон лишається, змінюється лише нотатка
+    r = client.patch("/contacts/batch", json=[{"name": "BatchA", "notes": "new"}])
+    assert r.status_code == 200
+    rec = client.get("/contacts/BatchA").json()
+    assert rec["notes"] == "new"
+    assert rec["phone"] == "+380501230400"
+
+    r = client.request("DELETE", "/contacts/batch", json=["BatchA", "BatchB"])
+    assert r.status_code == 200
+    assert client.get("/contacts/BatchB").status_code == 404
+
+
+def test_batch_is_all_or_nothing(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+
+    items = [
+        {"name": "BatchC", "phone": "+380501230402"},
+        {"name": "BatchD", "phone": "+380501230402"},  # дублікат телефону
+    ]
+    r = client.post("/contacts/batch", json=items)
+    assert r.status_code == 400
+    body = r.json()
+    assert body["applied"] is False
+    assert body["results"][0]["ok"] is True
+    assert body["results"][1]["ok"] is False
+    # перший елемент відкочено
+    assert client.get("/contacts/BatchC").status_code == 404
+
+
+def test_failed_batch_leaves_book_and_file_untouched(tmp_path):
+    from core import AppService
+
+    svc = AppService(tmp_path)
+    svc.add("Alice", "+380501230403")
+    svc.add("Bob", "+380501230404")
+    before = svc.get("Alice")
+    version = svc.book.version
+    files = sorted(p.name for p in tmp_path.iterdir())
+    events = []
+    svc.book.add_listener(lambda op, name, old: events.append((op, name)))
+
+    applied, results = svc.remove_many(["Alice", "Missing"])
+    assert applied is False
+    assert [r["ok"] for r in results] == [True, False]
+    # кроки з'ясовуються до змін: книга, події і файли — як були
+    assert svc.get("Alice") == before
+    assert svc.book.version == version
+    assert events == []
+    assert sorted(p.name for p in tmp_path.iterdir()) == files
+
+    # перевірка враховує попередні елементи пакета
+    applied, results = svc.change_many(
+        [
+            {"name": "Alice", "phone": "+380501230405"},
+            {"name": "Bob", "phone": "+380501230403"},
+            {"name": "Bob", "phone": "+380501230405"},
+        ]
+    )
+    assert [r["ok"] for r in results] == [True, True, False]
+    assert svc.book.version == version
+    applied, _ = svc.add_many(
+        [{"name": "Cara", "phone": "+380501230406"}, {"name": "Cara", "phone": "+1"}]
+    )
+    assert applied is False and svc.book.version == version
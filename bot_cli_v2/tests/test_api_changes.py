@@ -0,0 +1,108 @@
+from fastapi.testclient import TestClient
+
+from core import AppService
+
+
+def test_change_index_tombstones_and_floor(tmp_path):
+    svc = AppService(tmp_path, enable_backups=False)
+    svc.add("Delta A", "+380501230500")
+    svc.add("Delta B", "+380501230501")
+    base = svc.book.version
+
+    svc.change("Delta A", "+380501230502")
+    svc.rename("Delta B", "Delta C")
+    changes, full, version = svc.changes_since(version=base)
+    assert not full
+    assert version == svc.book.version
+    assert [(c["name"], c["deleted"]) for c in changes] == [
+        ("Delta A", False),
+        ("Delta B", True),
+        ("Delta C", False),
+    ]
+    assert changes[0]["record"]["phone"] == "+380501230502"
+    assert changes[1]["record"] is None
+
+    # за міткою часу — лише те, що змінилося пізніше
+    stamp = changes[-1]["updated_at"]
+    svc.remove("Delta A")
+    changes, full, _ = svc.changes_since(timestamp=stamp)
+    assert not full
+    assert [(c["name"], c["deleted"]) for c in changes] == [("Delta A", True)]
+
+    # до побудови індексу видалення невідомі — повна відповідь
+    reloaded = AppService(tmp_path, enable_backups=False)
+    changes, full, _ = reloaded.changes_since(version=0)
+    assert full
+    assert [c["name"] for c in changes] == ["Delta C"]
+
+
+def test_changes_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+    r = client.get("/contacts/changes")
+    assert r.status_code == 200
+    first = r.json()
+    assert first["full"] is True
+
+    client.post("/contacts", json={"name": "Sync A", "phone": "+380501230510"})
+    client.delete("/contacts/Sync A")
+    client.post("/contacts", json={"name": "Sync B", "phone": "+380501230511"})
+
+    r = client.get(
+        "/contacts/changes",
+        params={"since": first["version"], "epoch": first["epoch"]},
+    )
+    body = r.json()
+    assert body["full"] is False
+    assert body["version"] == first["version"] + 3
+    assert [(c["name"], c["deleted"]) for c in body["changes"]] == [
+        ("Sync A", True),
+        ("Sync B", False),
+    ]
+
+    # версія з іншої епохи не порівнюється — повна відповідь
+    r = client.get("/contacts/changes", params={"since": 1, "epoch": "other"})
+    assert r.json()["full"] is True
+    # версія без епохи теж: вона могла прийти від іншого процесу
+    r = client.get("/contacts/changes", params={"since": first["version"]})
+    assert r.json()["full"] is True
+
+    assert client.get("/contacts/changes?since=yesterday").status_code == 400
+
+
+def test_change_index_tolerates_non_iso_updated_at(tmp_path):
+    import json
+
+    (tmp_path / "contacts.json").write_text(
+        json.dumps(
+            {
+                "contacts": {
+                    "Legacy": {
+                        "name": "Legacy",
+                        "phone": "+380501230520",
+                        "created_at": "01.02.2024",
+                        "updated_at": "01.02.2024",
+                    },
+                    "Modern": {
+                        "name": "Modern",
+                        "phone": "+380501230521",
+                        "updated_at": "2024-03-01T10:00:00+00:00",
+                    },
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    # раніше ChangeIndex падав на такій книзі ще в AppService.__init__
+    svc = AppService(tmp_path, enable_backups=False)
+    changes, full, _ = svc.changes_since()
+    assert full
+    # нерозбірна мітка — найстаріша
+    assert [c["name"] for c in changes] == ["Legacy", "Modern"]
+    base = svc.book.version
+    svc.change("Legacy", "+380501230522")
+    changes, full, _ = svc.changes_since(version=base)
+    assert not full
+    assert [c["name"] for c in changes] == ["Legacy"]
@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+
+
+def test_large_responses_are_gzipped(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import _encoded, app
+
+    client = TestClient(app)
+    # книга api_server спільна для тестів: номери, яких більше ніде немає
+    for i in range(20):
+        r = client.post(
+            "/contacts", json={"name": f"Gzip {i:02d}", "phone": f"+3805012302{i:02d}"}
+        )
+        assert r.status_code == 201
+
+    r = client.get("/contacts", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert any(c["name"] == "Gzip 00" for c in r.json())
+    # стиснутий варіант повного списку закешовано разом із сирими байтами
+    payload = _encoded().listing_payload()
+    assert payload._gzip is not None
+    r = client.get("/contacts", headers={"Accept-Encoding": "gzip"})
+    assert _encoded().listing_payload()._gzip is payload._gzip
+
+    r = client.get("/contacts", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+    assert r.headers["vary"] == "Accept-Encoding"
+
+    # сторінки списку стискає middleware
+    r = client.get("/contacts?limit=20", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+
+    # малі відповіді йдуть як є
+    r = client.get("/contacts/Gzip 00", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
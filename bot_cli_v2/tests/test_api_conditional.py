@@ -0,0 +1,77 @@
+from fastapi.testclient import TestClient
+
+
+def test_etag_304_until_book_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+
+    r = client.post("/contacts", json={"name": "Etta", "phone": "+380501230300"})
+    assert r.status_code == 201
+
+    r = client.get("/contacts/Etta")
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    assert "Last-Modified" in r.headers
+
+    # та сама версія книги -> 304 без тіла
+    r = client.get("/contacts/Etta", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+    r = client.get("/contacts", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    # після зміни ETag вже не збігається
+    r = client.put("/contacts/Etta", json={"name": "Etta", "phone": "+380501230301"})
+    assert r.status_code == 200
+    r = client.get("/contacts/Etta", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    assert r.json()["phone"] == "+380501230301"
+
+
+def test_birthdays_etag_includes_day(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+
+    contacts_etag = client.get("/contacts").headers["ETag"]
+    birthdays_etag = client.get("/birthdays").headers["ETag"]
+    assert birthdays_etag != contacts_etag
+
+    r = client.get("/birthdays", headers={"If-None-Match": birthdays_etag})
+    assert r.status_code == 304
+
+
+def test_etag_is_weak_across_content_codings(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+
+    plain = client.get("/contacts", headers={"Accept-Encoding": "identity"})
+    packed = client.get("/contacts", headers={"Accept-Encoding": "gzip"})
+    # різні байтові подання одного стану — лише слабкий валідатор
+    assert plain.headers["ETag"].startswith('W/"')
+    assert packed.headers["ETag"] == plain.headers["ETag"]
+
+    strong = plain.headers["ETag"].removeprefix("W/")
+    r = client.get("/contacts", headers={"If-None-Match": strong})
+    assert r.status_code == 304
+
+
+def test_bad_parameters_win_over_not_modified(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+
+    etag = client.get("/contacts").headers["ETag"]
+    headers = {"If-None-Match": etag}
+    assert client.get("/contacts?fields=nope", headers=headers).status_code == 400
+    assert client.get("/contacts?cursor=a", headers=headers).status_code == 400
+    r = client.get("/phone-search?query=abc", headers=headers)
+    assert r.status_code == 400
@@ -0,0 +1,34 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+
+def test_export_ndjson_filtered_and_csv_gzip(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+
+    client.post("/contacts", json={"name": "ExportB", "phone": "+380501230501"})
+    client.post(
+        "/contacts",
+        json={"name": "ExportA", "phone": "+380501230500", "birthday": "1990-03-04"},
+    )
+
+    r = client.get("/contacts/export", params={"q": "export"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["name"] for row in rows] == ["ExportA", "ExportB"]
+
+    r = client.get(
+        "/contacts/export",
+        params={"format": "csv", "gzip": "true", "q": "export", "has_birthday": "true"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    # httpx розпаковує gzip автоматично
+    reader = csv.DictReader(io.StringIO(r.text))
+    assert [row["name"] for row in reader] == ["ExportA"]
@@ -20,3 +20,20 @@ def test_api_fuzzy_search_create_and_find(tmp_path, monkeypatch):
     assert r.status_code == 200
     data = r.json()
     assert any(d.get("name") == "Charlie" for d in data)
+
+
+def test_api_fuzzy_search_batch(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+    client.post("/contacts", json={"name": "Batchy Fuzz", "phone": "+380501234998"})
+
+    r = client.post(
+        "/fsearch/batch", json={"queries": ["batchy fuz", "qqqqqqqq"], "limit": 3}
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert [d["query"] for d in data] == ["batchy fuz", "qqqqqqqq"]
+    assert data[0]["results"][0]["name"] == "Batchy Fuzz"
+    assert data[1]["results"] == []
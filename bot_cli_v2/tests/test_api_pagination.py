@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+
+
+def test_contacts_paging_with_cursor_and_fields(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+
+    names = [f"Page{i:02d}" for i in range(5)]
+    for i, name in enumerate(names):
+        r = client.post(
+            "/contacts", json={"name": name, "phone": f"+3805077700{i:02d}"}
+        )
+        assert r.status_code == 201
+
+    # пройти всі сторінки по 2 записи, починаючи перед першим "Page"
+    seen = []
+    r = client.get("/contacts", params={"limit": 2, "after": "Page", "fields": "phone"})
+    while True:
+        assert r.status_code == 200
+        assert int(r.headers["X-Total-Count"]) >= len(names)
+        page = r.json()
+        assert all(set(rec) == {"phone"} for rec in page)
+        seen.extend(rec["phone"] for rec in page)
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        r = client.get(
+            "/contacts", params={"limit": 2, "cursor": cursor, "fields": "phone"}
+        )
+
+    expected = [f"+3805077700{i:02d}" for i in range(5)]
+    assert seen[: len(expected)] == expected
+
+
+def test_contacts_unknown_field_rejected(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+    r = client.get("/contacts", params={"fields": "name,password"})
+    assert r.status_code == 400
@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+
+def test_ready_after_lifespan_warm_up(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    # без запуску lifespan прогріву не було
+    assert TestClient(app).get("/ready").status_code == 503
+
+    with TestClient(app) as client:
+        r = client.get("/ready")
+        assert r.status_code == 200
+        body = r.json()
+        assert body["status"] == "ready"
+        assert {"load_book", "sorted_names", "encode_listing"} <= set(body["phases"])
+
+        metrics = client.get("/metrics").text
+        assert 'api_startup_phase_seconds{phase="encode_listing"}' in metrics
+
+    assert TestClient(app).get("/ready").status_code == 503
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+from changes import ChangeFeed
+from core import AppService
+
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+
+def _parse(chunk: bytes):
+    fields = {}
+    for line in chunk.decode("utf-8").strip().splitlines():
+        key, _, value = line.partition(": ")
+        fields[key] = value
+    return fields
+
+
+def test_feed_since_detects_gaps(tmp_path):
+    svc = AppService(tmp_path, enable_backups=False)
+    feed = ChangeFeed(svc.book, maxlen=2)
+    start = feed.last_version
+
+    svc.add("Feed A", "+380501230400")
+    svc.add("Feed B", "+380501230401")
+    events, complete = feed.since(start + 1)
+    assert complete
+    assert [e["name"] for e in events] == ["Feed B"]
+    assert events[0]["record"]["phone"] == "+380501230401"
+
+    # третя подія витісняє першу з кільця — з початку відновитися не вийде
+    svc.rename("Feed A", "Feed C")
+    events, complete = feed.since(start)
+    assert not complete
+    events, complete = feed.since(start + 1)
+    assert complete
+    assert [(e["op"], e["name"], e["old_name"]) for e in events] == [
+        ("add", "Feed B", None),
+        ("rename", "Feed C", "Feed A"),
+    ]
+    # версія з майбутнього (інший процес/перезапуск) — теж неповна
+    assert feed.since(feed.last_version + 5) == ([], False)
+
+
+def test_sse_stream_live_and_resume(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import _sse_events
+
+    svc = AppService(tmp_path, enable_backups=False)
+
+    async def scenario():
+        stream = _sse_events(_Request(), svc.feed, heartbeat=5.0)
+        assert (await stream.__anext__()).startswith(b"retry:")
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        svc.add("Stream A", "+380501230410")
+        first = _parse(await asyncio.wait_for(pending, 2.0))
+        await stream.aclose()
+
+        svc.change("Stream A", "+380501230411")
+        svc.remove("Stream A")
+        # відновлення з id першої події: обидві пропущені зміни по порядку
+        resumed = _sse_events(_Request(), svc.feed, first["id"], heartbeat=5.0)
+        await resumed.__anext__()
+        later = [_parse(await resumed.__anext__()) for _ in range(2)]
+        await resumed.aclose()
+
+        # id з чужої епохи -> reset
+        foreign = _sse_events(_Request(), svc.feed, "deadbeef-1", heartbeat=5.0)
+        await foreign.__anext__()
+        reset = _parse(await foreign.__anext__())
+        await foreign.aclose()
+        return first, later, reset
+
+    first, later, reset = asyncio.run(scenario())
+    assert first["event"] == "add"
+    assert first["id"] == f"{svc.book.epoch}-{json.loads(first['data'])['version']}"
+    assert [e["event"] for e in later] == ["change", "remove"]
+    assert json.loads(later[0]["data"])["record"]["phone"] == "+380501230411"
+    assert reset["event"] == "reset"
+    assert reset["id"] == f"{svc.book.epoch}-{svc.book.version}"
+
+
+def test_shared_refresh_runs_off_the_event_loop(tmp_path, monkeypatch):
+    import inspect
+    import threading
+
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import _sse_events, _sync_shared_book
+
+    # синхронна залежність -> FastAPI викликає її в threadpool
+    assert not inspect.iscoroutinefunction(_sync_shared_book)
+
+    svc = AppService(tmp_path, enable_backups=False)
+    threads = []
+
+    async def scenario():
+        stream = _sse_events(
+            _Request(),
+            svc.feed,
+            heartbeat=0.05,
+            refresh=lambda: threads.append(threading.current_thread()),
+        )
+        await stream.__anext__()
+        keep_alive = await asyncio.wait_for(stream.__anext__(), 2.0)
+        await stream.aclose()
+        return keep_alive
+
+    assert asyncio.run(scenario()) == b": keep-alive\n\n"
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BENCH = Path(__file__).resolve().parent.parent / "bin" / "bench_api.py"
+
+
+def test_bench_inprocess_smoke(tmp_path):
+    out = tmp_path / "report.json"
+    subprocess.run(
+        [
+            sys.executable,
+            str(BENCH),
+            "--contacts",
+            "200",
+            "--requests",
+            "60",
+            "--concurrency",
+            "4",
+            "--data-dir",
+            str(tmp_path / "data"),
+            "--out",
+            str(out),
+        ],
+        check=True,
+        capture_output=True,
+        timeout=120,
+    )
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["config"]["contacts"] == 200
+    assert report["total"]["requests"] == 60
+    assert report["total"]["errors"] == 0
+    assert report["total"]["p50_ms"] <= report["total"]["p99_ms"]
+    assert set(report["ops"]) == {"read", "page", "write", "fuzzy", "birthdays"}
@@ -0,0 +1,81 @@
+from datetime import date
+
+from address_book import AddressBook
+from birthday_index import BirthdayIndex
+from utils import parse_iso_date
+
+
+def test_parse_iso_date_fast_path_and_fallback():
+    assert parse_iso_date("1990-05-01") == (1990, 5, 1)
+    assert parse_iso_date("2024-02-29") == (2024, 2, 29)
+    assert parse_iso_date("2023-02-29") is None
+    assert parse_iso_date("1990-13-01") is None
+    assert parse_iso_date("0000-01-01") is None
+    # не фіксована розмітка — як у strptime("%Y-%m-%d")
+    assert parse_iso_date("1990-5-1") == (1990, 5, 1)
+    assert parse_iso_date("01.05.1990") is None
+
+
+def test_upcoming_wraps_year_and_orders_by_days_then_name():
+    book = AddressBook()
+    book.add("Zoryana", "+380501231001", birthday="1990-12-31")
+    book.add("Andrii", "+380501231002", birthday="1985-12-31")
+    book.add("Bohdan", "+380501231003", birthday="2000-01-02")
+    book.add("Later", "+380501231004", birthday="2000-01-20")
+    book.add("Broken", "+380501231005", birthday="not a date")
+    index = BirthdayIndex(book)
+
+    today = date(2025, 12, 30)
+    assert index.upcoming(7, today) == [("Andrii", 1), ("Zoryana", 1), ("Bohdan", 3)]
+    assert index.upcoming(-1, today) == []
+    assert len(index) == 4
+
+
+def test_feb_29_birthdays_fall_on_feb_28_in_common_years():
+    book = AddressBook()
+    book.add("Leap", "+380501231010", birthday="2000-02-29")
+    book.add("Feb28", "+380501231011", birthday="1999-02-28")
+    index = BirthdayIndex(book)
+
+    assert index.upcoming(3, date(2025, 2, 27)) == [("Feb28", 1), ("Leap", 1)]
+    assert index.upcoming(3, date(2028, 2, 27)) == [("Feb28", 1), ("Leap", 2)]
+    # за рік уперед кожен контакт лише раз, з найближчою датою
+    assert index.upcoming(400, date(2027, 3, 1)) == [
+        ("Feb28", 364),
+        ("Leap", 365),
+    ]
+
+
+def test_birthday_index_follows_mutations():
+    book = AddressBook()
+    book.add("Olena", "+380501231020", birthday="1990-06-01")
+    index = BirthdayIndex(book)
+    index.build()
+
+    book.change("Olena", "+380501231020", birthday="1990-06-05")
+    assert index.get("Olena") == (1990, 6, 5)
+    assert index.upcoming(2, date(2025, 6, 1)) == []
+
+    book.rename("Olena", "Olena K")
+    book.add("Petro", "+380501231021", birthday="1991-06-05")
+    assert index.upcoming(0, date(2025, 6, 5)) == [("Olena K", 0), ("Petro", 0)]
+
+    book.remove("Petro")
+    assert index.upcoming(0, date(2025, 6, 5)) == [("Olena K", 0)]
+    book.load_from_dict({})
+    assert len(index) == 0
+
+
+def test_cli_birthdays_use_the_given_book_without_service(tmp_path):
+    from datetime import timedelta
+
+    from main_bot_cli_v3 import export_birthdays_cli, list_birthdays_cli
+
+    book = AddressBook()
+    soon = (date.today() + timedelta(days=2)).isoformat()
+    book.add("Soon Cli", "+380501231010", birthday=soon)
+
+    assert "Soon Cli" in list_birthdays_cli(["7"], book)
+    out = tmp_path / "bd.csv"
+    assert export_birthdays_cli([str(out), "7"], book).startswith("Exported 1 ")
+    assert f"Soon Cli,+380501231010,{soon},2," in out.read_text(encoding="utf-8")
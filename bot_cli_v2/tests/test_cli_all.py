@@ -0,0 +1,64 @@
+import io
+from itertools import count, islice
+
+import main_bot_cli_v3 as cli
+from address_book import AddressBook
+from utils import TABLE_COLUMN_CAPS, format_contacts_table, iter_contacts_table
+
+
+def _book(n):
+    book = AddressBook()
+    for i in range(n):
+        book.add(f"Contact {i:03d}", f"+380501{i:06d}")
+    return book
+
+
+def test_iter_contacts_table_is_lazy_and_capped():
+    def endless():
+        for i in count():
+            yield {"name": "N" * (i % 80 + 1), "phone": "+380501234567"}
+
+    # ширини з вибірки; нескінченне джерело не матеріалізується
+    lines = list(islice(iter_contacts_table(endless(), sample_size=10), 60))
+    assert len({len(line) for line in lines}) == 1
+    name_width = len(lines[1].split("|")[1]) - 2
+    assert name_width == 10
+    assert lines[13].split("|")[1].strip() == "N" * 7 + "..."
+    assert all(
+        len(cell) - 2 <= cap
+        for cell, cap in zip(lines[3].split("|")[1:-1], TABLE_COLUMN_CAPS, strict=True)
+    )
+
+
+def test_iter_contacts_table_matches_full_table_for_short_values():
+    records = [{"name": "Ann", "phone": "+380501230000", "notes": "hi"}]
+    assert "\n".join(iter_contacts_table(records)) == format_contacts_table(records)
+
+
+def test_show_all_pages_and_streams(monkeypatch, capsys):
+    monkeypatch.setattr(cli, "cli_page_size", lambda: 10)
+    book = _book(25)
+
+    page = cli.show_all(["3"], book)
+    assert "Contact 020" in page and "Contact 019" not in page
+    assert page.endswith("Page 3 of 3 (25 contacts).")
+    assert cli.show_all(["4"], book) == "Please provide a valid page number."
+
+    # не термінал: уся книга потоком, сторінками
+    assert cli.show_all([], book) == "Shown 25 contacts."
+    out = capsys.readouterr().out
+    assert out.count("Contact ") == 25
+
+
+def test_show_all_interactive_pager_formats_only_viewed_pages(monkeypatch, capsys):
+    monkeypatch.setattr(cli, "cli_page_size", lambda: 10)
+    tty = io.StringIO()
+    tty.isatty = lambda: True
+    monkeypatch.setattr(cli.sys, "stdin", tty)
+    monkeypatch.setattr(cli.sys.stdout, "isatty", lambda: True, raising=False)
+    answers = iter(["", "q"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    assert cli.show_all([], _book(35)) == "Shown 20 of 35 contacts."
+    out = capsys.readouterr().out
+    assert "Contact 019" in out and "Contact 020" not in out
@@ -0,0 +1,77 @@
+import csv
+import json
+
+import pytest
+
+from dedup import candidate_pairs, find_duplicates, phone_key, write_suggestions
+
+
+def _rec(name, phone=None, **extra):
+    return {"name": name, "phone": phone, **extra}
+
+
+def test_reordered_names_and_phone_formats_are_paired():
+    records = [
+        _rec("Ivan Petrenko", "+380501234567", birthday="1990-01-01"),
+        _rec("Petrenko Ivan", "+380671112233"),
+        _rec("Olena Shevchenko", "050 765 43 21"),
+        _rec("O. Shevchenko", "+380507654321"),
+        _rec("Taras Bondar", "+380931112233"),
+    ]
+    pairs = find_duplicates(records, threshold=90)
+    by_names = {frozenset((p.keep, p.drop)): p for p in pairs}
+
+    ivan = by_names[frozenset(("Ivan Petrenko", "Petrenko Ivan"))]
+    assert ivan.score == 100.0 and ivan.reasons == "name"
+    # лишається повніший запис
+    assert ivan.keep == "Ivan Petrenko"
+
+    olena = by_names[frozenset(("Olena Shevchenko", "O. Shevchenko"))]
+    assert olena.same_phone and "phone" in olena.reasons
+    assert not any("Taras Bondar" in key for key in by_names)
+
+
+def test_phone_key_ignores_format_and_country_code():
+    assert phone_key("050 123 45 67") == phone_key("+380501234567")
+    assert phone_key("12") is None
+
+
+def test_oversized_blocks_are_skipped():
+    names = ["anna"] * 5 + ["bohdan kovalenko", "kovalenko bohdan"]
+    phones = [None] * 7
+    name_pairs, _ = candidate_pairs(names, phones, max_block=4)
+    # блок "anna" (5 записів) пропущено; блоки Коваленка лишилися
+    assert name_pairs == {(5, 6)}
+
+
+def test_write_suggestions_csv_and_json(tmp_path):
+    pairs = find_duplicates(
+        [_rec("Ivan Petrenko", "+380501234567"), _rec("Petrenko Ivan")]
+    )
+    assert write_suggestions(pairs, tmp_path / "d.csv") == 1
+    with (tmp_path / "d.csv").open(encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    assert rows[0]["keep"] == "Ivan Petrenko"
+    assert rows[0]["drop"] == "Petrenko Ivan"
+
+    write_suggestions(pairs, tmp_path / "d.json", fmt="json")
+    data = json.loads((tmp_path / "d.json").read_text(encoding="utf-8"))
+    assert data[0]["score"] == 100.0 and data[0]["same_phone"] is False
+
+
+def test_score_pairs_without_numpy_reuses_pool(monkeypatch):
+    import dedup
+    import utils
+
+    left = ["ivan petrenko", "olena", "taras bondar", "anna"] * 3
+    right = ["petrenko ivan", "olena", "taras bondarenko", "hanna"] * 3
+    expected = dedup.score_pairs(left, right)
+
+    monkeypatch.setattr(dedup, "_NP_AVAILABLE", False)
+    monkeypatch.setattr(dedup, "POOL_CHUNK_PAIRS", 5)
+    # cpdist рахує у float32
+    expected = pytest.approx(expected, abs=1e-4)
+    assert dedup.score_pairs(left, right, workers=2) == expected
+    pool = utils._POOLS["dedup"][2]
+    assert dedup.score_pairs(left, right, workers=2) == expected
+    assert utils._POOLS["dedup"][2] is pool
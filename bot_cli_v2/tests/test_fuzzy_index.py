@@ -0,0 +1,152 @@
+import random
+from difflib import SequenceMatcher
+
+import fuzzy_index
+import utils
+from address_book import AddressBook
+from fuzzy_index import FuzzyIndex
+from utils import difflib_top_k, fuzzy_search
+
+
+def test_fuzzy_index_follows_mutations():
+    book = AddressBook()
+    book.add("Olena Shevchenko", "+380501230900")
+    book.add("Petro Ivanenko", "+380501230901")
+    index = FuzzyIndex(book)
+    assert [r["name"] for r in index.search("olena shev")] == ["Olena Shevchenko"]
+
+    book.rename("Olena Shevchenko", "Olena Kovalenko")
+    book.remove("Petro Ivanenko")
+    book.add("Oleh Kovalenko", "+380501230902")
+    assert len(index) == 2
+
+    names = [r["name"] for r in index.search("KOVALENKO")]
+    assert set(names) == {"Olena Kovalenko", "Oleh Kovalenko"}
+    assert index.search("Ivanenko", score_cutoff=90) == []
+    # слот видаленого запису перевикористано
+    assert len(index._choices) == 2
+
+    book.load_from_dict({"Taras": {"name": "Taras", "phone": "+380501230903"}})
+    assert [r["name"] for r in index.search("taras")] == ["Taras"]
+
+
+def test_fuzzy_search_keeps_records_with_identical_text():
+    records = [
+        {"name": "Anna", "phone": "+380501230910"},
+        {"name": "Hanna", "phone": "+380501230910"},
+    ]
+    found = fuzzy_search("+380501230910", records, key_fields=["phone"])
+    assert sorted(r["name"] for r in found) == ["Anna", "Hanna"]
+
+
+def _brute_force(query, choices, limit, cutoff):
+    scored = []
+    for idx, choice in enumerate(choices):
+        score = int(SequenceMatcher(None, query, choice).ratio() * 100)
+        if score >= cutoff:
+            scored.append((idx, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:limit]
+
+
+def test_difflib_top_k_matches_full_scan():
+    rnd = random.Random(7)
+    letters = "abcdeklmnor"
+    choices = [
+        "".join(rnd.choice(letters) for _ in range(rnd.randint(4, 12)))
+        for _ in range(300)
+    ]
+    for query in ("abcde", "kolmo", "rrnnaa", "ab"):
+        for cutoff in (30, 60):
+            assert difflib_top_k(query, choices, 5, cutoff) == _brute_force(
+                query, choices, 5, cutoff
+            )
+
+
+def test_fallback_index_without_rapidfuzz(monkeypatch):
+    monkeypatch.setattr(fuzzy_index, "_RF_AVAILABLE", False)
+    book = AddressBook()
+    for i, name in enumerate(["Maryna Bondar", "Marta Bondarenko", "Ihor Melnyk"]):
+        book.add(name, f"+38050123092{i}")
+    index = fuzzy_index.FuzzyIndex(book)
+
+    found = index.search("maryna bondar | +380501230920")
+    assert [r["name"] for r in found][:1] == ["Maryna Bondar"]
+
+    book.change("Ihor Melnyk", "+380501230929")
+    book.rename("Marta Bondarenko", "Marta Koval")
+    assert "marta koval | +380501230921" in index._choices
+    # інвертований список відповідає поточним рядкам слотів
+    expected = {}
+    for slot, choice in enumerate(index._choices):
+        if choice is not None:
+            for gram in fuzzy_index.trigrams(choice):
+                expected.setdefault(gram, set()).add(slot)
+    assert index._postings == expected
+    found = index.search("marta koval | +380501230921", limit=1)
+    assert [r["name"] for r in found] == ["Marta Koval"]
+    found = index.search("ihor melnyk | +380501230929", limit=1)
+    assert [r["name"] for r in found] == ["Ihor Melnyk"]
+
+
+def _sample_book():
+    book = AddressBook()
+    rnd = random.Random(3)
+    first = ["Ivan", "Olha", "Petro", "Iryna", "Taras", "Oksana", "Bohdan"]
+    last = ["Petrenko", "Koval", "Shevchenko", "Bondar", "Melnyk", "Tkachenko"]
+    for i in range(120):
+        name = f"{rnd.choice(first)} {rnd.choice(last)} {i}"
+        book.add(name, f"+380501{i:06d}")
+    return book
+
+
+def test_search_many_matches_single_queries():
+    book = _sample_book()
+    index = FuzzyIndex(book)
+    queries = ["ivan petrenko", "Olha Koval 7", "", "tkachenko", "zzzz"]
+    batched = index.search_many(queries, limit=5)
+    assert len(batched) == len(queries)
+    for query, found in zip(queries, batched, strict=True):
+        assert found == index.search(query, limit=5)
+
+
+def test_search_many_fallback_process_pool(monkeypatch):
+    monkeypatch.setattr(fuzzy_index, "_RF_AVAILABLE", False)
+    monkeypatch.setattr(fuzzy_index, "POOL_MIN_QUERIES", 4)
+    book = _sample_book()
+    index = fuzzy_index.FuzzyIndex(book)
+    book.remove(book.sorted_names()[0])
+    queries = [f"{name.lower()} | +380501" for name in book.sorted_names()[:6]]
+    batched = index.search_many(queries, limit=3, workers=2)
+    for query, found in zip(queries, batched, strict=True):
+        assert found == index.search(query, limit=3)
+
+    # пул живе між викликами і переживає зміни книги: вони надсилаються
+    # з задачами поверх знімка
+    pool = utils._POOLS["fuzzy_index"][2]
+    assert index.search_many(queries, limit=3, workers=2) == batched
+    assert utils._POOLS["fuzzy_index"][2] is pool
+    book.remove(book.sorted_names()[0])
+    book.rename(book.sorted_names()[1], "Zenon Ivanenko")
+    queries.append("zenon ivanenko")
+    again = index.search_many(queries, limit=3, workers=2)
+    assert utils._POOLS["fuzzy_index"][2] is pool
+    for query, found in zip(queries, again, strict=True):
+        assert found == index.search(query, limit=3)
+    assert again[-1][0]["name"] == "Zenon Ivanenko"
+
+    # забагато змін — воркери отримують новий знімок
+    monkeypatch.setattr(fuzzy_index, "POOL_MAX_DELTA", 1)
+    book.remove(book.sorted_names()[0])
+    index.search_many(queries, limit=3, workers=2)
+    assert utils._POOLS["fuzzy_index"][2] is not pool
+
+
+def test_search_many_without_numpy(monkeypatch):
+    monkeypatch.setattr(fuzzy_index, "_NP_AVAILABLE", False)
+    book = _sample_book()
+    index = FuzzyIndex(book)
+    queries = ["ivan petrenko", "", "tkachenko"]
+    batched = index.search_many(queries, limit=5)
+    for query, found in zip(queries, batched, strict=True):
+        assert found == index.search(query, limit=5)
@@ -0,0 +1,116 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from core import AppService
+
+
+def test_concurrent_writes_share_commits(tmp_path: Path):
+    svc = AppService(tmp_path, enable_backups=False, group_commit_window=0.02)
+    json_path = tmp_path / "contacts.json"
+    errors = []
+
+    def worker(i: int) -> None:
+        name = f"Group{i:02d}"
+        svc.add(name, f"+3805012310{i:02d}")
+        # підтвердження лише після запису: контакт уже у файлі
+        saved = json.loads(json_path.read_text(encoding="utf-8"))["contacts"]
+        if name not in saved:
+            errors.append(name)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert svc.count() == 20
+    assert svc._committer.commits < 20
+
+
+def test_failed_group_write_reaches_every_waiter(tmp_path: Path, monkeypatch):
+    import core
+    from exceptions import PersistenceError
+    from group_commit import GroupCommitter
+
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise OSError("disk full")
+
+    committer = GroupCommitter(fail, window=0.05)
+    tickets = [committer.request() for _ in range(3)]
+    outcomes = []
+
+    def waiter(ticket: int) -> None:
+        try:
+            committer.wait(ticket)
+            outcomes.append("ok")
+        except OSError:
+            outcomes.append("error")
+
+    threads = [threading.Thread(target=waiter, args=(t,)) for t in tickets]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # один запис на групу, і жодна з трьох змін не вважається збереженою
+    assert len(calls) == 1
+    assert outcomes == ["error"] * 3
+    assert committer._errors == {}
+
+    def broken_save(*args, **kwargs):
+        raise OSError("disk full")
+
+    svc = AppService(tmp_path, enable_backups=False, group_commit_window=0.0)
+    monkeypatch.setattr(core, "save_contacts_json", broken_save)
+    with pytest.raises(PersistenceError, match="disk full"):
+        svc.add("Unsaved", "+380501231100")
+
+
+def test_failed_group_save_leaves_book_unchanged(tmp_path: Path, monkeypatch):
+    import core
+    from exceptions import PersistenceError
+
+    svc = AppService(tmp_path, enable_backups=False, group_commit_window=0.0)
+    svc.add("Kept", "+380501231200")
+    version = svc.book.version
+    real_save = core.save_contacts_json
+
+    def broken_save(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(core, "save_contacts_json", broken_save)
+    with pytest.raises(PersistenceError):
+        svc.add("Ann", "+380501231201")
+    # невдала зміна не видна ні читачам, ні undo
+    assert [r["name"] for r in svc.all()] == ["Kept"]
+    assert svc.undo_depth() == 1
+    assert svc.book.version != version
+
+    monkeypatch.setattr(core, "save_contacts_json", real_save)
+    svc.add("Bob", "+380501231202")
+    saved = json.loads((tmp_path / "contacts.json").read_text(encoding="utf-8"))
+    assert sorted(saved["contacts"]) == ["Bob", "Kept"]
+
+
+def test_aborted_changes_fail_with_the_group():
+    from group_commit import GroupCommitter
+
+    late = []
+
+    def fail():
+        # зміна, що прийшла під час запису, відкидається разом з групою
+        late.append(committer.request())
+        committer.abort_pending()
+        raise OSError("disk full")
+
+    committer = GroupCommitter(fail, window=0.0)
+    with pytest.raises(OSError):
+        committer.wait(committer.request())
+    with pytest.raises(OSError):
+        committer.wait(late[0])
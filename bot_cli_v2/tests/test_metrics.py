@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from metrics import MetricsRegistry
+
+
+def test_histogram_rendering():
+    reg = MetricsRegistry()
+    reg.observe("op_seconds", 0.003, help_text="Op time", buckets=(0.001, 0.01), op="x")
+    reg.observe("op_seconds", 0.5, buckets=(0.001, 0.01), op="x")
+    reg.inc("ops_total", op="x")
+
+    text = reg.render()
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{op="x",le="0.001"} 0' in text
+    assert 'op_seconds_bucket{op="x",le="0.01"} 1' in text
+    assert 'op_seconds_bucket{op="x",le="+Inf"} 2' in text
+    assert 'op_seconds_count{op="x"} 2' in text
+    assert 'ops_total{op="x"} 1' in text
+
+
+def test_metrics_endpoint_reports_routes_and_storage(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+    client.post("/contacts", json={"name": "Metra", "phone": "+380501230800"})
+    client.get("/contacts/Metra")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    text = r.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/contacts/{name}"}'
+        in text
+    )
+    assert "storage_save_duration_seconds_count" in text
+    assert "storage_save_bytes_total" in text
+    assert "addressbook_contacts" in text
+    assert "api_cache_hits_total" in text
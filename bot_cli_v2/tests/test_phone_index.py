@@ -0,0 +1,96 @@
+import random
+
+from fastapi.testclient import TestClient
+
+from address_book import AddressBook
+from phone_index import PhoneIndex, _DigitTrie
+
+
+def _names(records):
+    return [r["name"] for r in records]
+
+
+def test_prefix_and_suffix_lookups_ignore_format():
+    book = AddressBook()
+    book.add("Olena", "+380501234567")
+    book.add("Petro", "+380671234567")
+    book.add("Taras", "+48501234000")
+    index = PhoneIndex(book)
+
+    # локальний формат із пробілами -> "+38050123..."
+    assert _names(index.search("050 123")) == ["Olena"]
+    assert _names(index.search("+48 50", mode="prefix")) == ["Taras"]
+    assert _names(index.search("1234567", mode="suffix")) == ["Olena", "Petro"]
+    assert _names(index.search("45-67")) == ["Olena", "Petro"]
+    assert index.search("999") == []
+    assert len(index.search("1234567", limit=1)) == 1
+
+    # ліміт бере перші за ім'ям, а не перші в порядку цифр трії
+    book.add("Andriy", "+380509999999")
+    assert _names(index.search("050", mode="prefix", limit=1)) == ["Andriy"]
+    assert _names(index.search("+380", mode="prefix", limit=2)) == ["Andriy", "Olena"]
+
+
+def test_phone_index_follows_mutations():
+    book = AddressBook()
+    book.add("Olena", "+380501234567")
+    index = PhoneIndex(book)
+    index.build()
+
+    book.change("Olena", "+380931112233")
+    assert index.search("050 123") == []
+    assert _names(index.search("093 111")) == ["Olena"]
+
+    book.rename("Olena", "Olena K")
+    book.add("Petro", "+380501234567")
+    assert _names(index.search("2233")) == ["Olena K"]
+    assert _names(index.search("050")) == ["Petro"]
+
+    book.remove("Petro")
+    assert index.search("050") == []
+    assert len(index) == 1
+    # видалення прибирає порожні вузли і знову зливає ребра трії
+    assert index._forward.root == {"3": ("380931112233", {"$": {"Olena K"}})}
+
+    book.load_from_dict({"Taras": {"name": "Taras", "phone": "+380661230000"}})
+    assert _names(index.search("066")) == ["Taras"]
+
+
+def test_digit_trie_matches_brute_force():
+    rnd = random.Random(7)
+    trie = _DigitTrie()
+    live = {}
+    for step in range(500):
+        if live and rnd.random() < 0.4:
+            name = rnd.choice(sorted(live))
+            trie.discard(live.pop(name), name)
+        else:
+            key = "".join(rnd.choice("012") for _ in range(rnd.randrange(1, 7)))
+            live[f"n{step}"] = key
+            trie.insert(key, f"n{step}")
+        for prefix in ("", "0", "12", "2222"):
+            expected = sorted(n for n, k in live.items() if k.startswith(prefix))
+            assert sorted(trie.walk(prefix)) == expected
+            assert trie.names(prefix) == set(expected)
+    for name, key in live.items():
+        trie.discard(key, name)
+    assert trie.root == {}
+
+
+def test_api_phone_search(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    from api_server import app
+
+    client = TestClient(app)
+    client.post("/contacts", json={"name": "Phoney Prefix", "phone": "+380639871230"})
+
+    r = client.get("/phone-search", params={"query": "063 987 12"})
+    assert r.status_code == 200
+    assert _names(r.json()) == ["Phoney Prefix"]
+
+    r = client.get("/phone-search", params={"query": "9871230", "mode": "suffix"})
+    assert _names(r.json()) == ["Phoney Prefix"]
+
+    assert client.get("/phone-search", params={"query": "abc"}).status_code == 400
+    r = client.get("/phone-search", params={"query": "063", "mode": "middle"})
+    assert r.status_code == 400
@@ -1,4 +1,11 @@
+import email
+import smtplib
+import socketserver
+import threading
 from datetime import date, timedelta
+from email import policy
+
+import pytest
 
 
 class FakeSMTP:
@@ -70,3 +77,271 @@ def test_send_reminders_email_monkeypatched_smtp(tmp_path, monkeypatch):
     assert len(attachments) == 1
     filename = attachments[0].get_filename()
     assert filename.endswith(".csv")
+
+
+def test_reminder_pipeline_loads_once_without_temp_files(tmp_path, monkeypatch):
+    import smtplib
+    import tempfile
+
+    import reminder
+    from core import AppService
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    soon = (date.today() + timedelta(days=2)).isoformat()
+    AppService(data_dir).add("Rita <b>", "+380501230101", birthday=soon)
+
+    loads = []
+
+    class CountingService(AppService):
+        def __init__(self, *args, **kwargs):
+            loads.append(1)
+            super().__init__(*args, **kwargs)
+
+    def no_temp_files(*args, **kwargs):
+        raise AssertionError("temporary file created")
+
+    monkeypatch.setattr(reminder, "AppService", CountingService)
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", no_temp_files)
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+
+    res = reminder.send_reminders_email(
+        data_dir,
+        smtp_settings={
+            "server": "localhost",
+            "port": "25",
+            "from_addr": "from@example.com",
+            "to_addrs": "to@example.com",
+        },
+        days=7,
+    )
+    assert loads == [1]
+
+    msg = FakeSMTP.last_message
+    attachment = next(msg.iter_attachments())
+    assert res == f"sent:{attachment.get_filename()}"
+    csv_text = attachment.get_content()
+    if isinstance(csv_text, bytes):
+        csv_text = csv_text.decode("utf-8")
+    assert csv_text.splitlines() == [
+        "name,phone,birthday,days_until,notes",
+        f"Rita <b>,+380501230101,{soon},2,",
+    ]
+    html = msg.get_body(preferencelist=("html",)).get_content()
+    assert "Rita &lt;b&gt;" in html and "None" not in html
+
+
+# Команда SMTP -> метод _StubSMTPHandler
+_SMTP_VERBS = {
+    "EHLO": "hello",
+    "HELO": "hello",
+    "MAIL": "mail",
+    "RCPT": "rcpt",
+    "DATA": "data",
+    "RSET": "ok",
+    "NOOP": "ok",
+    "QUIT": "quit",
+}
+
+
+class _StubSMTPHandler(socketserver.StreamRequestHandler):
+    """Мінімальний SMTP-діалог: EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT.
+
+    Кожна команда — окремий метод з таблиці `_SMTP_VERBS`; False завершує сесію.
+    """
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stub ESMTP")
+        self.rcpts = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode().strip()
+            method = _SMTP_VERBS.get(cmd[:4].upper())
+            if method is None:
+                self.reply("502 not implemented")
+            elif getattr(self, method)(cmd) is False:
+                return
+
+    def hello(self, cmd):
+        self.reply("250 stub")
+
+    def ok(self, cmd):
+        self.reply("250 OK")
+
+    def quit(self, cmd):
+        self.reply("221 bye")
+        return False
+
+    def mail(self, cmd):
+        self.rcpts = []
+        if self.server.drop_next > 0:
+            # обрив з'єднання посеред сесії
+            self.server.drop_next -= 1
+            return False
+        self.reply("250 OK")
+
+    def rcpt(self, cmd):
+        addr = cmd.split(":", 1)[1].strip(" <>")
+        if addr in self.server.reject:
+            self.reply("550 no such user")
+        else:
+            self.rcpts.append(addr)
+            self.reply("250 OK")
+
+    def data(self, cmd):
+        self.reply("354 go ahead")
+        data = b""
+        while not data.endswith(b"\r\n.\r\n"):
+            data += self.rfile.readline()
+        if self.server.defer_next > 0:
+            self.server.defer_next -= 1
+            self.reply("451 try again later")
+        else:
+            message = email.message_from_bytes(data, policy=policy.default)
+            self.server.messages.append((self.rcpts, message))
+            self.reply("250 queued")
+
+
+@pytest.fixture
+def smtp_stub():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _StubSMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = []
+    server.reject = set()
+    server.drop_next = 0
+    server.defer_next = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _stub_settings(server, to_addrs):
+    return {
+        "server": "127.0.0.1",
+        "port": str(server.server_address[1]),
+        "from_addr": "bot@example.com",
+        "to_addrs": to_addrs,
+    }
+
+
+def _book_with_birthday(tmp_path):
+    from core import AppService
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    soon = (date.today() + timedelta(days=3)).isoformat()
+    AppService(data_dir).add("Olha Stub", "+380501230102", birthday=soon)
+    return data_dir
+
+
+def test_per_recipient_messages_share_connection_in_batches(tmp_path, smtp_stub):
+    from reminder import ReminderMailer, send_reminders_per_recipient
+
+    data_dir = _book_with_birthday(tmp_path)
+    settings = _stub_settings(
+        smtp_stub, "a@example.com, b@example.com,c@example.com,A@example.com"
+    )
+
+    results = send_reminders_per_recipient(data_dir, settings, days=7)
+    assert [(r.recipient, r.ok, r.attempts) for r in results] == [
+        ("a@example.com", True, 1),
+        ("b@example.com", True, 1),
+        ("c@example.com", True, 1),
+    ]
+    # одне з'єднання на всі листи, кожен лист — лише своєму адресату
+    assert smtp_stub.connections == 1
+    assert [rcpts for rcpts, _ in smtp_stub.messages] == [
+        ["a@example.com"],
+        ["b@example.com"],
+        ["c@example.com"],
+    ]
+    msg = smtp_stub.messages[0][1]
+    assert msg["To"] == "a@example.com"
+    assert "Olha Stub" in msg.get_body(("html",)).get_content()
+
+    # після batch_size листів сесія відкривається заново
+    smtp_stub.connections = 0
+    mailer = ReminderMailer.from_settings(settings, batch_size=2)
+    with mailer:
+        results = send_reminders_per_recipient(
+            data_dir, settings, days=7, mailer=mailer
+        )
+    assert all(r.ok for r in results)
+    assert smtp_stub.connections == 2
+
+
+def test_mailer_retries_transient_failures_with_backoff(tmp_path, smtp_stub):
+    from reminder import ReminderMailer, send_reminders_per_recipient
+
+    data_dir = _book_with_birthday(tmp_path)
+    settings = _stub_settings(smtp_stub, "a@example.com,gone@example.com,b@example.com")
+    smtp_stub.reject.add("gone@example.com")
+    # перший лист: обрив з'єднання, потім 451 на DATA, третя спроба вдала
+    smtp_stub.drop_next = 1
+    smtp_stub.defer_next = 1
+
+    delays = []
+    mailer = ReminderMailer.from_settings(
+        settings, backoff=0.5, backoff_max=0.75, sleep=delays.append
+    )
+    with mailer:
+        results = send_reminders_per_recipient(
+            data_dir, settings, days=7, mailer=mailer
+        )
+
+    by_addr = {r.recipient: r for r in results}
+    assert by_addr["a@example.com"].ok and by_addr["a@example.com"].attempts == 3
+    assert delays == [0.5, 0.75]
+    # 550 — остаточна відмова: без повторів, решта листів іде далі
+    gone = by_addr["gone@example.com"]
+    assert not gone.ok and gone.attempts == 1 and "550" in gone.error
+    assert by_addr["b@example.com"].ok
+    # нове з'єднання лише після обриву
+    assert smtp_stub.connections == 2
+    assert [rcpts for rcpts, _ in smtp_stub.messages] == [
+        ["a@example.com"],
+        ["b@example.com"],
+    ]
+
+    # тимчасові помилки після всіх повторів піднімаються
+    from reminder import send_reminders_email
+
+    smtp_stub.defer_next = 10
+    mailer = ReminderMailer.from_settings(settings, max_retries=1, sleep=delays.append)
+    with mailer, pytest.raises(smtplib.SMTPDataError, match="451"):
+        send_reminders_email(data_dir, settings, days=7, mailer=mailer)
+    assert mailer.last_attempts == 2
+
+
+def test_per_recipient_messages_render_once(monkeypatch):
+    import reminder
+
+    calls = []
+    real_html, real_csv = reminder.reminders_html, reminder.reminders_csv
+    monkeypatch.setattr(
+        reminder, "reminders_html", lambda *a: calls.append("html") or real_html(*a)
+    )
+    monkeypatch.setattr(
+        reminder, "reminders_csv", lambda *a: calls.append("csv") or real_csv(*a)
+    )
+    row = dict.fromkeys(reminder.REMINDER_FIELDS, "")
+    rows = [{**row, "name": "Nina", "days_until": 1}]
+    messages = reminder.reminder_messages(
+        rows, 7, "bot@example.com", ["a@example.com", "b@example.com"], "b.csv"
+    )
+    assert sorted(calls) == ["csv", "html"]
+    assert [m["To"] for m in messages] == ["a@example.com", "b@example.com"]
+    for msg in messages:
+        assert "Nina" in msg.get_body(("html",)).get_content()
+        assert next(msg.iter_attachments()).get_filename() == "b.csv"
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from response_cache import LRUCache, SingleFlight
+
+
+def test_lru_eviction_and_ttl():
+    now = [0.0]
+    cache = LRUCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "a" стає найсвіжішим
+    cache.put("c", 3)  # витісняє "b"
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = LRUCache(maxsize=8, ttl=10)
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute("key", compute))
+        )
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 7 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_single_flight_shares_errors_and_releases_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.in_flight() == 0
+    assert flight.do("k", lambda: 42) == 42
+
+
+def test_fsearch_served_from_cache_until_book_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("AB_DATA_DIR", str(tmp_path))
+    import api_server
+
+    client = TestClient(api_server.app)
+    client.post("/contacts", json={"name": "Cachey", "phone": "+380501230600"})
+
+    client.get("/fsearch", params={"query": "Cachey"})
+    hits = api_server.response_cache.hits
+    r = client.get("/fsearch", params={"query": "Cachey"})
+    assert api_server.response_cache.hits == hits + 1
+    assert any(d["name"] == "Cachey" for d in r.json())
+
+    # нова версія книги -> новий ключ -> промах
+    client.post("/contacts", json={"name": "Cacheyy", "phone": "+380501230601"})
+    r = client.get("/fsearch", params={"query": "Cachey"})
+    assert api_server.response_cache.hits == hits + 1
+    assert any(d["name"] == "Cacheyy" for d in r.json())
+
+    # запити, що відрізняються лише регістром і пробілами, ділять запис кешу
+    r = client.get("/fsearch", params={"query": "  cACHEY "})
+    assert api_server.response_cache.hits == hits + 2
+    assert any(d["name"] == "Cacheyy" for d in r.json())
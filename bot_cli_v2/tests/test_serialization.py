@@ -0,0 +1,42 @@
+import gzip
+import json
+
+from address_book import AddressBook
+from serialization import EncodedBook
+
+
+def test_encoded_book_tracks_mutations():
+    book = AddressBook()
+    book.add("Zed", "+380501230700")
+    encoded = EncodedBook(book)
+
+    book.add("Amy", "+380501230701", notes="Київ")
+    book.change("Zed", "+380501230702")
+    book.rename("Amy", "Ann")
+
+    assert json.loads(encoded.listing()) == book.all_records_sorted()
+    assert json.loads(encoded.record("Ann"))["notes"] == "Київ"
+    assert encoded.record("Amy") is None
+
+    book.remove("Zed")
+    assert [r["name"] for r in json.loads(encoded.listing())] == ["Ann"]
+
+    # повне перезавантаження книги перебудовує кеш
+    book.load_from_dict({"Bob": {"name": "Bob", "phone": "+380501230703"}})
+    assert [r["name"] for r in json.loads(encoded.listing())] == ["Bob"]
+
+
+def test_listing_payload_caches_gzip_until_change():
+    book = AddressBook()
+    book.add("Gia", "+380501230710")
+    encoded = EncodedBook(book)
+
+    payload = encoded.listing_payload()
+    compressed = payload.gzip()
+    assert gzip.decompress(compressed) == encoded.listing()
+    # та сама версія книги — той самий об'єкт і вже стиснуті байти
+    assert encoded.listing_payload() is payload
+    assert payload.gzip() is compressed
+
+    book.add("Hal", "+380501230711")
+    assert encoded.listing_payload() is not payload
@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+from core import AppService
+
+
+def _names(svc: AppService):
+    return [r["name"] for r in svc.all()]
+
+
+def test_workers_share_writes_through_journal(tmp_path: Path):
+    a = AppService(tmp_path, enable_backups=False, shared=True)
+    b = AppService(tmp_path, enable_backups=False, shared=True)
+
+    a.add("Ann", "+380501230900")
+    # запис у b спершу підтягує чужі зміни, тож нічого не затирається
+    b.add("Ben", "+380501230901")
+    assert a.refresh() == 1
+    assert _names(a) == ["Ann", "Ben"]
+
+    b.rename("Ann", "Anna")
+    a.refresh()
+    assert _names(a) == ["Anna", "Ben"]
+
+    # новий процес бачить той самий стан
+    c = AppService(tmp_path, enable_backups=False, shared=True)
+    assert _names(c) == ["Anna", "Ben"]
+
+
+def test_journal_compaction_is_picked_up_by_readers(tmp_path: Path):
+    a = AppService(tmp_path, enable_backups=False, shared=True)
+    b = AppService(tmp_path, enable_backups=False, shared=True)
+    a._shared.compact_every = 3
+
+    for i in range(4):
+        a.add(f"Comp{i}", f"+38050123091{i}")
+
+    meta = json.loads((tmp_path / "contacts.json").read_text(encoding="utf-8"))["meta"]
+    assert meta["journal_seq"] >= 3
+
+    b.refresh()
+    assert _names(b) == [f"Comp{i}" for i in range(4)]
+    b.remove("Comp0")
+    a.refresh()
+    assert "Comp0" not in _names(a)
+
+
+def test_compaction_snapshot_is_fsynced(tmp_path: Path, monkeypatch):
+    import journal
+
+    calls = []
+    real_save = journal.save_contacts_json
+
+    def recording_save(*args, **kwargs):
+        calls.append(kwargs.get("fsync"))
+        return real_save(*args, **kwargs)
+
+    monkeypatch.setattr(journal, "save_contacts_json", recording_save)
+    a = AppService(tmp_path, enable_backups=False, shared=True)
+    a.add("Sync", "+380501230920")
+    a._shared.compact()
+    # журнал обнуляється лише після довговічного знімка
+    assert calls and all(calls)
+
+
+def test_reader_detects_compaction_by_generation_not_inode(tmp_path: Path):
+    a = AppService(tmp_path, enable_backups=False, shared=True)
+    b = AppService(tmp_path, enable_backups=False, shared=True)
+    for i in range(3):
+        a.add(f"Gen{i}", f"+38050123093{i}")
+    b.refresh()
+    offset = b._shared._offset
+
+    a._shared.compact()
+    # новий журнал переростає старе зміщення читача — навіть якщо файл
+    # отримав той самий inode, читач не повинен читати з середини рядка
+    i = 3
+    while (tmp_path / "contacts.journal").stat().st_size <= offset:
+        a.add(f"Gen{i}", f"+3805012309{i + 30:02d}")
+        i += 1
+    a.remove("Gen0")
+
+    b.refresh()
+    assert _names(b) == _names(a)
+    header = (tmp_path / "contacts.journal").read_bytes().split(b"\n", 1)[0]
+    assert json.loads(header)["journal"] == b._shared._journal_id
@@ -25,3 +25,20 @@ def test_remove_and_undo(tmp_path: Path):
 
     svc.undo()
     assert any(r["name"] == "Bob" for r in svc.all())
+
+
+def test_batch_is_single_undo_entry(tmp_path: Path):
+    svc = AppService(tmp_path, enable_backups=False)
+    applied, _ = svc.add_many(
+        [
+            {"name": "Carol", "phone": "+380501112255"},
+            {"name": "Dave", "phone": "+380501112266", "birthday": "1990-01-02"},
+        ]
+    )
+    assert applied
+
+    svc.undo()
+    assert svc.all() == []
+
+    svc.redo()
+    assert svc.get("Dave")["birthday"] == "1990-01-02"
@@ -1,4 +1,6 @@
-from utils import normalize_phone, validate_name
+import pytest
+
+from utils import PHONE_ERROR_MESSAGES, normalize_phone, normalize_phones, validate_name
 
 
 def test_validate_name_ok():
@@ -24,3 +26,33 @@ def test_normalize_phone_00_to_plus():
 
 def test_normalize_phone_local_to_default_cc():
     assert normalize_phone("0501234567", default_country_code="+38").startswith("+38")
+
+
+def test_normalize_phones_returns_values_and_error_codes():
+    raw = ["+380 (50) 123-45-67", "", "12+34567", "abc", "123", "0050 1234567"]
+    values, errors = normalize_phones(raw)
+    assert values == ["+380501234567", None, None, None, None, "+501234567"]
+    assert errors == [None, "empty", "plus_position", "not_digits", "length", None]
+    assert normalize_phones([]) == ([], [])
+
+
+def test_normalize_phone_raises_with_same_messages():
+    with pytest.raises(ValueError, match=PHONE_ERROR_MESSAGES["length"]):
+        normalize_phone("123")
+    # повторний невалідний вхід із кешу дає ту саму помилку
+    with pytest.raises(ValueError, match=PHONE_ERROR_MESSAGES["length"]):
+        normalize_phone("123")
+
+
+def test_import_csv_normalizes_phones_in_bulk(tmp_path):
+    from core import AppService
+
+    csv_path = tmp_path / "in.csv"
+    csv_path.write_text(
+        "name,phone\nAnna,050 123 45 67\nBad,12\nNoPhone,\nOlha,+380 67 000 11 22\n",
+        encoding="utf-8",
+    )
+    service = AppService(tmp_path, enable_backups=False)
+    assert service.import_csv(csv_path) == {"added": 2, "skipped": 2}
+    assert service.get("Anna")["phone"] == "+38501234567"
+    assert service.get("Olha")["phone"] == "+380670001122"
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-import re
+import gc
+import heapq
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from difflib import SequenceMatcher
-from typing import Any, Dict, Iterable, List, Tuple
+from functools import lru_cache
+from itertools import chain, islice, repeat
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
 
 try:
     from rapidfuzz import fuzz as _rf_fuzz
@@ -15,6 +22,34 @@ except Exception:
 from datetime import datetime as _dt
 
 from exceptions import ValidationError
+from settings import SETTINGS
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def parse_iso_date(value: str) -> Tuple[int, int, int] | None:
+    """Розбирає дату YYYY-MM-DD у (рік, місяць, день) або повертає None.
+
+    Швидкий шлях — фіксована розмітка з 10 символів без strptime. Рядки
+    іншого вигляду, які приймає strptime("%Y-%m-%d") (наприклад "1990-5-1"),
+    розбираються ним же, тож набір допустимих дат не змінюється.
+    """
+    if len(value) == 10 and value.isascii() and value[4] == "-" and value[7] == "-":
+        y, m, d = value[:4], value[5:7], value[8:]
+        if not (y.isdigit() and m.isdigit() and d.isdigit()):
+            return None
+        year, month, day = int(y), int(m), int(d)
+        if year < 1 or not 1 <= month <= 12 or day < 1:
+            return None
+        leap = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        if day > _DAYS_IN_MONTH[month - 1] + leap:
+            return None
+        return year, month, day
+    try:
+        parsed = _dt.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+    return parsed.year, parsed.month, parsed.day
 
 
 def validate_birthday(value: str | None) -> str | None:
@@ -27,11 +62,9 @@ def validate_birthday(value: str | None) -> str | None:
     v = str(value).strip()
     if not v:
         return None
-    try:
-        _dt.strptime(v, "%Y-%m-%d")
-        return v
-    except Exception:
+    if parse_iso_date(v) is None:
         raise ValidationError("Invalid birthday format, expected YYYY-MM-DD")
+    return v
 
 
 # =========================
@@ -39,26 +72,45 @@ def validate_birthday(value: str | None) -> str | None:
 # =========================
 
 
-def normalize_phone(raw_phone: str, default_country_code: str | None = None) -> str:
-    """Нормалізує телефон до єдиного канонічного формату.
+class _PhoneCharTable(dict):
+    """Таблиця str.translate: лишає цифри (як `\\d` у re) і '+', решту
+    прибирає. ASCII заповнено наперед, інші символи — при першій появі."""
 
-    Правила:
-    - прибираємо пробіли/дужки/дефіси/тощо
-    - дозволяємо '+' лише на початку
-    - '00XXXXXXXX' -> '+XXXXXXXX'
-    - результат: '+' + лише цифри
-    - перевірка довжини: 7..15 цифр (E.164)
-    """
+    def __missing__(self, code: int) -> int | None:
+        ch = chr(code)
+        value = code if ch == "+" or ch.isdecimal() else None
+        self[code] = value
+        return value
+
+
+_PHONE_CHARS = _PhoneCharTable(
+    {code: code if chr(code) in "+0123456789" else None for code in range(128)}
+)
+
+# Коди помилок normalize_phones і відповідні повідомлення normalize_phone
+PHONE_ERROR_MESSAGES: Dict[str, str] = {
+    "empty": "Phone is empty",
+    "plus_position": "Plus sign must be at the beginning",
+    "not_digits": "Phone must contain digits only",
+    "length": "Phone length must be between 7 and 15 digits",
+}
+
+
+@lru_cache(maxsize=SETTINGS.phone_normalize_cache_size)
+def _normalize_phone(
+    raw_phone: str, default_country_code: str | None
+) -> Tuple[str | None, str | None]:
+    """(нормалізований номер, None) або (None, код помилки)."""
     phone = raw_phone.strip()
     if not phone:
-        raise ValueError("Phone is empty")
+        return None, "empty"
 
     # Залишаємо тільки цифри та '+'
-    phone = re.sub(r"[^\d+]", "", phone)
+    phone = phone.translate(_PHONE_CHARS)
 
     # Якщо '+' зустрічається не на початку — це помилка
     if "+" in phone[1:]:
-        raise ValueError("Plus sign must be at the beginning")
+        return None, "plus_position"
 
     # 00XXXXXXXX -> +XXXXXXXX
     if phone.startswith("00"):
@@ -76,12 +128,46 @@ def normalize_phone(raw_phone: str, default_country_code: str | None = None) ->
         phone = "+" + digits
 
     if not digits.isdigit():
-        raise ValueError("Phone must contain digits only")
+        return None, "not_digits"
 
     # Мін/макс довжина за E.164 (до 15 цифр після '+')
     if len(digits) < 7 or len(digits) > 15:
-        raise ValueError("Phone length must be between 7 and 15 digits")
+        return None, "length"
+
+    return phone, None
+
+
+def normalize_phones(
+    raw_phones: Iterable[str], default_country_code: str | None = None
+) -> Tuple[List[str | None], List[str | None]]:
+    """Пакетна нормалізація: (номери, коди помилок) у порядку вхідних.
+
+    Для кожного входу рівно одне з двох — None: номер при помилці або код
+    помилки (ключ PHONE_ERROR_MESSAGES) при успіху. Без винятків на
+    невалідних рядках; повторні входи беруться з обмеженого кешу.
+    """
+    results = list(map(_normalize_phone, raw_phones, repeat(default_country_code)))
+    if not results:
+        return [], []
+    values, errors = zip(*results, strict=True)
+    return list(values), list(errors)
+
+
+def normalize_phone(raw_phone: str, default_country_code: str | None = None) -> str:
+    """Нормалізує телефон до єдиного канонічного формату.
+
+    Правила:
+    - прибираємо пробіли/дужки/дефіси/тощо
+    - дозволяємо '+' лише на початку
+    - '00XXXXXXXX' -> '+XXXXXXXX'
+    - результат: '+' + лише цифри
+    - перевірка довжини: 7..15 цифр (E.164)
 
+    Викликає ValueError для невалідного номера.
+    """
+    phone, error = _normalize_phone(raw_phone, default_country_code)
+    if error is not None:
+        raise ValueError(PHONE_ERROR_MESSAGES[error])
     return phone
 
 
@@ -111,63 +197,94 @@ def _fmt_dt(value: Any) -> str:
         return str(value)
 
 
-def format_contacts_table(records: Iterable[Dict[str, Any]]) -> str:
-    """Відформатовує контакти у вигляді ASCII-таблиці з полями birthday та notes."""
-    rows: List[Tuple[str, str, str, str, str, str]] = []
-
-    for r in records:
-        name = str(r.get("name", "")).strip()
-        phone = str(r.get("phone", "")).strip()
-        birthday = str(r.get("birthday", "") or "").strip()
-        notes = str(r.get("notes", "") or "").strip()
-        if len(notes) > 30:
-            notes_disp = notes[:27] + "..."
-        else:
-            notes_disp = notes
-        created = _fmt_dt(r.get("created_at"))
-        updated = _fmt_dt(r.get("updated_at"))
-        rows.append((name, phone, birthday, notes_disp, created, updated))
+TABLE_HEADERS = ("Name", "Phone", "Birthday", "Notes", "Created", "Updated")
+# Найбільша ширина колонок потокового виводу; довші значення обрізаються
+TABLE_COLUMN_CAPS = (32, 16, 10, 30, 16, 16)
 
-    if not rows:
-        return ""
+TableRow = Tuple[str, str, str, str, str, str]
 
-    headers = ("Name", "Phone", "Birthday", "Notes", "Created", "Updated")
-
-    w_name = max(len(headers[0]), *(len(x[0]) for x in rows))
-    w_phone = max(len(headers[1]), *(len(x[1]) for x in rows))
-    w_bday = max(len(headers[2]), *(len(x[2]) for x in rows))
-    w_notes = max(len(headers[3]), *(len(x[3]) for x in rows))
-    w_created = max(len(headers[4]), *(len(x[4]) for x in rows))
-    w_updated = max(len(headers[5]), *(len(x[5]) for x in rows))
-
-    def sep() -> str:
-        return (
-            "+"
-            + "-" * (w_name + 2)
-            + "+"
-            + "-" * (w_phone + 2)
-            + "+"
-            + "-" * (w_bday + 2)
-            + "+"
-            + "-" * (w_notes + 2)
-            + "+"
-            + "-" * (w_created + 2)
-            + "+"
-            + "-" * (w_updated + 2)
-            + "+"
-        )
 
-    header_line = (
-        f"| {headers[0]:<{w_name}} | {headers[1]:<{w_phone}} | {headers[2]:<{w_bday}} | {headers[3]:<{w_notes}} | "
-        f"{headers[4]:<{w_created}} | {headers[5]:<{w_updated}} |"
-    )
+def _table_row(r: Dict[str, Any]) -> TableRow:
+    name = str(r.get("name", "")).strip()
+    phone = str(r.get("phone", "")).strip()
+    birthday = str(r.get("birthday", "") or "").strip()
+    notes = str(r.get("notes", "") or "").strip()
+    if len(notes) > 30:
+        notes_disp = notes[:27] + "..."
+    else:
+        notes_disp = notes
+    created = _fmt_dt(r.get("created_at"))
+    updated = _fmt_dt(r.get("updated_at"))
+    return (name, phone, birthday, notes_disp, created, updated)
+
+
+def _table_widths(
+    rows: Iterable[TableRow], caps: Sequence[int] | None = None
+) -> Tuple[int, ...]:
+    widths = [len(h) for h in TABLE_HEADERS]
+    for row in rows:
+        for i, value in enumerate(row):
+            if len(value) > widths[i]:
+                widths[i] = len(value)
+    if caps is not None:
+        widths = [
+            max(len(h), min(w, cap))
+            for h, w, cap in zip(TABLE_HEADERS, widths, caps, strict=True)
+        ]
+    return tuple(widths)
+
+
+def _table_lines(rows: Iterable[TableRow], widths: Sequence[int]) -> Iterator[str]:
+    """Рядки таблиці: рамка, заголовок, рамка, рядки даних, рамка."""
+    sep = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+    fmt = "| " + " | ".join(f"{{:<{w}}}" for w in widths) + " |"
+
+    def clip(row: TableRow) -> Iterator[str]:
+        # довші за колонку значення обрізаються з "...", як нотатки
+        for value, width in zip(row, widths, strict=True):
+            yield value if len(value) <= width else value[: max(width - 3, 0)] + "..."
+
+    yield sep
+    yield fmt.format(*TABLE_HEADERS)
+    yield sep
+    for row in rows:
+        yield fmt.format(*clip(row))
+    yield sep
+
+
+def contacts_table_widths(
+    records: Iterable[Dict[str, Any]], caps: Sequence[int] = TABLE_COLUMN_CAPS
+) -> Tuple[int, ...]:
+    """Ширини колонок за вибіркою записів, не більші за `caps`."""
+    return _table_widths(map(_table_row, records), caps)
+
+
+def iter_contacts_table(
+    records: Iterable[Dict[str, Any]],
+    widths: Sequence[int] | None = None,
+    sample_size: int = 1000,
+) -> Iterator[str]:
+    """Потоково віддає рядки ASCII-таблиці контактів, по одному.
+
+    Ширини колонок — задані `widths` або пораховані за першими
+    `sample_size` записами (з обмеженням TABLE_COLUMN_CAPS), тож уся книга
+    ніколи не тримається в пам'яті: рядок форматується, коли до нього
+    доходить черга. Довші за колонку значення обрізаються.
+    """
+    rows = map(_table_row, records)
+    if widths is None:
+        sample = list(islice(rows, sample_size))
+        widths = _table_widths(sample, TABLE_COLUMN_CAPS)
+        rows = chain(sample, rows)
+    return _table_lines(rows, widths)
 
-    body_lines = [
-        f"| {name:<{w_name}} | {phone:<{w_phone}} | {bday:<{w_bday}} | {notes:<{w_notes}} | {created:<{w_created}} | {updated:<{w_updated}} |"
-        for name, phone, bday, notes, created, updated in rows
-    ]
 
-    return "\n".join([sep(), header_line, sep(), *body_lines, sep()])
+def format_contacts_table(records: Iterable[Dict[str, Any]]) -> str:
+    """Відформатовує контакти у вигляді ASCII-таблиці з полями birthday та notes."""
+    rows = [_table_row(r) for r in records]
+    if not rows:
+        return ""
+    return "\n".join(_table_lines(rows, _table_widths(rows)))
 
 
 def format_stats_box(stats: Dict[str, Any]) -> str:
@@ -194,6 +311,57 @@ def format_stats_box(stats: Dict[str, Any]) -> str:
     return "\n".join(out)
 
 
+def fuzzy_choice(record: Dict[str, Any], key_fields: Iterable[str]) -> str:
+    """Рядок для нечіткого порівняння: непорожні `key_fields` через " | "."""
+    parts = (str(record.get(k) or "").strip() for k in key_fields)
+    return " | ".join(p for p in parts if p)
+
+
+def difflib_top_k(
+    query: str,
+    choices: Sequence[str | None],
+    limit: int = 10,
+    score_cutoff: int = 60,
+    candidates: Iterable[int] | None = None,
+) -> List[Tuple[int, int]]:
+    """Топ-`limit` збігів SequenceMatcher: [(індекс, оцінка 0-100)].
+
+    Повний ratio() рахується лише для кандидатів, що пройшли дешеві верхні
+    межі real_quick_ratio() і quick_ratio() проти поточного порогу; поріг
+    росте до найгіршої оцінки в купі, щойно вона заповнена. При рівних
+    оцінках перемагає менший індекс. `candidates` обмежує перебір (None
+    пропускається), інакше перебираються всі `choices`.
+    """
+    if limit <= 0:
+        return []
+    matcher = SequenceMatcher(None, query)
+    heap: List[Tuple[int, int]] = []  # (оцінка, -індекс), мінімум — найгірший
+    threshold = score_cutoff / 100
+    for idx in range(len(choices)) if candidates is None else candidates:
+        choice = choices[idx]
+        if choice is None:
+            continue
+        matcher.set_seq2(choice)
+        if matcher.real_quick_ratio() < threshold:
+            continue
+        if matcher.quick_ratio() < threshold:
+            continue
+        score = int(matcher.ratio() * 100)
+        if score < score_cutoff:
+            continue
+        item = (score, -idx)
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+        else:
+            continue
+        if len(heap) == limit:
+            # далі цікаві лише кандидати, не гірші за найгірший у купі
+            threshold = max(threshold, heap[0][0] / 100)
+    return [(-neg, score) for score, neg in sorted(heap, reverse=True)]
+
+
 def fuzzy_search(
     query: str,
     records: Iterable[Dict[str, Any]],
@@ -205,6 +373,8 @@ def fuzzy_search(
 
     Використовує rapidfuzz, якщо доступний, інакше повертає на основі difflib.
     Повертає список співпадінь, відсортований за спаданням оцінки.
+    Для пошуку по книзі сервісу див. FuzzyIndex — він не перебудовує рядки
+    на кожен запит.
     """
     q = (query or "").strip()
     if not q:
@@ -212,31 +382,83 @@ def fuzzy_search(
 
     key_fields = key_fields or ["name", "phone"]
 
-    choices = []
-    mapping = {}
-    for idx, r in enumerate(records):
-        parts = []
-        for k in key_fields:
-            parts.append(str(r.get(k, "")).strip())
-        choice = " | ".join(p for p in parts if p)
-        key = f"{idx}:{choice}"
-        choices.append(choice)
-        mapping[choice] = dict(r)
+    # результати прив'язані до позиції, а не до рядка: записи з однаковим
+    # текстом не затирають один одного
+    rows = [dict(r) for r in records]
+    choices = [fuzzy_choice(r, key_fields) for r in rows]
 
     results: List[Tuple[float, Dict[str, Any]]] = []
 
     if _RF_AVAILABLE:
         # rapidfuzz повертає (choice, score, idx)
-        extracted = _rf_process.extract(q, choices, scorer=_rf_fuzz.WRatio, limit=limit)
-        for choice, score, _ in extracted:
-            if score >= score_cutoff:
-                results.append((score, mapping[choice]))
+        extracted = _rf_process.extract(
+            q, choices, scorer=_rf_fuzz.WRatio, limit=limit, score_cutoff=score_cutoff
+        )
+        for _, score, idx in extracted:
+            results.append((score, rows[idx]))
     else:
         # запасний варіант із використанням difflib.SequenceMatcher
-        for choice in choices:
-            ratio = int(SequenceMatcher(None, q.lower(), choice.lower()).ratio() * 100)
-            if ratio >= score_cutoff:
-                results.append((ratio, mapping[choice]))
+        lowered = [c.lower() for c in choices]
+        for idx, ratio in difflib_top_k(q.lower(), lowered, limit, score_cutoff):
+            results.append((ratio, rows[idx]))
 
     results.sort(key=lambda x: x[0], reverse=True)
     return [r for _, r in results[:limit]]
+
+
+# =========================
+# МАСОВІ ОПЕРАЦІЇ
+# =========================
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Вимикає циклічний GC на час масової побудови структур.
+
+    Мільйони щойно створених контейнерів без циклів (кортежі пар, вузли
+    індексів) інакше раз у раз запускають повні проходи GC без жодної
+    користі. Попередній стан GC відновлюється.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# Пули процесів, що живуть між викликами: ім'я -> (ключ, к-сть процесів, пул)
+_POOLS: Dict[str, Tuple[Any, int, ProcessPoolExecutor]] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def process_pool(
+    name: str,
+    processes: int,
+    key: Any = None,
+    initializer: Callable[..., None] | None = None,
+    initargs: Tuple[Any, ...] = (),
+) -> ProcessPoolExecutor:
+    """Пул процесів (spawn) з іменем `name`, спільний для всіх викликів.
+
+    Пул перевикористовується, доки збігаються `key` і кількість процесів:
+    запуск інтерпретаторів і `initializer(*initargs)` (наприклад, передача
+    знімка даних воркерам) оплачуються один раз на ключ, а не на виклик.
+    Інакше старий пул закривається — уже надіслані в нього задачі він
+    доробляє — і створюється новий.
+    """
+    with _POOLS_LOCK:
+        current = _POOLS.get(name)
+        if current is not None and current[:2] == (key, processes):
+            return current[2]
+        pool = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=initializer,
+            initargs=initargs,
+        )
+        _POOLS[name] = (key, processes, pool)
+    if current is not None:
+        current[2].shutdown(wait=False)
+    return pool
@@ -53,10 +53,11 @@ HELP_MESSAGE: str = (
     "│ setnote <name> <note>        │ Add/replace contact note 📝🙂    │\n"
     "│ clearnote <name>             │ Clear contact note 🧹🙂         │\n"
     "│ phone <name>                 │ Show phone by name 📞🙂        │\n"
-    "│ all                          │ Show all contacts 📋🙂         │\n"
+    "│ all [page]                   │ Show all contacts 📋🙂         │\n"
     "│ remove <name>                │ Remove contact (confirm) 🗑️🙂  │\n"
     "│ delete <name>                │ Same as remove 🗑️🙂            │\n"
     "│ search <query>               │ Search by name/phone 🔎🙂      │\n"
+    "│ psearch <digits>             │ Search phone start/end 🔎🙂    │\n"
     "│ rename <old> <new>           │ Rename contact ✍️🙂            │\n"
     "│ stats                        │ Show address book stats 📊🙂   │\n"
     "├──────────────────────────────┴───────────────────────────────┤\n"